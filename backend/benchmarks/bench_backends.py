@@ -0,0 +1,125 @@
+"""
+Vector backend benchmark: Chroma vs the local NumPy index (exact and IVF).
+
+Inserts N synthetic clustered vectors with region/severity/year metadata
+straight into each backend (no OpenAI, no AuditVectorStore), then times
+unfiltered and filtered top-k queries. Recall@k is measured against the
+exact local search, so it shows what Chroma's HNSW and IVF give up.
+
+Usage (from backend/):
+    python -m benchmarks.bench_backends --sizes 10000,100000,1000000 --dim 384
+    python -m benchmarks.bench_backends --sizes 10000 --chroma-max 10000
+
+Chroma above --chroma-max rows is skipped: inserting 1M vectors through it
+takes a very long time. The local index handles 1M x 384 (~1.5 GB matrix).
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import isolate_environment, latency_summary, REGIONS, SEVERITIES
+
+isolate_environment()
+
+import numpy as np  # noqa: E402
+from src.local_index import LocalVectorIndex  # noqa: E402
+from src.vector_backends import ChromaBackend  # noqa: E402
+
+BATCH = 20_000
+
+
+def generate(n: int, dim: int, start: int, rng: np.random.Generator, centers: np.ndarray):
+    """Clustered vectors (so ANN structures have something to exploit) + metadata."""
+    labels = rng.integers(0, len(centers), size=n)
+    vectors = centers[labels] + 0.35 * rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"c{start + i}" for i in range(n)]
+    metas = [{"report_id": f"r{(start + i) // 20}", "region": REGIONS[(start + i) % 4],
+              "severity": SEVERITIES[(start + i) // 4 % 4], "year": 2023 + (start + i) % 3}
+             for i in range(n)]
+    return ids, vectors.astype(np.float32), metas
+
+
+def cluster_centers(dim: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(256, dim)).astype(np.float32)
+
+
+def build(backend, n: int, dim: int, seed: int = 0) -> float:
+    rng = np.random.default_rng(seed + 1)
+    centers = cluster_centers(dim, seed)
+    batch = min(BATCH, backend.max_batch_size())
+    start = time.perf_counter()
+    for offset in range(0, n, batch):
+        ids, vectors, metas = generate(min(batch, n - offset), dim, offset, rng, centers)
+        backend.add(ids=ids, embeddings=vectors.tolist() if isinstance(backend, ChromaBackend)
+                    else vectors, documents=[""] * len(ids), metadatas=metas)
+    return time.perf_counter() - start
+
+
+def run_queries(backend, queries: np.ndarray, k: int, where: dict = None):
+    latencies, results = [], []
+    for q in queries:
+        t = time.perf_counter()
+        out = backend.query(query_embeddings=[q.tolist()], n_results=k, where=where,
+                            include=["distances"])
+        latencies.append(time.perf_counter() - t)
+        results.append(out["ids"][0])
+    return latencies, results
+
+
+def recall(results: list[list[str]], truth: list[list[str]]) -> float:
+    return round(float(np.mean([len(set(r) & set(t)) / max(len(t), 1)
+                                for r, t in zip(results, truth)])), 4)
+
+
+def main(sizes: list[int], dim: int, n_queries: int, k: int, chroma_max: int,
+         ivf_lists: int) -> dict:
+    report = {"dim": dim, "k": k, "queries": n_queries, "runs": []}
+    rng = np.random.default_rng(42)
+    where = {"$and": [{"region": "APAC"}, {"year": 2024}]}
+    for n in sizes:
+        # Queries come from the same distribution as the data, like real questions
+        _, queries, _ = generate(n_queries, dim, 0, rng, cluster_centers(dim))
+        root = tempfile.mkdtemp(prefix=f"bench_backends_{n}_")
+        exact = LocalVectorIndex(os.path.join(root, "exact"))
+        backends = {"local_exact": exact}
+        if ivf_lists:
+            backends["local_ivf"] = LocalVectorIndex(os.path.join(root, "ivf"), ivf_lists=ivf_lists,
+                                                     ivf_probes=max(1, ivf_lists // 16),
+                                                     ivf_min_rows=0)
+        if n <= chroma_max:
+            backends["chroma"] = ChromaBackend(os.path.join(root, "chroma"), name="bench")
+
+        truth = {}
+        for name, backend in backends.items():
+            insert_seconds = build(backend, n, dim)
+            lat, res = run_queries(backend, queries, k)
+            flat, fres = run_queries(backend, queries, k, where)
+            if name == "local_exact":
+                truth = {"all": res, "filtered": fres}
+            report["runs"].append({
+                "backend": name, "rows": n,
+                "insert_rows_per_s": round(n / insert_seconds),
+                "query": latency_summary(lat),
+                "filtered_query": latency_summary(flat),
+                f"recall_at_{k}": recall(res, truth["all"]),
+                f"filtered_recall_at_{k}": recall(fres, truth["filtered"]),
+                "filtered_full_pages": round(float(np.mean([len(r) == k for r in fres])), 4),
+            })
+            print(json.dumps(report["runs"][-1]), flush=True)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--chroma-max", type=int, default=100_000)
+    parser.add_argument("--ivf-lists", type=int, default=256, help="0 disables the IVF run")
+    args = parser.parse_args()
+    result = main([int(s) for s in args.sizes.split(",")], args.dim, args.queries, args.k,
+                  args.chroma_max, args.ivf_lists)
+    print(json.dumps(result, indent=2))
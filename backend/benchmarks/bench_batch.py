@@ -0,0 +1,70 @@
+"""
+Batch benchmark: a committee pack of N questions, one /ask at a time vs
+one answer_batch() call.
+
+The sequential run is what the quarterly pack does today: embed, search and
+generate each question in turn. The batch run embeds all questions in one
+call, retrieves them with one multi-query search and keeps up to
+BATCH_MAX_CONCURRENCY generations in flight. OpenAI is replaced by
+benchmarks.fake_openai with fixed latencies; caches are disabled so both
+runs do the full work.
+
+Usage (from backend/):
+    python -m benchmarks.bench_batch --questions 100 --chat-latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import TOPICS, REGIONS, isolate_environment, synthetic_reports
+
+isolate_environment(query_cache_enabled="false", semantic_cache_enabled="false")
+
+from benchmarks import fake_openai  # noqa: E402
+from src.rag_service import audit_rag_service  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+
+def committee_pack(n: int) -> list[str]:
+    return [f"What {TOPICS[i % len(TOPICS)]} issues were found in "
+            f"{REGIONS[(i // len(TOPICS)) % len(REGIONS)]} (question {i})?" for i in range(n)]
+
+
+async def main(questions: int, reports: int, chat_latency: float, concurrency: int) -> dict:
+    from src.config import settings
+    settings.batch_max_concurrency = concurrency
+    client = fake_openai.FakeAsyncOpenAI(embed_latency=0.05, chat_latency=chat_latency)
+    fake_openai.install(client)
+    corpus = synthetic_reports(reports)
+    await audit_vector_store.add_reports([{k: v for k, v in r.items() if k != "facts"}
+                                          for r in corpus])
+    pack = committee_pack(questions)
+    out = {"questions": questions, "chunks": await audit_vector_store.count_chunks(),
+           "chat_latency_s": chat_latency, "batch_max_concurrency": concurrency}
+
+    for name in ("sequential", "batch"):
+        embed_calls, chat_calls = client.embeddings.calls, client.chat.completions.calls
+        start = time.perf_counter()
+        if name == "sequential":
+            answers = [await audit_rag_service.answer_question(q) for q in pack]
+        else:
+            answers = [a async for _, a in audit_rag_service.answer_batch(pack)]
+        elapsed = time.perf_counter() - start
+        out[name] = {"seconds": round(elapsed, 3),
+                     "questions_per_s": round(len(answers) / elapsed, 2),
+                     "embedding_requests": client.embeddings.calls - embed_calls,
+                     "chat_requests": client.chat.completions.calls - chat_calls}
+    out["speedup"] = round(out["sequential"]["seconds"] / out["batch"]["seconds"], 1)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--chat-latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.questions, args.reports, args.chat_latency,
+                                      args.concurrency)), indent=2))
@@ -0,0 +1,110 @@
+"""
+Chunker benchmark: the original chunk_text() vs src/chunker.py on
+multi-MB synthetic reports.
+
+- legacy: the original chunk_text (split the whole text, three lists,
+  strings grown with +=), reproduced here for comparison
+- chunk_text: the current chunk_text() — same chunks, plus offsets/pages
+- streamed: iter_chunks() over a generator of pages, chunks consumed as
+  they are yielded (what process_audit_pdf does); the full text never exists
+
+Time is the best of --repeat runs; peak memory is tracemalloc's peak during
+a separate run, input generation included (for legacy and chunk_text that
+is the joined text, as the pipeline holds it).
+
+Usage (from backend/):
+    python -m benchmarks.bench_chunker --mb 1 4 16
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import isolate_environment, TOPICS, REGIONS
+
+isolate_environment()
+
+from src.chunker import iter_chunks  # noqa: E402
+from src.document_processor import chunk_text  # noqa: E402
+
+
+def legacy_chunk_text(text: str, min_size: int = 100, max_size: int = 1000) -> list[str]:
+    raw = [c.strip() for c in text.split("\n\n") if c.strip()]
+    sized = []
+    for chunk in raw:
+        if len(chunk) <= max_size:
+            sized.append(chunk)
+        else:
+            sents = chunk.replace(". ", ".\n").split("\n")
+            curr = ""
+            for s in sents:
+                if len(curr) + len(s) < max_size: curr += (" " + s if curr else s)
+                else:
+                    if curr: sized.append(curr.strip())
+                    curr = s
+            if curr: sized.append(curr.strip())
+    final, buf = [], ""
+    for c in sized:
+        if len(buf) + len(c) < min_size: buf += (" " + c if buf else c)
+        else:
+            if buf: final.append(buf.strip())
+            buf = c
+    if buf: final.append(buf.strip())
+    return final
+
+
+def iter_pages(megabytes: float, seed: int = 7):
+    """Pages of a synthetic report: short headings, normal and over-long paragraphs."""
+    rng = random.Random(seed)
+    target, size, page = int(megabytes * 1024 * 1024), 0, 0
+    while size < target:
+        page += 1
+        paragraphs = [f"Section {page}.{i}" if rng.random() < 0.3 else
+                      " ".join(f"The {rng.choice(TOPICS)} control in {rng.choice(REGIONS)} "
+                               f"was not operating effectively (CTRL-{rng.randint(1, 99999)})."
+                               for _ in range(rng.choice([2, 6, 20])))
+                      for i in range(8)]
+        block = f"[Page {page}]\n" + "\n\n".join(paragraphs)
+        size += len(block) + 2
+        yield block
+
+
+def run(variant: str, megabytes: float) -> int:
+    if variant == "streamed":
+        return sum(1 for _ in iter_chunks(iter_pages(megabytes)))
+    text = "\n\n".join(iter_pages(megabytes))
+    chunker = legacy_chunk_text if variant == "legacy" else chunk_text
+    return len(chunker(text))
+
+
+def main(sizes: list[float], repeat: int) -> dict:
+    out = {}
+    for megabytes in sizes:
+        pages = list(iter_pages(megabytes))
+        text = "\n\n".join(pages)
+        assert chunk_text(text) == legacy_chunk_text(text)  # Same chunks, or the numbers mean nothing
+        row = {"bytes": len(text), "pages": len(pages)}
+        del pages, text
+        for variant in ("legacy", "chunk_text", "streamed"):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                chunks = run(variant, megabytes)
+                times.append(time.perf_counter() - start)
+            tracemalloc.start()
+            run(variant, megabytes)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            row[variant] = {"seconds": round(min(times), 3), "chunks": chunks,
+                            "peak_kb": round(peak / 1024)}
+        out[f"{megabytes:g}_mb"] = row
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(main(args.mb, args.repeat), indent=2))
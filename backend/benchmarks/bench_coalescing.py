@@ -0,0 +1,95 @@
+"""
+Coalescing benchmark: bursts of the same question, with and without single flight.
+
+Each burst fires --burst identical /intelligence/ask calls at once (a
+committee opening the same dashboard), over --questions different
+questions. The caches can't help inside a burst: nothing has been answered
+yet. Reported per mode: upstream chat and embedding requests, and ask latency.
+OpenAI is benchmarks.fake_openai, whose chat calls take --chat-latency
+seconds and, like the real API, slow down as more of them run at once
+(--queueing seconds per concurrent call).
+
+Usage (from backend/):
+    python -m benchmarks.bench_coalescing --burst 20 --questions 10
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import isolate_environment, latency_summary, sample_reports
+
+isolate_environment()
+
+from benchmarks import fake_openai  # noqa: E402
+from src.document_processor import process_audit_report  # noqa: E402
+from src.embedding_service import embedding_service  # noqa: E402
+from src.llm_service import llm_service  # noqa: E402
+from src.rag_service import audit_rag_service  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+
+class QueueingClient(fake_openai.FakeAsyncOpenAI):
+    """Chat latency grows with the number of calls in flight (rate limits, shared GPUs)."""
+
+    def __init__(self, queueing: float, **kwargs):
+        super().__init__(**kwargs)
+        completions, base = self.chat.completions, self.chat.completions.create
+        in_flight = [0]
+
+        async def create(*args, **kw):
+            in_flight[0] += 1
+            try:
+                await asyncio.sleep(queueing * in_flight[0])
+                return await base(*args, **kw)
+            finally:
+                in_flight[0] -= 1
+        completions.create = create
+
+
+async def run(client, bursts: int, burst: int, tag: str) -> dict:
+    chat_before, embed_before = client.chat.completions.calls, client.embeddings.calls
+    latencies = []
+
+    async def ask(question: str):
+        start = time.perf_counter()
+        await audit_rag_service.answer_question(question)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for q in range(bursts):
+        question = f"What did the {tag} review #{q} find about reconciliation delays?"
+        await asyncio.gather(*(ask(question) for _ in range(burst)))
+    return {
+        "asks": bursts * burst,
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "upstream_chat_calls": client.chat.completions.calls - chat_before,
+        "upstream_embedding_calls": client.embeddings.calls - embed_before,
+        "ask_latency": latency_summary(latencies),
+    }
+
+
+async def main(args) -> dict:
+    client = QueueingClient(args.queueing, embed_latency=args.embed_latency,
+                            chat_latency=args.chat_latency, dim=256)
+    fake_openai.install(client)
+    for name, content in sample_reports():
+        chunks, meta = process_audit_report(name, content)
+        await audit_vector_store.add_report(name, chunks, region=meta["region"],
+                                            severity=meta["severity"], year=meta["year"])
+    out = {"config": vars(args)}
+    for enabled in (False, True):
+        embedding_service.in_flight.enabled = llm_service.in_flight.enabled = enabled
+        label = "coalesced" if enabled else "independent"
+        out[label] = await run(client, args.questions, args.burst, label)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--chat-latency", type=float, default=0.3)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--queueing", type=float, default=0.02)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,115 @@
+"""
+Concurrency benchmark: /intelligence/ask latency while an upload runs.
+
+N parallel askers hammer /intelligence/ask through the real FastAPI app
+(in-process ASGI transport) while one large report is uploaded. OpenAI is
+replaced by benchmarks.fake_openai with fixed latencies, so the numbers
+measure OUR request path: if anything blocks the event loop, ask latency
+balloons for the duration of the upload.
+
+Usage (from backend/):
+    python -m benchmarks.bench_concurrency --askers 20 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import isolate_environment, latency_summary, sample_reports
+
+isolate_environment()
+
+import httpx  # noqa: E402
+from benchmarks import fake_openai  # noqa: E402
+from src.main import app  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+from src.document_processor import process_audit_report  # noqa: E402
+
+QUESTIONS = [
+    "What critical findings were raised in APAC?",
+    "Which findings have deadlines before March 2026?",
+    "Summarise privileged access issues across reports.",
+    "What are the main AML monitoring gaps?",
+]
+
+
+async def seed_index() -> None:
+    for name, content in sample_reports():
+        chunks, meta = process_audit_report(name, content)
+        await audit_vector_store.add_report(
+            title=name, chunks=chunks, region=meta["region"],
+            severity=meta["severity"], audit_type=meta["audit_type"], year=meta["year"]
+        )
+
+
+async def asker(client: httpx.AsyncClient, worker: int, rounds: int, latencies: list) -> None:
+    for r in range(rounds):
+        payload = {"question": QUESTIONS[(worker + r) % len(QUESTIONS)], "n_results": 5}
+        start = time.perf_counter()
+        resp = await client.post("/intelligence/ask", json=payload)
+        latencies.append(time.perf_counter() - start)
+        resp.raise_for_status()
+
+
+async def run_phase(client, askers: int, rounds: int, upload: bytes = None) -> dict:
+    latencies: list[float] = []
+    upload_seconds = None
+
+    async def do_upload():
+        nonlocal upload_seconds
+        start = time.perf_counter()
+        resp = await client.post(
+            "/reports/upload",
+            files={"file": ("Bench_Large_Report.txt", upload, "text/plain")}
+        )
+        resp.raise_for_status()
+        job_id = resp.json()["job_id"]
+        # Uploads are background jobs: measure until the report is indexed
+        while True:
+            job = (await client.get(f"/jobs/{job_id}")).json()
+            if job["status"] in ("completed", "failed"):
+                break
+            await asyncio.sleep(0.05)
+        upload_seconds = time.perf_counter() - start
+
+    tasks = [asker(client, w, rounds, latencies) for w in range(askers)]
+    if upload is not None:
+        tasks.append(do_upload())
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return {
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "upload_seconds": round(upload_seconds, 3) if upload_seconds else None,
+        "ask_latency": latency_summary(latencies),
+    }
+
+
+async def main(args) -> dict:
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(
+        embed_latency=args.embed_latency, chat_latency=args.chat_latency
+    ))
+    await seed_index()
+    large_upload = b"\n\n".join(content for _, content in sample_reports()) * args.upload_copies
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 timeout=600) as client:
+        idle = await run_phase(client, args.askers, args.rounds)
+        busy = await run_phase(client, args.askers, args.rounds, upload=large_upload)
+    return {
+        "benchmark": "concurrency",
+        "config": vars(args),
+        "asks_only": idle,
+        "asks_during_upload": busy,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--askers", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--chat-latency", type=float, default=0.3)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--upload-copies", type=int, default=40,
+                        help="How many times the sample pack is repeated in the large upload")
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,65 @@
+"""
+Context benchmark: prompt tokens of the naive excerpt block vs the
+token-aware context builder.
+
+Indexes a synthetic corpus where every report ends with the same
+management-response boilerplate (as real reports do), then retrieves
+n_results chunks for a set of questions and builds the context both ways.
+No GPT calls are made: prompt tokens are the cost and latency driver this
+stage controls.
+
+Usage (from backend/):
+    python -m benchmarks.bench_context --reports 200 --n-results 15
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import isolate_environment, synthetic_reports
+
+isolate_environment(query_cache_enabled="false", semantic_cache_enabled="false")
+
+from benchmarks import fake_openai  # noqa: E402
+from benchmarks.bench_batch import committee_pack  # noqa: E402
+from src.context_builder import ContextBuilder  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+BOILERPLATE = (
+    "Management response: management agrees with the findings above and will implement "
+    "the agreed actions by the stated deadlines. Internal Audit will track progress and "
+    "report the status of every open action to the Audit Committee each quarter."
+)
+
+
+async def main(reports: int, questions: int, n_results: int, max_tokens: int) -> dict:
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(embed_latency=0.0, chat_latency=0.0))
+    corpus = synthetic_reports(reports)
+    for report in corpus:
+        report.pop("facts")
+        report["chunks"].append(BOILERPLATE)
+    await audit_vector_store.add_reports(corpus)
+
+    # Half the pack asks about follow-up, which pulls in the boilerplate
+    pack = [f"{q} How will Internal Audit track the open actions?" if i % 2 else q
+            for i, q in enumerate(committee_pack(questions))]
+    results = await audit_vector_store.search_many(pack, n_results=n_results)
+    builder = ContextBuilder(max_tokens=max_tokens)
+    start = time.perf_counter()
+    for chunks in results:
+        builder.build(chunks)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return {"reports": reports, "questions": questions, "n_results": n_results,
+            "build_ms_per_question": round(elapsed_ms / questions, 3),
+            **builder.stats()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--n-results", type=int, default=15)
+    parser.add_argument("--max-tokens", type=int, default=2500)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.reports, args.questions, args.n_results,
+                                      args.max_tokens)), indent=2))
@@ -0,0 +1,89 @@
+"""
+Filtered search benchmark: bitmap-index strategy vs always-filtered ANN.
+
+Indexes a synthetic corpus through AuditVectorStore, then runs dense
+searches under filters of decreasing selectivity twice:
+- "auto": the metadata-index strategy (exact scoring of small subsets)
+- "ann": filter_exact_max_chunks forced to 0, i.e. always a where-filtered
+  ANN query
+Completeness is the share of queries that got a full page; recall@k is
+against exact scoring of the filtered subset.
+
+Usage (from backend/):
+    python -m benchmarks.bench_filters --reports 500 --queries 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import isolate_environment, latency_summary, synthetic_reports
+
+isolate_environment(query_cache_enabled="false")
+
+from benchmarks import fake_openai  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.embedding_service import embedding_service  # noqa: E402
+from src.metadata_index import normalize_filters  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+FILTERS = {
+    "region": {"filter_region": "APAC"},
+    "region+year": {"filter_region": "APAC", "filter_year": 2024},
+    "severity_in+year_range": {"filter_severity": ["critical", "high"], "filter_year_min": 2024},
+    "region+year+severity": {"filter_region": "EMEA", "filter_year": 2023,
+                             "filter_severity": "low"},
+}
+
+
+async def run(vectors, k: int, filters: dict) -> tuple[list, list]:
+    latencies, results = [], []
+    for vector in vectors:
+        t = time.perf_counter()
+        chunks = await audit_vector_store.search("", n_results=k, query_embedding=vector,
+                                                 mode="dense", **filters)
+        latencies.append(time.perf_counter() - t)
+        results.append([c["chunk_id"] for c in chunks])
+    return latencies, results
+
+
+async def main(n_reports: int, n_queries: int, k: int) -> dict:
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(embed_latency=0, dim=256))
+    reports = synthetic_reports(n_reports, chunks_per_report=10)
+    await audit_vector_store.add_reports(
+        [{key: v for key, v in r.items() if key != "facts"} for r in reports])
+    questions = [f"{r['chunks'][0][:60]}" for r in reports[:n_queries]]
+    vectors = await embedding_service.embed_batch(questions)
+    total = await audit_vector_store.count_chunks()
+
+    out = {"chunks": total, "k": k, "filters": {}}
+    default_exact_max = settings.filter_exact_max_chunks
+    for name, filters in FILTERS.items():
+        matching = audit_vector_store.metadata_index.count(normalize_filters(
+            region=filters.get("filter_region"), severity=filters.get("filter_severity"),
+            year=filters.get("filter_year"), year_min=filters.get("filter_year_min")))
+        settings.filter_exact_max_chunks = 10 ** 12
+        _, truth = await run(vectors, k, filters)
+        row = {"matching_chunks": matching, "selectivity": round(matching / total, 4)}
+        for label, exact_max in (("auto", default_exact_max), ("ann", 0)):
+            settings.filter_exact_max_chunks = exact_max
+            latencies, results = await run(vectors, k, filters)
+            wanted = min(k, matching)
+            row[label] = {
+                "latency": latency_summary(latencies),
+                "full_pages": round(sum(len(r) == wanted for r in results) / len(results), 4),
+                f"recall_at_{k}": round(sum(len(set(r) & set(t)) / max(len(t), 1)
+                                            for r, t in zip(results, truth)) / len(results), 4),
+            }
+        out["filters"][name] = row
+    out["strategies_used"] = audit_vector_store.filter_strategies
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.reports, args.queries, args.k)), indent=2))
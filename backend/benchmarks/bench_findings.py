@@ -0,0 +1,112 @@
+"""
+Findings benchmark: structured finding questions via the findings table vs RAG.
+
+Ingests --reports synthetic reports (benchmarks.common.synthetic_report_text,
+--findings findings each) through process_audit_text and
+AuditVectorStore.add_reports, then asks the same structured questions
+("Which critical findings in APAC are due before March 2025?") twice:
+- structured: settings.structured_answers_enabled, answered from the
+  findings table (no embedding, no GPT call)
+- rag: the fast path off, so every question is embedded, retrieved and
+  sent to GPT
+Reported per mode: ask latency, upstream chat and embedding calls, and how
+many of the matching findings the answer's sources actually name (recall:
+RAG only sees the top --n-results chunks). FindingsStore.query latency is
+reported on its own.
+
+OpenAI is benchmarks.fake_openai (chat calls take --chat-latency seconds).
+
+Usage (from backend/):
+    python -m benchmarks.bench_findings --reports 500 --findings 6
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import REGIONS, SEVERITIES, isolate_environment, latency_summary, \
+    synthetic_report_text
+
+isolate_environment()
+
+from benchmarks import fake_openai  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.document_processor import process_audit_text  # noqa: E402
+from src.rag_service import audit_rag_service  # noqa: E402
+from src.structured_query import parse_findings_question  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+MONTHS = ["March", "June", "December"]
+
+
+def questions(n: int) -> list[str]:
+    asked = []
+    for i in range(n):
+        severity, region = SEVERITIES[i % 4], REGIONS[(i // 4) % 4]
+        month, year = MONTHS[(i // 16) % 3], 2024 + (i // 48) % 3
+        asked.append(f"Which {severity} findings in {region} are due before {month} {year}?")
+    return asked
+
+
+async def run(client, asked: list[str], expected: dict, n_results: int) -> dict:
+    chat_before, embed_before = client.chat.completions.calls, client.embeddings.calls
+    latencies, found, matching = [], 0, 0
+    for question in asked:
+        start = time.perf_counter()
+        answer = await audit_rag_service.answer_question(question, n_results=n_results)
+        latencies.append(time.perf_counter() - start)
+        named = {s.finding_id for s in answer.sources if s.finding_id}
+        found += len(named & expected[question])
+        matching += len(expected[question])
+    return {
+        "ask_latency": latency_summary(latencies),
+        "upstream_chat_calls": client.chat.completions.calls - chat_before,
+        "upstream_embedding_calls": client.embeddings.calls - embed_before,
+        "finding_recall": round(found / matching, 4) if matching else None,
+    }
+
+
+async def main(args) -> dict:
+    client = fake_openai.FakeAsyncOpenAI(embed_latency=0, chat_latency=args.chat_latency,
+                                         dim=args.dim)
+    fake_openai.install(client)
+    start = time.perf_counter()
+    for first in range(0, args.reports, 50):
+        batch = []
+        for number in range(first + 1, min(first + 50, args.reports) + 1):
+            chunks, meta = process_audit_text(synthetic_report_text(args.findings, number=number))
+            batch.append({"title": f"Synthetic {number:05d}.txt", "chunks": chunks,
+                          "region": meta["region"], "severity": meta["severity"],
+                          "year": meta["year"], "audit_type": meta["audit_type"],
+                          "findings": meta["findings"]})
+        await audit_vector_store.add_reports(batch)
+    ingest = time.perf_counter() - start
+
+    asked = questions(args.questions)
+    expected, query_latencies = {}, []
+    regions = audit_vector_store.findings.regions()
+    for question in asked:
+        query = parse_findings_question(question, regions)
+        start = time.perf_counter()
+        rows, _ = await audit_vector_store.query_findings(**query.filters())
+        query_latencies.append(time.perf_counter() - start)
+        expected[question] = {r["finding_id"] for r in rows[:settings.structured_answer_max_findings]}
+
+    out = {"config": vars(args), "ingest_seconds": round(ingest, 2),
+           "findings": audit_vector_store.findings.stats(),
+           "query_latency": latency_summary(query_latencies)}
+    for enabled, label in ((True, "structured"), (False, "rag")):
+        settings.structured_answers_enabled = enabled
+        out[label] = await run(client, asked, expected, args.n_results)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--findings", type=int, default=6)
+    parser.add_argument("--questions", type=int, default=48)
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--chat-latency", type=float, default=0.3)
+    parser.add_argument("--dim", type=int, default=256)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
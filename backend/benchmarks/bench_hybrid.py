@@ -0,0 +1,82 @@
+"""
+Hybrid retrieval benchmark: dense vs lexical vs hybrid (RRF) search.
+
+Indexes a synthetic corpus (benchmarks.common.synthetic_reports) and runs
+two query sets through AuditVectorStore.search in each mode:
+- identifier queries ("status of F-2024-00042"): hit@k, the chunk holding
+  that ID must be in the top k
+- topic queries ("segregation of duties issues"): precision@k, share of
+  the top k chunks about that topic
+
+Embeddings come from benchmarks.fake_openai (hashed bag-of-words), so dense
+numbers are a stand-in for a real model; latencies exclude the embedding
+call (query vectors are computed up front) and the retrieval cache is off.
+
+Usage (from backend/):
+    python -m benchmarks.bench_hybrid --reports 200 --queries 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import TOPICS, isolate_environment, latency_summary, synthetic_reports
+
+isolate_environment(query_cache_enabled="false")
+
+from benchmarks import fake_openai  # noqa: E402
+from src.embedding_service import embedding_service  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+MODES = ("dense", "lexical", "hybrid")
+
+
+async def main(n_reports: int, n_queries: int, k: int) -> dict:
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(embed_latency=0, dim=256))
+    reports = synthetic_reports(n_reports)
+    start = time.perf_counter()
+    await audit_vector_store.add_reports(
+        [{key: v for key, v in r.items() if key != "facts"} for r in reports])
+    index_seconds = time.perf_counter() - start
+
+    rng = random.Random(11)
+    facts = [f for r in reports for f in r["facts"]]
+    id_queries = [(f"What is the status of finding {f['finding_id']}?", f["finding_id"])
+                  for f in rng.sample(facts, min(n_queries, len(facts)))]
+    topic_queries = [(f"{topic} issues", topic) for topic in TOPICS]
+    vectors = await embedding_service.embed_batch([q for q, _ in id_queries + topic_queries])
+    id_vectors, topic_vectors = vectors[:len(id_queries)], vectors[len(id_queries):]
+
+    results = {}
+    for mode in MODES:
+        latencies, hits, precision = [], 0, []
+        for (query, finding_id), vector in zip(id_queries, id_vectors):
+            t = time.perf_counter()
+            chunks = await audit_vector_store.search(query, n_results=k, query_embedding=vector,
+                                                     mode=mode)
+            latencies.append(time.perf_counter() - t)
+            hits += any(finding_id in c["text"] for c in chunks)
+        for (query, topic), vector in zip(topic_queries, topic_vectors):
+            t = time.perf_counter()
+            chunks = await audit_vector_store.search(query, n_results=k, query_embedding=vector,
+                                                     mode=mode)
+            latencies.append(time.perf_counter() - t)
+            precision.append(sum(topic in c["text"] for c in chunks) / k)
+        results[mode] = {
+            f"identifier_hit_at_{k}": round(hits / len(id_queries), 4),
+            f"topic_precision_at_{k}": round(sum(precision) / len(precision), 4),
+            "latency": latency_summary(latencies),
+        }
+    return {"reports": n_reports, "chunks": await audit_vector_store.count_chunks(),
+            "index_seconds": round(index_seconds, 2),
+            "lexical_index": audit_vector_store.lexical_index.stats(), **results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.reports, args.queries, args.k)), indent=2))
@@ -0,0 +1,80 @@
+"""
+Metadata extraction benchmark: the original extract_audit_metadata() vs
+the compiled rule engine on long synthetic reports.
+
+- legacy: four re.search calls over the whole text, reproduced here
+- rules: MetadataExtractor.extract() — report fields from the header in
+  one pass, plus every finding (id, severity, owner, deadline)
+
+Two shapes of report: "complete" has every header field, so legacy stops
+early; "sparse" has no Date or Severity Classification line, so legacy
+scans the whole document for each missing field (as with most PDFs that
+don't follow the template).
+
+Usage (from backend/):
+    python -m benchmarks.bench_metadata --findings 200 2000
+"""
+import argparse
+import json
+import re
+import time
+from datetime import datetime
+
+from benchmarks.common import isolate_environment, latency_summary, synthetic_report_text
+
+isolate_environment()
+
+from src.metadata_extractor import MetadataExtractor  # noqa: E402
+
+
+def legacy_extract(text: str) -> dict:
+    metadata = {"region": None, "severity": None, "audit_type": None, "year": datetime.now().year}
+    region_match = re.search(r'Region:\s*([^\n]+)', text)
+    if region_match:
+        metadata["region"] = region_match.group(1).strip()[:50]
+    sev_match = re.search(r'Severity Classification:\s*(Critical|High|Medium|Low|Info)',
+                          text, re.IGNORECASE)
+    if sev_match:
+        metadata["severity"] = sev_match.group(1).lower()
+    type_match = re.search(r'Audit Type:\s*([^\n]+)', text)
+    if type_match:
+        metadata["audit_type"] = type_match.group(1).strip()[:100]
+    year_match = re.search(r'Date:.*?(20\d{2})', text)
+    if year_match:
+        metadata["year"] = int(year_match.group(1))
+    return metadata
+
+
+def timed(fn, text: str, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        samples.append(time.perf_counter() - start)
+    return latency_summary(samples)
+
+
+def main(finding_counts: list[int], repeat: int) -> dict:
+    extractor = MetadataExtractor()
+    header_only = MetadataExtractor(finding_rules=())
+    out = {}
+    for findings in finding_counts:
+        for complete in (True, False):
+            text = synthetic_report_text(findings, complete=complete)
+            result = extractor.extract(text)
+            assert len(result["findings"]) == findings
+            out[f"{findings}_findings_{'complete' if complete else 'sparse'}"] = {
+                "bytes": len(text),
+                "legacy": timed(legacy_extract, text, repeat),
+                "rules_header_only": timed(header_only.extract, text, repeat),
+                "rules_with_findings": timed(extractor.extract, text, repeat),
+            }
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--findings", type=int, nargs="+", default=[200, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(main(args.findings, args.repeat), indent=2))
@@ -0,0 +1,86 @@
+"""
+Diversity reranking benchmark: MMR on vs off at n_results=15.
+
+Indexes a synthetic corpus (benchmarks.common.synthetic_reports: every
+chunk of one topic reads almost the same) and runs the topic queries
+through AuditVectorStore.search with each --lambdas value and report cap.
+Reported per setting:
+- search latency (query vectors computed up front, retrieval cache off)
+- redundancy: mean pairwise cosine similarity of the returned chunks
+- distinct reports among the results
+- topic precision: share of results about the queried topic
+
+lambda 1.0 with no cap is today's plain relevance order (no over-fetch).
+Set VECTOR_BACKEND=local to measure the local index instead of Chroma.
+
+Usage (from backend/):
+    python -m benchmarks.bench_mmr --reports 300 --k 15
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+from benchmarks.common import TOPICS, isolate_environment, latency_summary, synthetic_reports
+
+isolate_environment(query_cache_enabled="false")
+
+import numpy as np  # noqa: E402
+from benchmarks import fake_openai  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.embedding_service import embedding_service  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+
+def redundancy(texts: list[str]) -> float:
+    vectors = np.array([fake_openai.fake_embedding(t, 256) for t in texts])
+    sims = vectors @ vectors.T
+    pairs = len(texts) * (len(texts) - 1)
+    return float((sims.sum() - np.trace(sims)) / pairs) if pairs else 0.0
+
+
+async def run(queries, vectors, k: int, mode: str, lambda_: float, cap: int, rounds: int) -> dict:
+    latencies, overlap, reports, precision = [], [], [], []
+    for _ in range(rounds):
+        for (query, topic), vector in zip(queries, vectors):
+            start = time.perf_counter()
+            chunks = await audit_vector_store.search(query, n_results=k, query_embedding=vector,
+                                                     mode=mode, mmr_lambda=lambda_,
+                                                     max_per_report=cap)
+            latencies.append(time.perf_counter() - start)
+            overlap.append(redundancy([c["text"] for c in chunks]))
+            reports.append(len({c["report_id"] for c in chunks}))
+            precision.append(sum(topic in c["text"] for c in chunks) / max(1, len(chunks)))
+    return {"latency": latency_summary(latencies),
+            "redundancy": round(float(np.mean(overlap)), 4),
+            "distinct_reports": round(float(np.mean(reports)), 2),
+            "topic_precision": round(float(np.mean(precision)), 4)}
+
+
+async def main(args) -> dict:
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(embed_latency=0, dim=args.dim))
+    reports = synthetic_reports(args.reports)
+    await audit_vector_store.add_reports(
+        [{key: v for key, v in r.items() if key != "facts"} for r in reports])
+    queries = [(f"{topic} issues", topic) for topic in TOPICS]
+    vectors = await embedding_service.embed_batch([q for q, _ in queries])
+
+    out = {"config": vars(args), "backend": settings.vector_backend, "results": {}}
+    for mode, lambda_, cap in itertools.product(args.modes, args.lambdas, args.caps):
+        label = f"{mode} lambda={lambda_} cap={cap}"
+        out["results"][label] = await run(queries, vectors, args.k, mode, lambda_, cap,
+                                          args.rounds)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=300)
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--modes", nargs="+", default=["dense", "hybrid"])
+    parser.add_argument("--lambdas", nargs="+", type=float, default=[1.0, 0.7, 0.5])
+    parser.add_argument("--caps", nargs="+", type=int, default=[0, 3])
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,92 @@
+"""
+PDF extraction benchmark: synthetic large PDFs through three extractors.
+
+- legacy: the original extract_text_from_pdf (BytesIO, extract_text()
+  called twice per page), reproduced here for comparison
+- in_memory: the current extract_text_from_pdf (one pass, still BytesIO)
+- streamed: process_audit_pdf on a temp file — memory-mapped, page ranges
+  extracted in a spawn process pool, chunked in page order as they arrive
+
+Each run happens in a fresh process so peak RSS (ru_maxrss of the run and,
+separately, of its largest pool worker) belongs to that extractor alone.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf --pages 100 500
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.common import isolate_environment, synthetic_pdf
+
+isolate_environment()
+
+
+def legacy_extract(content: bytes) -> str:
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    return "\n\n".join(
+        f"[Page {i+1}]\n{page.extract_text()}"
+        for i, page in enumerate(reader.pages)
+        if page.extract_text()
+    )
+
+
+def run_variant(variant: str, path: str, workers: int, pages_per_task: int) -> dict:
+    """Runs in its own process: time one extraction + chunking."""
+    from src.document_processor import (extract_audit_metadata, chunk_text, extract_text_from_pdf,
+                                        process_audit_pdf)
+    start = time.perf_counter()
+    if variant == "streamed":
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        pool.submit(os.getpid).result()  # Workers are long-lived in the app: exclude start-up
+        start = time.perf_counter()
+        chunks, _ = process_audit_pdf(path, pool, pages_per_task)
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+    else:
+        with open(path, "rb") as f:
+            content = f.read()
+        text = legacy_extract(content) if variant == "legacy" else extract_text_from_pdf(content)
+        chunks = chunk_text(text)
+        extract_audit_metadata(text)
+        elapsed = time.perf_counter() - start
+    return {"seconds": round(elapsed, 3), "chunks": len(chunks),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "worker_peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)}
+
+
+def main(page_counts: list[int], workers: int, pages_per_task: int) -> dict:
+    out = {"workers": workers, "pages_per_task": pages_per_task, "pdfs": {}}
+    ctx = multiprocessing.get_context("spawn")
+    for pages in page_counts:
+        content = synthetic_pdf(pages)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(content)
+        row = {"bytes": len(content)}
+        try:
+            for variant in ("legacy", "in_memory", "streamed"):
+                with ProcessPoolExecutor(1, mp_context=ctx) as runner:
+                    row[variant] = runner.submit(run_variant, variant, f.name, workers,
+                                                 pages_per_task).result()
+        finally:
+            os.unlink(f.name)
+        row["speedup_vs_legacy"] = round(row["legacy"]["seconds"] / row["streamed"]["seconds"], 1)
+        out["pdfs"][f"{pages}_pages"] = row
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(main(args.pages, args.workers, args.pages_per_task), indent=2))
@@ -0,0 +1,121 @@
+"""
+Compact vector storage benchmark: float32 vs float16 vs int8 in the local index.
+
+Builds one LocalVectorIndex per storage mode from the same vectors and
+reports, per mode and --rescore multiplier:
+- search matrix size (what a query scans, and what has to stay in RAM)
+  next to the float32 matrix kept on disk for rescoring
+- query latency
+- recall@k against exact float32 search over full-size vectors, which is
+  what the index returns today (and the ceiling for Chroma's HNSW, see
+  bench_backends)
+
+--dims also shortens the vectors, as the embeddings API `dimensions`
+parameter does (truncate, then renormalise). Synthetic clustered vectors
+carry no more information in their first dimensions than in their last,
+unlike text-embedding-3 vectors, so their recall says little about
+shortening: pass real embeddings with --vectors (an (n, 1536) .npy file)
+to measure that. The storage-mode numbers are meaningful either way.
+
+Usage (from backend/):
+    python -m benchmarks.bench_quantization --rows 100000 --dims 1536 512
+    python -m benchmarks.bench_quantization --vectors embeddings.npy --dims 1536 768 512
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import isolate_environment, latency_summary
+
+isolate_environment()
+
+import numpy as np  # noqa: E402
+from benchmarks.bench_backends import cluster_centers, recall  # noqa: E402
+from src.local_index import LocalVectorIndex  # noqa: E402
+
+BATCH = 20_000
+
+
+def load_vectors(path: str, rows: int, dim: int, n_queries: int, seed: int = 0):
+    """(corpus, queries): real embeddings from `path`, or synthetic clusters."""
+    rng = np.random.default_rng(seed)
+    if path:
+        data = np.load(path, mmap_mode="r")
+        picked = rng.permutation(len(data))[:rows + n_queries]
+        data = np.asarray(data[np.sort(picked)], dtype=np.float32)
+        return data[n_queries:], data[:n_queries]
+    centers = cluster_centers(dim, seed)
+    labels = rng.integers(0, len(centers), size=rows + n_queries)
+    data = centers[labels] + 0.35 * rng.normal(size=(rows + n_queries, dim)).astype(np.float32)
+    return data[n_queries:], data[:n_queries]
+
+
+def shorten(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """What `dimensions=dim` returns: the leading components, renormalised."""
+    short = vectors[:, :dim]
+    return short / np.linalg.norm(short, axis=1, keepdims=True)
+
+
+def build(directory: str, vectors: np.ndarray, storage: str) -> tuple[LocalVectorIndex, float]:
+    index = LocalVectorIndex(directory, storage=storage)
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), BATCH):
+        part = vectors[offset:offset + BATCH]
+        ids = [f"c{offset + i}" for i in range(len(part))]
+        index.add(ids=ids, embeddings=part, documents=[""] * len(ids), metadatas=[{}] * len(ids))
+    return index, time.perf_counter() - start
+
+
+def run_queries(index: LocalVectorIndex, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for q in queries:
+        t = time.perf_counter()
+        out = index.query(query_embeddings=[q], n_results=k, include=["distances"])
+        latencies.append(time.perf_counter() - t)
+        results.append(out["ids"][0])
+    return latencies, results
+
+
+def main(args) -> dict:
+    corpus, queries = load_vectors(args.vectors, args.rows, max(args.dims), args.queries)
+    root = tempfile.mkdtemp(prefix="bench_quantization_")
+    full_dim = corpus.shape[1]
+    truth = None
+    report = {"rows": len(corpus), "k": args.k, "queries": len(queries),
+              "vectors": args.vectors or "synthetic", "runs": []}
+    for dim in sorted(args.dims, reverse=True):
+        data, probe = (corpus, queries) if dim == full_dim else (shorten(corpus, dim),
+                                                                 shorten(queries, dim))
+        for storage in ("float32", "float16", "int8"):
+            index, build_seconds = build(os.path.join(root, f"{dim}_{storage}"), data, storage)
+            stats = index.stats()
+            for rescore in ([1] if storage == "float32" else args.rescore):
+                index.rescore = rescore
+                latencies, results = run_queries(index, probe, args.k)
+                if truth is None:
+                    truth = results  # float32, full size: today's results
+                report["runs"].append({
+                    "dim": dim, "storage": storage,
+                    "rescore": rescore if storage != "float32" else None,
+                    "search_matrix_mb": stats["search_matrix_mb"],
+                    "full_precision_mb": stats["full_precision_mb"],
+                    "insert_rows_per_s": round(len(data) / build_seconds),
+                    "query": latency_summary(latencies),
+                    f"recall_at_{args.k}": recall(results, truth),
+                })
+                print(json.dumps(report["runs"][-1]), flush=True)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, nargs="+", default=[1536, 512])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, nargs="+", default=[1, 4, 10],
+                        help="Candidates rescored in float32, as multiples of k")
+    parser.add_argument("--vectors", help="Real embeddings (.npy, one row per chunk)")
+    print(json.dumps(main(parser.parse_args()), indent=2))
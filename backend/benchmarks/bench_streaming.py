@@ -0,0 +1,90 @@
+"""
+Streaming benchmark: time-to-first-byte of /intelligence/ask vs /ask/stream.
+
+The buffered endpoint can only respond once GPT has finished; the SSE
+endpoint sends the sources right after retrieval and the answer while it is
+generated. OpenAI is replaced by benchmarks.fake_openai, whose streamed
+answer is spread over the configured chat latency. Caches are disabled so
+every request really runs retrieval + generation.
+
+The app is served by a real uvicorn server on a local port: httpx's ASGI
+transport buffers whole responses, which would hide the streaming.
+
+Usage (from backend/):
+    python -m benchmarks.bench_streaming --requests 20 --chat-latency 2.0
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import isolate_environment, latency_summary, sample_reports
+
+isolate_environment(query_cache_enabled="false", semantic_cache_enabled="false")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from benchmarks import fake_openai  # noqa: E402
+from benchmarks.bench_concurrency import QUESTIONS, seed_index  # noqa: E402
+from src.main import app  # noqa: E402
+
+
+async def buffered(client: httpx.AsyncClient, payload: dict, samples: dict) -> None:
+    start = time.perf_counter()
+    first_byte = None
+    async with client.stream("POST", "/intelligence/ask", json=payload) as resp:
+        async for _ in resp.aiter_bytes():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+    samples["first_byte"].append(first_byte)
+    samples["total"].append(time.perf_counter() - start)
+
+
+async def streamed(client: httpx.AsyncClient, payload: dict, samples: dict) -> None:
+    start = time.perf_counter()
+    first_byte = first_token = None
+    async with client.stream("POST", "/intelligence/ask/stream", json=payload) as resp:
+        async for line in resp.aiter_lines():
+            now = time.perf_counter() - start
+            if first_byte is None:
+                first_byte = now
+            if line == "event: answer_delta" and first_token is None:
+                first_token = now
+    samples["first_byte"].append(first_byte)
+    samples["first_answer_token"].append(first_token)
+    samples["total"].append(time.perf_counter() - start)
+
+
+async def main(requests: int, chat_latency: float, port: int) -> dict:
+    if not sample_reports():
+        raise SystemExit("No sample reports found")
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(embed_latency=0.02, chat_latency=chat_latency))
+    await seed_index()
+
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    results = {}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            for name, run in (("ask", buffered), ("ask_stream", streamed)):
+                samples = {"first_byte": [], "first_answer_token": [], "total": []}
+                for i in range(requests):
+                    payload = {"question": QUESTIONS[i % len(QUESTIONS)], "n_results": 5}
+                    await run(client, payload, samples)
+                results[name] = {k: latency_summary(v) for k, v in samples.items() if v}
+    finally:
+        server.should_exit = True
+        await serving
+    return {"requests": requests, "chat_latency_s": chat_latency, **results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--chat-latency", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.requests, args.chat_latency, args.port)), indent=2))
@@ -0,0 +1,234 @@
+"""
+Release benchmark suite: one JSON document per run, to diff between releases.
+
+Everything runs offline against a fresh temporary data directory, with
+OpenAI replaced by benchmarks.fake_openai (deterministic vectors, fixed
+latencies), so the numbers measure our own code paths:
+- ingest: whole synthetic reports (common.synthetic_report_text, modelled
+  on sample_reports/) through process_audit_text() + add_report() —
+  reports/s, chunks/s and MB/s
+- search: AuditVectorStore.search() latency, unfiltered and filtered, as
+  the corpus grows through --sizes (total chunks)
+- ask: POST /intelligence/ask through the real FastAPI app (in-process
+  ASGI transport) at each --concurrency level. Query caches are off, so
+  every request runs the whole pipeline
+- memory: the process's peak RSS after each section (ru_maxrss only grows,
+  so each section reports the high-water mark up to and including it)
+
+--compare BASELINE.json lists every p50/p90 latency, throughput or memory
+figure that got worse by more than --tolerance, and exits with status 1
+when there is one, so the suite can gate a release.
+
+Usage (from backend/):
+    python -m benchmarks.bench_suite --output bench-1.4.json
+    python -m benchmarks.bench_suite --quick --compare bench-1.4.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.common import (isolate_environment, latency_summary, synthetic_report_text,
+                               synthetic_reports, REGIONS, TOPICS)
+
+isolate_environment(query_cache_enabled=False, semantic_cache_enabled=False)
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+from benchmarks import fake_openai  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.document_processor import process_audit_text  # noqa: E402
+from src.embedding_service import embedding_service  # noqa: E402
+from src.main import app  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+QUESTIONS = [
+    "What critical findings were raised in {region}?",
+    "Which {topic} findings have deadlines next year?",
+    "Summarise {topic} issues across reports.",
+    "Who owns the open {topic} remediation in {region}?",
+]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def question(i: int) -> str:
+    return QUESTIONS[i % len(QUESTIONS)].format(region=REGIONS[i % len(REGIONS)],
+                                                topic=TOPICS[i % len(TOPICS)])
+
+
+# ── SECTIONS ─────────────────────────────────────────────
+async def bench_ingest(n_reports: int, findings: int) -> dict:
+    texts = [synthetic_report_text(findings, number=i) for i in range(n_reports)]
+    chunk_count = 0
+    start = time.perf_counter()
+    for i, text in enumerate(texts):
+        chunks, meta = process_audit_text(text)
+        await audit_vector_store.add_report(
+            f"Suite_Report_{i:05d}.txt", chunks, region=meta["region"], severity=meta["severity"],
+            audit_type=meta["audit_type"], year=meta["year"])
+        chunk_count += len(chunks)
+    seconds = time.perf_counter() - start
+    megabytes = sum(len(t.encode()) for t in texts) / 1e6
+    return {
+        "reports": n_reports,
+        "chunks": chunk_count,
+        "seconds": round(seconds, 3),
+        "reports_per_s": round(n_reports / seconds, 2),
+        "chunks_per_s": round(chunk_count / seconds, 1),
+        "mb_per_s": round(megabytes / seconds, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def bench_search(sizes: list[int], n_queries: int, k: int) -> dict:
+    vectors = await embedding_service.embed_batch([question(i) for i in range(n_queries)])
+    out = {}
+    for step, size in enumerate(sorted(sizes)):
+        missing = size - await audit_vector_store.count_chunks()
+        if missing > 0:
+            corpus = synthetic_reports(-(-missing // 20), chunks_per_report=20, seed=step)
+            for report in corpus:
+                report["title"] = f"Suite_Step{step}_{report['title']}"
+                del report["facts"]
+            await audit_vector_store.add_reports(corpus)
+        row = {"chunks": await audit_vector_store.count_chunks()}
+        for label, filters in (("unfiltered", {}), ("region", {"filter_region": "APAC"})):
+            latencies = []
+            for i, vector in enumerate(vectors):
+                t = time.perf_counter()
+                await audit_vector_store.search(question(i), n_results=k,
+                                                query_embedding=vector, **filters)
+                latencies.append(time.perf_counter() - t)
+            row[label] = latency_summary(latencies)
+        row["peak_rss_mb"] = peak_rss_mb()
+        out[str(size)] = row
+    return out
+
+
+async def bench_ask(levels: list[int], requests: int) -> dict:
+    out = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 timeout=600) as client:
+        for level in levels:
+            latencies: list[float] = []
+            counter = iter(range(requests))
+
+            async def worker():
+                for i in counter:
+                    payload = {"question": f"{question(i)} (run {level}-{i})", "n_results": 5}
+                    t = time.perf_counter()
+                    resp = await client.post("/intelligence/ask", json=payload)
+                    latencies.append(time.perf_counter() - t)
+                    resp.raise_for_status()
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(level)))
+            wall = time.perf_counter() - start
+            out[str(level)] = {"requests": requests, "requests_per_s": round(requests / wall, 2),
+                               "latency": latency_summary(latencies),
+                               "peak_rss_mb": peak_rss_mb()}
+    return out
+
+
+# ── REGRESSIONS ──────────────────────────────────────────
+def _flatten(data, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_ms: float) -> list[dict]:
+    """Figures worse than the baseline by more than `tolerance` (0.25 = 25%)."""
+    now, before = _flatten(current["results"]), _flatten(baseline["results"])
+    regressions = []
+    for path, old in before.items():
+        new = now.get(path)
+        if new is None or not old:
+            continue
+        name = path.rsplit(".", 1)[-1]
+        if name in ("p50_ms", "p90_ms", "peak_rss_mb"):
+            if name != "peak_rss_mb" and max(old, new) < min_ms:
+                continue  # Sub-millisecond timings are mostly noise
+            change = new / old - 1
+        elif name.endswith("_per_s"):
+            change = old / new - 1 if new else float("inf")
+        else:
+            continue
+        if change > tolerance:
+            regressions.append({"metric": path, "baseline": old, "current": new,
+                                "worse_by": f"{change:.0%}"})
+    return regressions
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "numpy": np.__version__, "vector_backend": settings.vector_backend,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+async def main(args) -> dict:
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(
+        embed_latency=args.embed_latency, chat_latency=args.chat_latency, dim=args.dim))
+    results = {"ingest": await bench_ingest(args.reports, args.findings)}
+    results["search"] = await bench_search(args.sizes, args.queries, args.k)
+    results["ask"] = await bench_ask(args.concurrency, args.requests)
+    results["peak_rss_mb"] = peak_rss_mb()
+    return {"benchmark": "suite", "environment": environment(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=200, help="Reports in the ingest section")
+    parser.add_argument("--findings", type=int, default=6, help="Findings per ingested report")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 20_000, 50_000],
+                        help="Corpus sizes (total chunks) for the search section")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Asks per concurrency level")
+    parser.add_argument("--dim", type=int, default=256, help="Fake embedding dimensions")
+    parser.add_argument("--chat-latency", type=float, default=0.05)
+    parser.add_argument("--embed-latency", type=float, default=0.005)
+    parser.add_argument("--quick", action="store_true", help="Small sizes, for a smoke run")
+    parser.add_argument("--output", help="Also write the JSON here")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-ms", type=float, default=1.0,
+                        help="Ignore latencies below this in both runs")
+    args = parser.parse_args()
+    if args.quick:
+        args.reports, args.sizes, args.queries = 20, [1_000, 3_000], 20
+        args.concurrency, args.requests = [1, 8], 40
+
+    report = asyncio.run(main(args))
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance, args.min_ms)
+        print(f"{len(report['regressions'])} regression(s) against {args.compare}", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(1 if report.get("regressions") else 0)
@@ -0,0 +1,100 @@
+"""
+Theme index benchmark: clustering cost at ingest and /intelligence/themes latency.
+
+Ingests a synthetic corpus (benchmarks.common.synthetic_reports, one topic
+per chunk) in --batch-reports batches through AuditVectorStore.add_reports
+and reports:
+- themes() latency (what /intelligence/themes serves), cold (first call
+  after a write) and warm (cached)
+- per --themes count, replaying the same batches: time spent assigning
+  one batch to themes, and purity, the share of chunks whose theme's most
+  common topic is their own (how well the 12 synthetic topics come back)
+
+Embeddings come from benchmarks.fake_openai (hashed bag-of-words), so
+chunks about the same topic share most of their vector.
+
+Usage (from backend/):
+    python -m benchmarks.bench_themes --reports 1000 --themes 12 24
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+from benchmarks.common import isolate_environment, latency_summary, synthetic_reports
+
+isolate_environment()
+
+import numpy as np  # noqa: E402
+from benchmarks import fake_openai  # noqa: E402
+from src.theme_index import ThemeIndex  # noqa: E402
+from src.vector_store import audit_vector_store  # noqa: E402
+
+
+def purity(index: ThemeIndex, topic_of: dict) -> float:
+    members: dict[int, Counter] = {}
+    for chunk_id, entry in index._chunks.items():
+        members.setdefault(entry[0], Counter())[topic_of[chunk_id]] += 1
+    return round(sum(c.most_common(1)[0][1] for c in members.values()) / len(topic_of), 4)
+
+
+def replay(batches: list, n_themes: int, topic_of: dict) -> dict:
+    """The ingest-time work alone: every batch through a fresh ThemeIndex."""
+    index, times = ThemeIndex(n_themes=n_themes), []
+    for ids, vectors, metadatas in batches:
+        start = time.perf_counter()
+        index.add(ids, vectors, metadatas)
+        times.append(time.perf_counter() - start)
+    return {"assign_per_batch": latency_summary(times), "themes": index.stats()["themes"],
+            "purity": purity(index, topic_of)}
+
+
+async def main(args) -> dict:
+    fake_openai.install(fake_openai.FakeAsyncOpenAI(embed_latency=0, dim=args.dim))
+    reports = synthetic_reports(args.reports)
+    for i in range(0, len(reports), args.batch_reports):
+        await audit_vector_store.add_reports(
+            [{k: v for k, v in r.items() if k != "facts"} for r in reports[i:i + args.batch_reports]])
+
+    cold, warm = [], []
+    for _ in range(5):
+        audit_vector_store.theme_index.delete([])  # Any write drops the cached summary
+        start = time.perf_counter()
+        await audit_vector_store.themes()
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        await audit_vector_store.themes()
+        warm.append(time.perf_counter() - start)
+    out = {"config": vars(args), "chunks": len(audit_vector_store.theme_index),
+           "endpoint": {"cold": latency_summary(cold), "warm": latency_summary(warm)}}
+
+    # Same batches, same vectors, straight into a ThemeIndex per theme count
+    found = await asyncio.to_thread(audit_vector_store.collection.get,
+                                    include=["embeddings", "metadatas"])
+    row_of = {chunk_id: i for i, chunk_id in enumerate(found["ids"])}
+    topic_of, batches = {}, []
+    by_title = {r["title"]: r for r in reports}
+    order = sorted(row_of, key=lambda c: (found["metadatas"][row_of[c]]["report_title"],
+                                          found["metadatas"][row_of[c]]["chunk_index"]))
+    for chunk_id in order:
+        meta = found["metadatas"][row_of[chunk_id]]
+        topic_of[chunk_id] = by_title[meta["report_title"]]["facts"][meta["chunk_index"]]["topic"]
+    per_batch = args.batch_reports * len(reports[0]["chunks"])
+    for i in range(0, len(order), per_batch):
+        ids = order[i:i + per_batch]
+        rows = [row_of[c] for c in ids]
+        batches.append((ids, np.asarray([found["embeddings"][r] for r in rows]),
+                        [found["metadatas"][r] for r in rows]))
+    for n_themes in args.themes:
+        out[f"themes={n_themes}"] = replay(batches, n_themes, topic_of)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--batch-reports", type=int, default=10)
+    parser.add_argument("--themes", nargs="+", type=int, default=[12, 24])
+    parser.add_argument("--dim", type=int, default=256)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
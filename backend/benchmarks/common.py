@@ -0,0 +1,178 @@
+"""
+Shared benchmark helpers.
+
+Call isolate_environment() BEFORE importing anything from src: settings and
+the service singletons are created at import time, and benchmarks must never
+touch the real Chroma data or the embedding cache.
+"""
+import os
+import statistics
+import tempfile
+from pathlib import Path
+
+SAMPLE_DIR = Path(__file__).resolve().parents[2] / "sample_reports"
+
+
+def isolate_environment(**overrides) -> str:
+    data_dir = tempfile.mkdtemp(prefix="audit_rag_bench_")
+    os.environ["CHROMA_PATH"] = data_dir
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "false")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    for key, value in overrides.items():
+        os.environ[key.upper()] = str(value)
+    return data_dir
+
+
+def latency_summary(samples: list[float]) -> dict:
+    """p50/p90/p99/max in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(pct(0.50) * 1000, 2),
+        "p90_ms": round(pct(0.90) * 1000, 2),
+        "p99_ms": round(pct(0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def sample_reports() -> list[tuple[str, bytes]]:
+    """(filename, content) for every non-empty report in sample_reports/."""
+    reports = [(p.name, p.read_bytes()) for p in sorted(SAMPLE_DIR.glob("*.txt"))]
+    return [(name, content) for name, content in reports if content.strip()]
+
+
+TOPICS = [
+    "reconciliation delay", "privileged access review", "AML transaction monitoring",
+    "vendor onboarding due diligence", "change management approval", "data retention policy",
+    "business continuity testing", "segregation of duties", "KYC refresh backlog",
+    "model validation gap", "cloud configuration drift", "payment fraud controls",
+]
+REGIONS = ["APAC", "EMEA", "Americas", "LATAM"]
+SEVERITIES = ["critical", "high", "medium", "low"]
+
+
+def synthetic_reports(n_reports: int, chunks_per_report: int = 20, seed: int = 7) -> list[dict]:
+    """
+    Deterministic audit-like corpus for retrieval benchmarks.
+    Every chunk carries a unique finding ID (F-<year>-<n>) and control
+    number (CTRL-<n>); chunk["topic"] records its subject so relevance can
+    be judged without labels. Returns add_reports()-style dicts plus a
+    parallel "facts" list per report.
+    """
+    import random
+    rng = random.Random(seed)
+    reports, n = [], 0
+    for r in range(n_reports):
+        region, severity = rng.choice(REGIONS), rng.choice(SEVERITIES)
+        year = rng.choice([2023, 2024, 2025])
+        chunks, facts = [], []
+        for _ in range(chunks_per_report):
+            n += 1
+            topic = rng.choice(TOPICS)
+            finding_id, control = f"F-{year}-{n:05d}", f"CTRL-{10000 + n}"
+            chunks.append(
+                f"Finding {finding_id}: {topic} identified in {region} operations. "
+                f"Control {control} was rated {severity}; management agreed to remediate "
+                f"the {topic} issue by Q{rng.randint(1, 4)} {year + 1}. "
+                f"Responsible party: {rng.choice(['Finance', 'IT', 'Compliance', 'Operations'])}."
+            )
+            facts.append({"finding_id": finding_id, "control": control, "topic": topic})
+        reports.append({"title": f"Synthetic_{r:05d}.txt", "chunks": chunks, "region": region,
+                        "severity": severity, "audit_type": "synthetic", "year": year,
+                        "facts": facts})
+    return reports
+
+
+def synthetic_report_text(findings: int = 6, seed: int = 7, number: int = 1,
+                          complete: bool = True) -> str:
+    """
+    A whole report in the sample_reports/ template: the metadata header,
+    an executive summary, then "FINDING n: SEVERITY — TOPIC" blocks with
+    title, severity, region, owner, deadline and a few paragraphs each.
+    complete=False leaves out the Date and Severity Classification lines,
+    like the many PDFs that don't follow the template.
+    """
+    import random
+    rng = random.Random(seed * 100_003 + number)
+    region, year = rng.choice(REGIONS), rng.choice([2023, 2024, 2025])
+    header = ["INTERNAL AUDIT REPORT", f"Report Reference: IA-{year}-BENCH-{number:05d}",
+              f"Region: {region}", "Audit Type: Synthetic"]
+    if complete:
+        header += [f"Date: September 30, {year}",
+                   f"Severity Classification: {rng.choice(SEVERITIES).capitalize()}"]
+    parts = ["\n".join(header),
+             f"EXECUTIVE SUMMARY\nThe {year} audit of {region} operations identified "
+             f"{findings} findings across {rng.randint(2, 6)} business units."]
+    for n in range(1, findings + 1):
+        topic, severity = rng.choice(TOPICS), rng.choice(SEVERITIES)
+        parts.append(
+            f"FINDING {n}: {severity.upper()} — {topic.upper()}\n"
+            f"Finding Title: {topic.capitalize()} in {rng.choice(REGIONS)}\n"
+            f"Severity: {severity.capitalize()}\n"
+            f"Region: {region}\n"
+            f"Responsible Party: {rng.choice(['Finance', 'IT', 'Compliance', 'Operations'])} — Owner {n}\n"
+            f"Deadline: March {rng.randint(1, 28)}, {year + 1}\n"
+            f"Description: " + f"The {topic} control was not operating effectively. " * 8 + "\n"
+            f"Root Cause: Manual {topic} process with no automated check.\n"
+            f"Recommendation: Automate the {topic} control and add a monthly review."
+        )
+    return "\n\n".join(parts)
+
+
+def synthetic_pdf(pages: int, paragraphs_per_page: int = 6, seed: int = 7) -> bytes:
+    """
+    A text PDF of audit-like paragraphs, written by hand (no PDF library
+    needed). Page 1 starts with the metadata header the extractor looks
+    for; every page after that holds findings, one paragraph per block.
+    """
+    import random
+    rng = random.Random(seed)
+
+    def escape(line: str) -> str:
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    def page_lines(number: int) -> list[str]:
+        lines = []
+        if number == 1:
+            lines += ["Internal Audit Report", "Region: APAC", "Audit Type: Synthetic Controls Review",
+                      "Date: 15 March 2025", "Severity Classification: High", ""]
+        for p in range(paragraphs_per_page):
+            topic = rng.choice(TOPICS)
+            lines += [f"Finding F-2025-{number:03d}{p}: {topic} identified in {rng.choice(REGIONS)}.",
+                      f"Control CTRL-{rng.randint(1000, 9999)} was rated {rng.choice(SEVERITIES)}; "
+                      f"remediation of the {topic} issue",
+                      f"is due by Q{rng.randint(1, 4)} 2026. Responsible party: "
+                      f"{rng.choice(['Finance', 'IT', 'Compliance', 'Operations'])}.", ""]
+        return lines
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for number in range(1, pages + 1):
+        body = "".join(f"({escape(line)}) Tj T*\n" for line in page_lines(number))
+        stream = f"BT /F1 10 Tf 14 TL 50 760 Td\n{body}ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        kids.append(len(objects) + 1)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                       % (len(objects)))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        " ".join(f"{k} 0 R" for k in kids).encode(), pages)
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for n, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,106 @@
+"""
+In-process stand-in for AsyncOpenAI, for benchmarks that must not hit the API.
+
+- Embeddings are deterministic: each word is hashed into a bucket, so texts
+  sharing vocabulary get similar (unit-length) vectors
+- Chat completions return a fixed, well-formed audit JSON answer, either
+  whole or (stream=True) as a sequence of deltas
+- Both sleep for a configurable latency to mimic a real round trip, and
+  report a `usage` block (~4 characters a token) like the real API
+"""
+from types import SimpleNamespace
+import asyncio
+import hashlib
+import json
+import re
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def fake_embedding(text: str, dim: int = 1536) -> list[float]:
+    vec = np.zeros(dim, dtype=np.float32)
+    for word in _WORD.findall(text.lower()):
+        h = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+        vec[h % dim] += 1.0 if (h >> 32) & 1 else -1.0
+    norm = np.linalg.norm(vec)
+    if norm == 0:
+        vec[0], norm = 1.0, 1.0
+    return (vec / norm).tolist()
+
+
+FAKE_ANSWER = json.dumps({
+    "answer": "Synthetic answer based on the provided audit excerpts.",
+    "key_findings": ["Finding 1: reconciliation delay", "Finding 2: privileged access"],
+    "confidence": "medium",
+    "reasoning": "Benchmark stand-in"
+})
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class _FakeEmbeddings:
+    def __init__(self, latency: float, dim: int):
+        self.latency = latency
+        self.dim = dim
+        self.calls = 0
+
+    async def create(self, input, model, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        texts = [input] if isinstance(input, str) else list(input)
+        dim = kwargs.get("dimensions") or self.dim
+        tokens = sum(_tokens(t) for t in texts)
+        return SimpleNamespace(data=[
+            SimpleNamespace(embedding=fake_embedding(t, dim), index=i)
+            for i, t in enumerate(texts)
+        ], usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
+
+
+class _FakeCompletions:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        usage = SimpleNamespace(prompt_tokens=sum(_tokens(m["content"]) for m in messages),
+                                completion_tokens=_tokens(FAKE_ANSWER))
+        if stream:
+            return self._stream(usage if (kwargs.get("stream_options") or {}).get("include_usage")
+                                else None)
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(choices=[
+            SimpleNamespace(message=SimpleNamespace(content=FAKE_ANSWER))
+        ], usage=usage)
+
+    async def _stream(self, usage=None, step: int = 4):
+        """Same answer, spread evenly over the configured latency."""
+        pieces = [FAKE_ANSWER[i:i + step] for i in range(0, len(FAKE_ANSWER), step)]
+        for piece in pieces:
+            await asyncio.sleep(self.latency / len(pieces))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+        if usage is not None:
+            yield SimpleNamespace(choices=[], usage=usage)
+
+
+class FakeAsyncOpenAI:
+    """Drop-in for the attributes of AsyncOpenAI our services use."""
+
+    def __init__(self, embed_latency: float = 0.05, chat_latency: float = 0.5,
+                 dim: int = 1536):
+        self.embeddings = _FakeEmbeddings(embed_latency, dim)
+        self.chat = SimpleNamespace(completions=_FakeCompletions(chat_latency))
+
+    async def close(self):
+        pass
+
+
+def install(client: FakeAsyncOpenAI) -> None:
+    """Point the app's service singletons at the fake client."""
+    from src.embedding_service import embedding_service
+    from src.llm_service import llm_service
+    embedding_service.client = client
+    llm_service.client = client
@@ -0,0 +1,312 @@
+"""
+BM25 Index — lexical retrieval for exact identifiers.
+
+Embeddings are great at "findings about privileged access" and poor at
+"F-2024-017", "CTRL-4821" or "SOX 404": a finding ID carries almost no
+meaning, so its nearest neighbours are random. This module keeps a classic
+inverted index over the same chunks as Chroma so those queries can be
+answered lexically, then fused with the dense ranking (see
+AuditVectorStore.search).
+
+Storage layout (compact, numpy-friendly):
+- Every chunk gets a dense integer doc id
+- Each term has two parallel array('I') postings: doc ids and term counts
+- Per-doc arrays hold the length and the filterable fields (region,
+  severity and audit type as small integer codes, year as an int)
+- Deleting a chunk only tombstones its doc id, like Lucene; once enough of
+  the index is dead it is compacted
+- save() writes everything as flat arrays into one .npz file (no pickle;
+  strings as UTF-8 bytes + offsets, see src/index_files.py)
+"""
+from array import array
+import logging
+import os
+import re
+import threading
+import numpy as np
+from src.index_files import pack_strings, unpack_strings
+
+logger = logging.getLogger(__name__)
+
+# Identifiers such as "f-2024-017", "ctrl_07", "sox.404" stay one token
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_./:][a-z0-9]+)*")
+_PARTS = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were which with what when who how".split()
+)
+FILTER_FIELDS = ("region", "severity", "audit_type", "finding_severity")
+COMPACT_DEAD_RATIO = 0.25
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercased terms. A compound identifier is indexed both whole and by
+    its parts, so "F-2024-017" matches a query for "F-2024-017" exactly and
+    still partially matches "2024".
+    """
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token not in STOPWORDS:
+            terms.append(token)
+        parts = _PARTS.findall(token)
+        if len(parts) > 1:
+            terms.extend(p for p in parts if len(p) > 1 and p not in STOPWORDS)
+    return terms
+
+
+class BM25Index:
+    """Incrementally maintained BM25 inverted index. All methods are thread-safe."""
+
+    def __init__(self, path: str = None, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._reset()
+        if path and os.path.exists(path):
+            try:
+                self._load(path)
+            except Exception as e:
+                logger.warning(f"Could not load BM25 index from {path} ({e}); starting empty")
+                self._reset()
+
+    def _reset(self) -> None:
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._chunk_ids: list[str] = []
+        self._doc_of: dict[str, int] = {}  # chunk id → live doc id
+        self._lengths = array("I")
+        self._alive = bytearray()
+        self._year = array("i")
+        self._codes = {f: array("H") for f in FILTER_FIELDS}
+        self._values = {f: [] for f in FILTER_FIELDS}  # code → value
+        self._code_of = {f: {} for f in FILTER_FIELDS}  # value → code
+        self._total_length = 0
+        self._dead = 0
+
+    # ── WRITES ─────────────────────────────────────────────
+    def add(self, chunk_ids: list[str], texts: list[str], metadatas: list[dict]) -> None:
+        """Index chunks; a chunk id that is already indexed is replaced."""
+        with self._lock:
+            for chunk_id, text, meta in zip(chunk_ids, texts, metadatas):
+                if chunk_id in self._doc_of:
+                    self._remove(chunk_id)
+                doc = len(self._chunk_ids)
+                self._chunk_ids.append(chunk_id)
+                self._doc_of[chunk_id] = doc
+                self._alive.append(1)
+                self._set_fields(doc, meta, append=True)
+
+                terms = tokenize(text)
+                self._lengths.append(len(terms))
+                self._total_length += len(terms)
+                counts: dict[str, int] = {}
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                for term, tf in counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = (array("I"), array("I"))
+                    postings[0].append(doc)
+                    postings[1].append(tf)
+
+    def update_metadata(self, chunk_ids: list[str], metadatas: list[dict]) -> None:
+        """Refresh the filterable fields of already indexed chunks."""
+        with self._lock:
+            for chunk_id, meta in zip(chunk_ids, metadatas):
+                doc = self._doc_of.get(chunk_id)
+                if doc is not None:
+                    self._set_fields(doc, meta, append=False)
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                if chunk_id in self._doc_of:
+                    self._remove(chunk_id)
+            if self._dead > COMPACT_DEAD_RATIO * max(len(self._chunk_ids), 1):
+                self._compact()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _remove(self, chunk_id: str) -> None:
+        doc = self._doc_of.pop(chunk_id)
+        self._alive[doc] = 0
+        self._total_length -= self._lengths[doc]
+        self._dead += 1
+
+    def _set_fields(self, doc: int, meta: dict, append: bool) -> None:
+        year = int(meta.get("year") or 0)
+        if append:
+            self._year.append(year)
+        else:
+            self._year[doc] = year
+        for field in FILTER_FIELDS:
+            code = self._code(field, meta.get(field) or "unknown")
+            if append:
+                self._codes[field].append(code)
+            else:
+                self._codes[field][doc] = code
+
+    def _code(self, field: str, value: str) -> int:
+        codes = self._code_of[field]
+        if value not in codes:
+            codes[value] = len(self._values[field])
+            self._values[field].append(value)
+        return codes[value]
+
+    def _compact(self) -> None:
+        """Drop tombstoned docs and renumber the survivors."""
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+        for term in list(self._postings):
+            docs = np.frombuffer(self._postings[term][0], dtype=np.uint32)
+            tfs = np.frombuffer(self._postings[term][1], dtype=np.uint32)
+            keep = alive[docs]
+            if not keep.any():
+                del self._postings[term]
+                continue
+            self._postings[term] = (array("I", remap[docs[keep]].astype(np.uint32).tobytes()),
+                                    array("I", tfs[keep].tobytes()))
+        keep_docs = np.flatnonzero(alive)
+        self._chunk_ids = [self._chunk_ids[d] for d in keep_docs]
+        self._doc_of = {chunk_id: doc for doc, chunk_id in enumerate(self._chunk_ids)}
+        self._lengths = array("I", (self._lengths[d] for d in keep_docs))
+        self._year = array("i", (self._year[d] for d in keep_docs))
+        for field in FILTER_FIELDS:
+            self._codes[field] = array("H", (self._codes[field][d] for d in keep_docs))
+        self._alive = bytearray(b"\x01" * len(keep_docs))
+        logger.info(f"BM25 index compacted: dropped {self._dead} deleted chunks")
+        self._dead = 0
+
+    # ── SEARCH ─────────────────────────────────────────────
+    def search(self, query: str, k: int = 10, filters: dict = None) -> list[tuple[str, float]]:
+        """
+        Top-k (chunk_id, bm25 score) among live chunks matching the filters
+        (a metadata_index.normalize_filters() dict).
+        """
+        filters = filters or {}
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._chunk_ids)
+            live = n_docs - self._dead
+            if not terms or live == 0:
+                return []
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+            avgdl = max(self._total_length / live, 1.0)
+            alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+            scores = np.zeros(n_docs, dtype=np.float32)
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                docs = np.frombuffer(postings[0], dtype=np.uint32)
+                tfs = np.frombuffer(postings[1], dtype=np.uint32).astype(np.float32)
+                if self._dead:
+                    # Tombstoned chunks count neither in N nor in a term's df
+                    keep = alive[docs]
+                    docs, tfs = docs[keep], tfs[keep]
+                    if len(docs) == 0:
+                        continue
+                idf = np.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avgdl)
+                scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+            candidates = np.flatnonzero(scores)
+            if len(candidates) == 0:
+                return []
+            mask = np.ones(len(candidates), dtype=bool)
+            for field in FILTER_FIELDS:
+                if field in filters:
+                    codes = [self._code_of[field][v] for v in filters[field]
+                             if v in self._code_of[field]]
+                    column = np.frombuffer(self._codes[field], dtype=np.uint16)[candidates]
+                    mask &= np.isin(column, codes)
+            years = np.frombuffer(self._year, dtype=np.int32)[candidates]
+            if "year" in filters:
+                mask &= np.isin(years, filters["year"])
+            if "year_min" in filters:
+                mask &= years >= filters["year_min"]
+            if "year_max" in filters:
+                mask &= years <= filters["year_max"]
+            candidates = candidates[mask]
+            if len(candidates) > k:
+                top = np.argpartition(-scores[candidates], k - 1)[:k]
+                candidates = candidates[top]
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._chunk_ids[d], float(scores[d])) for d in ranked]
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"chunks": len(self._doc_of), "terms": len(self._postings),
+                    "postings": sum(len(p[0]) for p in self._postings.values()),
+                    "deleted_pending_compaction": self._dead}
+
+    # ── PERSISTENCE ────────────────────────────────────────
+    def save(self) -> None:
+        """Write the index as flat arrays (postings in CSR form), atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            terms = list(self._postings)
+            sizes = np.fromiter((len(self._postings[t][0]) for t in terms),
+                                dtype=np.int64, count=len(terms))
+            offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+            arrays = {
+                "offsets": offsets,
+                "post_docs": _concat([self._postings[t][0] for t in terms]),
+                "post_tfs": _concat([self._postings[t][1] for t in terms]),
+                "lengths": np.frombuffer(self._lengths, dtype=np.uint32),
+                "alive": np.frombuffer(bytes(self._alive), dtype=np.uint8),
+                "year": np.frombuffer(self._year, dtype=np.int32),
+            }
+            pack_strings(arrays, "terms", terms)
+            pack_strings(arrays, "chunk_ids", self._chunk_ids)
+            for field in FILTER_FIELDS:
+                arrays[f"{field}_codes"] = np.frombuffer(self._codes[field], dtype=np.uint16)
+                pack_strings(arrays, f"{field}_values", self._values[field])
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self.path)
+
+    def _load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            terms = unpack_strings(data, "terms")
+            offsets = data["offsets"]
+            post_docs, post_tfs = data["post_docs"], data["post_tfs"]
+            self._postings = {
+                term: (array("I", post_docs[offsets[i]:offsets[i + 1]].tobytes()),
+                       array("I", post_tfs[offsets[i]:offsets[i + 1]].tobytes()))
+                for i, term in enumerate(terms)
+            }
+            self._chunk_ids = unpack_strings(data, "chunk_ids")
+            self._lengths = array("I", data["lengths"].astype(np.uint32).tobytes())
+            self._alive = bytearray(data["alive"].tobytes())
+            self._year = array("i", data["year"].astype(np.int32).tobytes())
+            for field in FILTER_FIELDS:
+                if f"{field}_codes" not in data.files:
+                    # Field added since the file was written: every chunk is "unknown"
+                    self._codes[field] = array("H", bytes(2 * len(self._chunk_ids)))
+                    self._values[field] = ["unknown"]
+                else:
+                    self._codes[field] = array("H", data[f"{field}_codes"].astype(np.uint16).tobytes())
+                    self._values[field] = unpack_strings(data, f"{field}_values")
+                self._code_of[field] = {v: i for i, v in enumerate(self._values[field])}
+        self._doc_of = {c: d for d, c in enumerate(self._chunk_ids) if self._alive[d]}
+        self._dead = len(self._chunk_ids) - len(self._doc_of)
+        self._total_length = sum(self._lengths[d] for d in self._doc_of.values())
+        logger.info(f"Loaded BM25 index: {len(self._doc_of)} chunks, {len(terms)} terms")
+
+
+def _concat(parts: list[array]) -> np.ndarray:
+    if not parts:
+        return np.zeros(0, dtype=np.uint32)
+    return np.concatenate([np.frombuffer(p, dtype=np.uint32) for p in parts])
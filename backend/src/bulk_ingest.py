@@ -0,0 +1,185 @@
+"""
+Bulk Ingestion — onboard whole audit archives in one go.
+
+Accepts a .zip archive or a directory of .txt/.pdf reports and:
+1. Streams through the files one at a time (never the whole archive in memory)
+2. Parses them in the process pool, a bounded number in flight
+3. Coalesces chunks from many reports into large embedding batches
+4. Writes them to Chroma with large bulk add() calls
+
+Returns per-file results plus aggregate throughput (docs/s, chunks/s).
+Each report is titled by its path inside the archive or directory
+("2024/q3/apac.pdf"), so same-named files in different folders stay
+separate reports; a path that occurs twice is rejected.
+
+CLI (from backend/):
+    python -m src.bulk_ingest ../sample_reports
+    python -m src.bulk_ingest archive.zip --batch-chunks 5000
+"""
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Union
+from src.config import settings
+from src.document_processor import process_audit_report
+from src.executors import get_cpu_pool, run_io, shutdown
+from src.models import BulkFileResult, BulkIngestResponse
+from src.vector_store import audit_vector_store
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = (".txt", ".pdf")
+
+
+def _is_report(name: str) -> bool:
+    base = os.path.basename(name)
+    return (name.lower().endswith(SUPPORTED_SUFFIXES)
+            and not base.startswith(".") and "__MACOSX" not in name)
+
+
+def iter_zip_reports(source: Union[str, IO[bytes]]) -> Iterator[tuple[str, bytes]]:
+    """Yield (path in the archive, content) for each report in a zip, one member at a time."""
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and _is_report(info.filename):
+                yield info.filename, archive.read(info)
+
+
+def iter_directory_reports(directory: str) -> Iterator[tuple[str, bytes]]:
+    """Yield (path relative to directory, content) for each report under it, recursively."""
+    root = Path(directory)
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {directory}")
+    for path in sorted(root.rglob("*")):
+        relative = path.relative_to(root).as_posix()
+        if path.is_file() and _is_report(relative):
+            yield relative, path.read_bytes()
+
+
+def iter_reports(source: str) -> Iterator[tuple[str, bytes]]:
+    """Directory or .zip path → stream of (filename, content)."""
+    if os.path.isdir(source):
+        return iter_directory_reports(source)
+    if zipfile.is_zipfile(source):
+        return iter_zip_reports(source)
+    raise ValueError(f"Expected a directory or a .zip archive: {source}")
+
+
+async def bulk_ingest(files: Iterable[tuple[str, bytes]],
+                      batch_chunks: int = None) -> BulkIngestResponse:
+    """
+    Ingest a stream of (filename, content) pairs.
+    Parsed reports are buffered until they hold batch_chunks chunks, then
+    flushed through AuditVectorStore.add_reports() in one embed + bulk add.
+    """
+    batch_chunks = batch_chunks or settings.bulk_batch_chunks
+    loop = asyncio.get_running_loop()
+    pool = get_cpu_pool()
+    max_in_flight = 2 * (os.cpu_count() or 2)
+
+    results: list[BulkFileResult] = []
+    buffer: list[tuple[BulkFileResult, dict]] = []
+    buffered_chunks = 0
+    pending: dict[asyncio.Future, str] = {}
+    seen: set[str] = set()
+    start = time.perf_counter()
+
+    async def flush() -> None:
+        nonlocal buffer, buffered_chunks
+        if not buffer:
+            return
+        batch, buffer, buffered_chunks = buffer, [], 0
+        # Reports already in the index (same content) are updated incrementally
+        # instead; a title alone never matches: that's another report's name
+        outcomes = await audit_vector_store.upsert_reports([report for _, report in batch])
+        for (result, report), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Indexing {report['title']} failed: {outcome}")
+                result.error = "Embedding or indexing failed"
+            else:
+                result.status, result.report_id = "indexed", outcome[0]
+
+    async def collect(done: set) -> None:
+        nonlocal buffered_chunks
+        for future in done:
+            filename = pending.pop(future)
+            result = BulkFileResult(filename=filename, status="failed")
+            results.append(result)
+            try:
+                chunks, metadata = future.result()
+            except ValueError as e:
+                result.error = str(e)
+                continue
+            except Exception as e:
+                logger.error(f"Parsing {filename} failed: {e}")
+                result.error = "Report processing failed"
+                continue
+            result.chunks = len(chunks)
+            result.extracted_metadata = metadata
+            buffer.append((result, {"title": filename, "chunks": chunks, **{
+                k: metadata.get(k) for k in ("region", "severity", "audit_type", "year", "findings")
+            }}))
+            buffered_chunks += len(chunks)
+        if buffered_chunks >= batch_chunks:
+            await flush()
+
+    iterator = iter(files)
+    while True:
+        # Reading the next file is blocking disk/zip I/O: keep it off the loop
+        item = await run_io(next, iterator, None)
+        if item is None:
+            break
+        filename, content = item
+        if filename in seen:
+            # Both would be the same report (titles are paths): keep the first
+            results.append(BulkFileResult(filename=filename, status="failed",
+                                          error="Duplicate path in the archive"))
+            continue
+        seen.add(filename)
+        if len(pending) >= max_in_flight:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            await collect(done)
+        future = loop.run_in_executor(pool, process_audit_report, filename, content)
+        pending[future] = filename
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        await collect(done)
+    await flush()
+
+    elapsed = time.perf_counter() - start
+    indexed = [r for r in results if r.status == "indexed"]
+    total_chunks = sum(r.chunks for r in indexed)
+    logger.info(f"Bulk ingest: {len(indexed)}/{len(results)} files, "
+                f"{total_chunks} chunks in {elapsed:.1f}s")
+    return BulkIngestResponse(
+        files=results,
+        files_indexed=len(indexed),
+        files_failed=len(results) - len(indexed),
+        total_chunks=total_chunks,
+        elapsed_seconds=round(elapsed, 3),
+        docs_per_second=round(len(indexed) / elapsed, 2) if elapsed else 0.0,
+        chunks_per_second=round(total_chunks / elapsed, 2) if elapsed else 0.0
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory or .zip of audit reports.")
+    parser.add_argument("source", help="Directory or .zip archive of .txt/.pdf reports")
+    parser.add_argument("--batch-chunks", type=int, default=settings.bulk_batch_chunks,
+                        help="Chunks to accumulate before each embed + bulk add")
+    args = parser.parse_args()
+    logging.basicConfig(level=settings.log_level)
+    try:
+        result = asyncio.run(bulk_ingest(iter_reports(args.source), args.batch_chunks))
+    finally:
+        shutdown()
+    print(json.dumps(result.model_dump(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
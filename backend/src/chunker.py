@@ -0,0 +1,186 @@
+"""
+Chunker — streaming chunking with character offsets and page numbers.
+
+Same rules as Project 1's chunk_text(), which existing indexes were built
+with (so chunk hashes, and with them chunk ids, stay stable):
+1. Paragraphs are separated by blank lines
+2. A paragraph over max_size is split at sentence ends (". ") and line
+   breaks, and its sentences regrouped into pieces under max_size
+3. Pieces shorter than min_size are merged with the following ones
+
+Differences:
+- Works on a stream of text blocks (e.g. PDF pages) and yields each chunk
+  as soon as it is complete; no full text, no intermediate lists, and
+  pieces are joined once instead of grown with +=
+- Every chunk knows where it came from: character offsets into the
+  document (the blocks joined with blank lines) and, for PDFs, the pages
+  it spans ("[Page N]" markers written by the extractor)
+- Optional overlap: each chunk can start with the tail of the previous one
+"""
+from typing import Iterable, Iterator, Optional
+import re
+
+_PAGE_MARKER = re.compile(r"\[Page (\d+)\]")
+_PAGE_LINE = re.compile(r"^\[Page (\d+)\]$", re.M)
+BLOCK_SEPARATOR = "\n\n"
+
+
+class Chunk(str):
+    """
+    A chunk's text — it IS the string, so it goes wherever chunk text goes —
+    plus its position: [start, end) character offsets in the document and
+    the first/last page (None when the source has no pages).
+    """
+    start: int
+    end: int
+    page_start: Optional[int]
+    page_end: Optional[int]
+    tags: dict  # Extra chunk metadata, e.g. the finding it belongs to
+
+    def __new__(cls, text: str, start: int, end: int, page_start: int = None,
+                page_end: int = None, tags: dict = None):
+        chunk = super().__new__(cls, text)
+        chunk.start, chunk.end = start, end
+        chunk.page_start, chunk.page_end = page_start, page_end
+        chunk.tags = tags or {}
+        return chunk
+
+    def __reduce__(self):
+        # Survives the trip to and from the process pool
+        return Chunk, (str(self), self.start, self.end, self.page_start, self.page_end,
+                       self.tags)
+
+    def location(self) -> dict:
+        """Position fields for chunk metadata (pages only when known)."""
+        location = {"char_start": self.start, "char_end": self.end}
+        if self.page_start is not None:
+            location.update(page_start=self.page_start, page_end=self.page_end)
+        return location
+
+    def metadata(self) -> dict:
+        """Everything this chunk adds to its stored metadata: location + tags."""
+        return {**self.location(), **self.tags}
+
+
+def iter_chunks(blocks: Iterable[str], min_size: int = 100, max_size: int = 1000,
+                overlap: int = 0) -> Iterator[Chunk]:
+    """
+    Chunks of a document given as text blocks, in order. Blocks are treated
+    as if joined with blank lines: with overlap=0 the chunk texts are exactly
+    chunk_text() of the joined text.
+    """
+    # Pieces are (text, start, end, first page, last page) tuples
+    buf: list[tuple] = []
+    buf_len = 0  # Length of the joined buffer, counted as the original string builder did
+    previous: Optional[Chunk] = None
+    page = None
+    base = 0  # Offset of the current block in the document
+
+    for block in blocks:
+        for start, end in _paragraphs(block):
+            paragraph = block[start:end]
+            if len(paragraph) <= max_size:
+                first_page = page
+                if "[Page " in paragraph:
+                    markers = _PAGE_LINE.findall(paragraph)
+                    if markers:
+                        if paragraph.startswith("[Page "):
+                            first_page = int(markers[0])
+                        page = int(markers[-1])
+                pieces = [(paragraph, base + start, base + end, first_page, page)]
+            else:
+                pieces, page = _sized(paragraph, base + start, page, max_size)
+            for piece in pieces:
+                if buf_len + len(piece[0]) < min_size:
+                    buf_len += len(piece[0]) + (1 if buf_len else 0)
+                    buf.append(piece)
+                    continue
+                if buf_len:
+                    previous = _emit(buf, previous, overlap)
+                    yield previous
+                buf, buf_len = [piece], len(piece[0])
+        base += len(block) + len(BLOCK_SEPARATOR)
+    if buf_len:
+        yield _emit(buf, previous, overlap)
+
+
+def _paragraphs(block: str) -> Iterator[tuple[int, int]]:
+    """Spans of the non-blank paragraphs of block, whitespace stripped."""
+    pos = 0
+    while pos <= len(block):
+        end = block.find(BLOCK_SEPARATOR, pos)
+        if end < 0:
+            end = len(block)
+        start, stop = _strip_span(block, pos, end)
+        if start < stop:
+            yield start, stop
+        pos = end + len(BLOCK_SEPARATOR)
+
+
+def _sized(paragraph: str, offset: int, page: Optional[int],
+           max_size: int) -> tuple[list[tuple], Optional[int]]:
+    """
+    A paragraph over max_size as pieces under max_size: split into
+    sentences after ". " and at line breaks (each separator is one
+    character, which keeps offsets simple), then regrouped.
+    Returns the pieces and the page the paragraph ends on.
+    """
+    pieces = []
+    group: list[str] = []
+    group_len = 0
+    group_start = pos = offset
+    first_page = page
+    for sentence in paragraph.replace(". ", ".\n").split("\n"):
+        if sentence.startswith("[Page "):
+            marker = _PAGE_MARKER.fullmatch(sentence)
+            if marker:
+                page = int(marker.group(1))
+                if not group:
+                    first_page = page
+        if group_len + len(sentence) < max_size:
+            group_len += len(sentence) + (1 if group_len else 0)
+            group.append(sentence)
+        else:
+            if group_len:
+                pieces.append(_piece(" ".join(group), group_start, first_page, last_page))
+            group, group_len = [sentence], len(sentence)
+            group_start, first_page = pos, page
+        pos += len(sentence) + 1
+        last_page = page
+    if group_len:
+        pieces.append(_piece(" ".join(group), group_start, first_page, page))
+    return pieces, page
+
+
+def _piece(text: str, start: int, first_page, last_page) -> tuple:
+    """A joined group of sentences, stripped like the original (offsets follow)."""
+    stripped = text.strip()
+    start += len(text) - len(text.lstrip())
+    return stripped, start, start + len(stripped), first_page, last_page
+
+
+def _emit(pieces: list[tuple], previous: Optional[Chunk], overlap: int) -> Chunk:
+    text = " ".join(p[0] for p in pieces).strip() if len(pieces) > 1 else pieces[0][0]
+    # Pieces are stripped, but whitespace-only sentences leave empty ones
+    filled = [p for p in pieces if p[0]] or pieces
+    start, end = filled[0][1], filled[-1][2]
+    first_page = next((p[3] for p in pieces if p[3] is not None), None)
+    if overlap > 0 and previous is not None:
+        tail = str(previous)[-overlap:]
+        if len(previous) > overlap:
+            tail = tail[tail.find(" ") + 1:]  # Start on a word boundary
+        tail = tail.strip()
+        if tail:
+            text = f"{tail} {text}"
+            start = max(previous.start, previous.end - len(tail))
+            if previous.page_end is not None:
+                first_page = previous.page_end
+    return Chunk(text, start, end, first_page, pieces[-1][4])
+
+
+def _strip_span(text: str, start: int, end: int) -> tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
@@ -1,42 +1,9 @@
-"""Application configuration for the Document Q&A API."""
-from pydantic_settings import BaseSettings
-
-
-class Settings(BaseSettings):
-    app_name: str = "Document Q&A API"
-    app_version: str = "1.0.0"
-    debug: bool = False
-
-    # OpenAI
-    openai_api_key: str = ""
-    openai_model: str = "gpt-4o-mini"
-    max_tokens: int = 1500
-
-    # Document limits
-    max_document_length: int = 50000  # Max chars per document
-    max_documents: int = 100  # Max documents stored at once
-    max_question_length: int = 1000  # Max chars per question
-
-    # Context window management
-    # When a document is too long to send entirely to the AI,
-    # we truncate it to this many characters.
-    # gpt-4o-mini supports 128k tokens, but shorter contexts
-    # give better answers and cost less.
-    context_max_chars: int = 15000
-
-    log_level: str = "INFO"
-
-    class Config:
-        env_file = ".env"
-
-
-settings = Settings()
-
-
 """
 Configuration - loaded from environment variables.
-Phase 1 pattern reused unchanged, with 2 new settings added.
+Phase 1 pattern, extended with settings grouped by feature: embedding
+cache and batching, caches, search, indexing, ingestion and metrics.
 """
+from pydantic import Field
 from pydantic_settings import BaseSettings
  
 class Settings(BaseSettings):
@@ -49,6 +16,109 @@ class Settings(BaseSettings):
     # Phase 2 NEW settings
     embedding_model: str = "text-embedding-3-small"
     chroma_path: str = "./chroma_db"
+    # Shorter text-embedding-3 vectors (e.g. 512; 0 = the model's full 1536).
+    # Vectors of different sizes can't be mixed: re-index after changing it
+    embedding_dimensions: int = 0
+
+    # Embedding cache (identical text is only embedded once)
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = ""  # Empty = <chroma_path>/embedding_cache.sqlite3
+    embedding_cache_max_entries: int = 200_000
+
+    # Embedding batching: OpenAI caps a request at 2048 inputs / 300k tokens
+    embedding_batch_max_tokens: int = 100_000
+    embedding_batch_max_items: int = 1000
+    embedding_max_concurrency: int = 4  # Batches in flight at once
+    embedding_max_retries: int = Field(6, ge=1)  # Attempts per batch, the first included
+
+    # Report registry (SQLite, survives restarts)
+    report_registry_path: str = ""  # Empty = <chroma_path>/report_registry.sqlite3
+
+    # Query-result caches (cleared whenever the index changes)
+    query_cache_enabled: bool = True
+    query_cache_ttl_seconds: int = 600
+    retrieval_cache_max_entries: int = 2048
+    answer_cache_max_entries: int = 1024
+
+    # Semantic cache: reuse answers for near-duplicate questions
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.95  # Cosine similarity needed for a hit
+    semantic_cache_max_entries: int = 512
+
+    # Vector engine: "chroma" or "local" (in-process NumPy index, see src/local_index.py)
+    vector_backend: str = "chroma"
+    local_index_path: str = ""  # Defaults to local_index/ next to the Chroma data
+    local_index_ivf_lists: int = 0  # 0 = always exact brute-force search
+    local_index_ivf_probes: int = 8
+    local_index_ivf_min_rows: int = 50_000
+    # "int8" (or "float16"): search a 4x (2x) smaller copy of the vectors and rescore
+    # the best n_results * local_index_rescore candidates in float32 (local only)
+    local_index_storage: str = "float32"
+    local_index_rescore: int = 4
+
+    # Retrieval: "dense" (Chroma only), "lexical" (BM25 only) or "hybrid" (both, fused)
+    search_mode: str = "hybrid"
+    bm25_index_path: str = ""  # Defaults to bm25_index.npz next to the Chroma data
+    index_save_interval_seconds: float = 30.0  # Chunk index files are saved at most this often (0 = every write)
+    hybrid_rrf_k: int = 60  # Reciprocal rank fusion constant
+    hybrid_candidates: int = 4  # Each ranking contributes n_results * this candidates
+
+    # Diversity reranking (MMR, see src/mmr.py): n_results * mmr_fetch_multiplier
+    # candidates are re-picked for relevance AND novelty (lambda 1.0 = relevance only)
+    mmr_lambda: float = 0.7
+    mmr_fetch_multiplier: int = 4
+    mmr_max_per_report: int = 0  # Most results one report may contribute (0 = no cap)
+
+    # Filtered search: score the matching subset exactly when it is small
+    metadata_index_path: str = ""  # Defaults to metadata_index.npz next to the Chroma data
+    filter_exact_max_chunks: int = 1000
+
+    # Themes (/intelligence/themes): chunks are clustered at ingest time (src/theme_index.py)
+    theme_index_path: str = ""  # Defaults to theme_index.npz next to the Chroma data
+    theme_count: int = 24  # Changing it takes effect once the theme index file is deleted
+
+    # Findings table (src/findings_store.py) and the LLM-free path for questions it can answer
+    findings_db_path: str = ""  # Defaults to findings.sqlite3 next to the Chroma data
+    structured_answers_enabled: bool = True
+    structured_answer_max_findings: int = 50  # Findings listed in one structured answer
+
+    # Chunking (changing sizes or overlap changes chunk ids: re-index afterwards)
+    chunk_min_size: int = 100
+    chunk_max_size: int = 1000
+    chunk_overlap: int = 0  # Characters of the previous chunk repeated at the start of the next
+
+    # Metadata extraction
+    metadata_scan_chars: int = 4000  # Report fields are read from the header only (0 = whole text)
+
+    # Prompt context: excerpts are deduplicated, merged and packed into a token budget
+    context_max_tokens: int = 2500
+    context_dedup_threshold: float = 0.85  # Word-shingle Jaccard at which excerpts count as duplicates
+    context_merge_adjacent: bool = True  # Neighbouring chunks of a report become one excerpt
+
+    # Batch questions (/intelligence/ask/batch)
+    batch_max_concurrency: int = 8  # GPT calls in flight per batch
+
+    # Async request path
+    openai_max_connections: int = 20  # Shared keep-alive pool for chat + embeddings
+    openai_coalesce_enabled: bool = True  # Identical concurrent calls share one request
+    cpu_workers: int = 0  # Processes for PDF parsing (0 = one per CPU)
+
+    # Background ingestion jobs
+    ingest_workers: int = 4  # Reports processed concurrently
+    ingest_queue_size: int = 100  # Pending uploads before we answer 503
+    ingest_job_history: int = 1000  # Finished jobs kept for GET /jobs/{id}
+    pdf_spill_bytes: int = 4 * 1024 * 1024  # Larger PDF uploads are spilled to disk and streamed
+    pdf_pages_per_task: int = 8  # Pages per process-pool task when extracting a spilled PDF
+    upload_spool_dir: str = ""  # Where spilled uploads go (empty = system temp dir)
+
+    # Metrics (/metrics): USD per million tokens, for the cost counters
+    chat_input_cost_per_1m: float = 0.15  # gpt-4o-mini list prices
+    chat_output_cost_per_1m: float = 0.60
+    embedding_cost_per_1m: float = 0.02  # text-embedding-3-small
+
+    # Bulk ingestion
+    bulk_batch_chunks: int = 2000  # Chunks per coalesced embed + Chroma add
+    bulk_ingest_root: str = ""  # Server directory allowed for /reports/bulk (empty = zip only)
  
     class Config:
         env_file = ".env"
@@ -0,0 +1,175 @@
+"""
+Context Builder — turns retrieved chunks into the excerpt block of the prompt.
+
+Pasting every retrieved chunk verbatim wastes tokens (and GPT latency):
+the same boilerplate paragraph appears in several reports, and neighbouring
+chunks of one report each repeat a header. This stage, run between
+retrieval and generation:
+- Drops near-duplicate excerpts (word 3-shingle Jaccard ≥ threshold); the
+  kept excerpt notes which other reports contained the same text
+- Packs the most relevant chunks into a token budget, best first; a chunk
+  that doesn't fit is skipped so a smaller, less relevant one still can.
+  The top chunk is never dropped, only truncated if it alone is too big
+- Merges chunks that are adjacent in the same report (by chunk_index) into
+  one excerpt, so they read as one passage under one header
+
+Tokens are counted with src.tokenizer (tiktoken when available). stats()
+reports how many tokens the naive "paste everything" context would have
+cost vs what was sent.
+"""
+from dataclasses import dataclass, field
+import logging
+import re
+from src.tokenizer import count_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+SEPARATOR = "\n\n"
+MAX_ALSO_IN = 3  # Report titles listed on a deduplicated excerpt
+
+
+@dataclass
+class BuiltContext:
+    """The excerpt block of one prompt, plus what it took to build it."""
+    text: str
+    tokens: int
+    naive_tokens: int  # Cost of pasting every retrieved chunk as-is
+    chunks: list[dict] = field(default_factory=list)  # Chunks that made it in
+
+
+@dataclass
+class _Excerpt:
+    chunks: list[dict]
+    rank: int  # Retrieval position of its best chunk
+    also_in: list[str] = field(default_factory=list)
+
+
+class ContextBuilder:
+    """Dedup → budget packing → adjacent-chunk merging, with running totals."""
+
+    def __init__(self, max_tokens: int = 2500, dedup_threshold: float = 0.85,
+                 merge_adjacent: bool = True):
+        self.max_tokens = max_tokens
+        self.dedup_threshold = dedup_threshold
+        self.merge_adjacent = merge_adjacent
+        self.questions = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.duplicates = 0
+        self.merged = 0
+        self.over_budget = 0
+        self.truncated = 0
+
+    def build(self, chunks: list[dict]) -> BuiltContext:
+        """Chunks in relevance order (as search() returns them) → context."""
+        naive_tokens = count_tokens(SEPARATOR.join(
+            _render(i, _Excerpt([c], i)) for i, c in enumerate(chunks, 1)))
+        excerpts = self._merge(self._pack(self._dedup(chunks)))
+        text = SEPARATOR.join(_render(i, e) for i, e in enumerate(excerpts, 1))
+        context = BuiltContext(text=text, tokens=count_tokens(text), naive_tokens=naive_tokens,
+                               chunks=[c for e in excerpts for c in e.chunks])
+        self.questions += 1
+        self.tokens_in += context.naive_tokens
+        self.tokens_out += context.tokens
+        return context
+
+    def _dedup(self, chunks: list[dict]) -> list[_Excerpt]:
+        kept: list[tuple[set, _Excerpt]] = []
+        for rank, chunk in enumerate(chunks):
+            shingles = _shingles(chunk["text"])
+            duplicate_of = next((e for s, e in kept
+                                 if _jaccard(shingles, s) >= self.dedup_threshold), None)
+            if duplicate_of is None:
+                kept.append((shingles, _Excerpt([chunk], rank)))
+                continue
+            self.duplicates += 1
+            title = chunk["report_title"]
+            if title != duplicate_of.chunks[0]["report_title"] and title not in duplicate_of.also_in:
+                duplicate_of.also_in.append(title)
+        return [e for _, e in kept]
+
+    def _pack(self, excerpts: list[_Excerpt]) -> list[_Excerpt]:
+        packed, used = [], 0
+        for excerpt in excerpts:
+            cost = count_tokens(_render(len(packed) + 1, excerpt)) + 1  # + separator
+            if used + cost <= self.max_tokens:
+                packed.append(excerpt)
+                used += cost
+            elif not packed:
+                # Never lose the top evidence: cut it down to the budget instead
+                chunk = excerpt.chunks[0]
+                header = count_tokens(_render(1, _Excerpt([{**chunk, "text": ""}], 0, excerpt.also_in)))
+                text = truncate_tokens(chunk["text"], max(self.max_tokens - header, 1))
+                packed.append(_Excerpt([{**chunk, "text": text}], excerpt.rank, excerpt.also_in))
+                used = self.max_tokens
+                self.truncated += 1
+            else:
+                self.over_budget += 1
+        return packed
+
+    def _merge(self, excerpts: list[_Excerpt]) -> list[_Excerpt]:
+        if not self.merge_adjacent:
+            return excerpts
+        by_report: dict[str, list[_Excerpt]] = {}
+        for excerpt in excerpts:
+            by_report.setdefault(excerpt.chunks[0].get("report_id"), []).append(excerpt)
+        merged = []
+        for report_id, group in by_report.items():
+            if not report_id or len(group) == 1:
+                merged.extend(group)
+                continue
+            group.sort(key=lambda e: _chunk_index(e.chunks[0]))
+            run = group[0]
+            for excerpt in group[1:]:
+                if _chunk_index(excerpt.chunks[0]) == _chunk_index(run.chunks[-1]) + 1:
+                    run = _Excerpt(run.chunks + excerpt.chunks, min(run.rank, excerpt.rank),
+                                   run.also_in + [t for t in excerpt.also_in if t not in run.also_in])
+                    self.merged += 1
+                else:
+                    merged.append(run)
+                    run = excerpt
+            merged.append(run)
+        return sorted(merged, key=lambda e: e.rank)
+
+    def stats(self) -> dict:
+        saved = self.tokens_in - self.tokens_out
+        return {"max_tokens": self.max_tokens,
+                "questions": self.questions,
+                "tokens_in": self.tokens_in,
+                "tokens_out": self.tokens_out,
+                "tokens_saved": saved,
+                "saved_pct": round(100 * saved / self.tokens_in, 1) if self.tokens_in else 0.0,
+                "duplicates_dropped": self.duplicates,
+                "chunks_merged": self.merged,
+                "chunks_over_budget": self.over_budget,
+                "truncated": self.truncated}
+
+
+def _render(number: int, excerpt: _Excerpt) -> str:
+    first = excerpt.chunks[0]
+    meta_str = f"Report: {first['report_title']}"
+    if first.get("region"): meta_str += f" | Region: {first['region']}"
+    if first.get("severity"): meta_str += f" | Severity: {first['severity']}"
+    if excerpt.also_in:
+        meta_str += f" | Also in: {', '.join(excerpt.also_in[:MAX_ALSO_IN])}"
+        if len(excerpt.also_in) > MAX_ALSO_IN:
+            meta_str += f" (+{len(excerpt.also_in) - MAX_ALSO_IN} more)"
+    text = "\n".join(c["text"] for c in excerpt.chunks)
+    return f"[Excerpt {number} — {meta_str}]\n{text}"
+
+
+def _chunk_index(chunk: dict) -> int:
+    index = chunk.get("chunk_index")
+    return -2 if index is None else index  # Unknown positions never look adjacent
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
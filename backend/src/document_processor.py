@@ -2,13 +2,19 @@
 Audit Document Processor — Extended with Metadata Extraction.
  
 New vs Project 1: Automatically extracts structured metadata from
-audit reports (region, severity, audit type, year) so they can
-be used for metadata filtering in searches.
+audit reports (region, severity, audit type, year, and each finding's
+id/severity/owner/deadline) so they can be used for metadata filtering
+in searches. Large PDFs are read from
+disk page by page and chunked as a stream (process_audit_pdf).
 """
+from concurrent.futures import Executor
+from src.chunker import Chunk, iter_chunks
+from src.config import settings
+from src.metadata_extractor import attach_findings, metadata_extractor
+from src.pdf_extractor import iter_pdf_pages
 import io
-import re
+import os
 import logging
-from datetime import datetime
  
 logger = logging.getLogger(__name__)
  
@@ -21,11 +27,8 @@ def extract_text_from_pdf(content: bytes) -> str:
     try:
         import PyPDF2
         reader = PyPDF2.PdfReader(io.BytesIO(content))
-        return "\n\n".join(
-            f"[Page {i+1}]\n{page.extract_text()}"
-            for i, page in enumerate(reader.pages)
-            if page.extract_text()
-        )
+        pages = ((i + 1, page.extract_text()) for i, page in enumerate(reader.pages))
+        return "\n\n".join(_page_block(n, text) for n, text in pages if text)
     except Exception as e:
         raise RuntimeError(f"PDF extraction failed: {e}")
  
@@ -33,72 +36,30 @@ def extract_text_from_pdf(content: bytes) -> str:
 def extract_audit_metadata(text: str) -> dict:
     """
     Try to extract audit-specific metadata from the report text.
-    Uses simple pattern matching — works for well-structured reports.
-    Returns defaults if patterns not found (never crashes).
+    Rule-based, one compiled pass (see src/metadata_extractor.py): report
+    fields come from the header, plus a "findings" list with one record
+    per finding. Returns defaults if patterns not found (never crashes).
     """
-    metadata = {
-        "region": None, "severity": None,
-        "audit_type": None, "year": datetime.now().year
-    }
- 
-    # Extract region
-    region_match = re.search(r'Region:\s*([^\n]+)', text)
-    if region_match:
-        metadata["region"] = region_match.group(1).strip()[:50]
- 
-    # Extract severity
-    sev_match = re.search(
-        r'Severity Classification:\s*(Critical|High|Medium|Low|Info)',
-        text, re.IGNORECASE
-    )
-    if sev_match:
-        metadata["severity"] = sev_match.group(1).lower()
- 
-    # Extract audit type
-    type_match = re.search(r'Audit Type:\s*([^\n]+)', text)
-    if type_match:
-        metadata["audit_type"] = type_match.group(1).strip()[:100]
- 
-    # Extract year from date
-    year_match = re.search(r'Date:.*?(20\d{2})', text)
-    if year_match:
-        metadata["year"] = int(year_match.group(1))
- 
-    logger.info(f"Extracted metadata: {metadata}")
-    return metadata
+    return _logged(metadata_extractor.extract(text))
  
  
-def chunk_text(text: str, min_size: int = 100, max_size: int = 1000) -> list[str]:
-    """Same chunking as Project 1 — reused unchanged."""
-    raw = [c.strip() for c in text.split("\n\n") if c.strip()]
-    sized = []
-    for chunk in raw:
-        if len(chunk) <= max_size:
-            sized.append(chunk)
-        else:
-            sents = chunk.replace(". ", ".\n").split("\n")
-            curr = ""
-            for s in sents:
-                if len(curr) + len(s) < max_size: curr += (" " + s if curr else s)
-                else:
-                    if curr: sized.append(curr.strip())
-                    curr = s
-            if curr: sized.append(curr.strip())
-    final, buf = [], ""
-    for c in sized:
-        if len(buf) + len(c) < min_size: buf += (" " + c if buf else c)
-        else:
-            if buf: final.append(buf.strip())
-            buf = c
-    if buf: final.append(buf.strip())
-    return final
+def _logged(metadata: dict) -> dict:
+    report_fields = {k: v for k, v in metadata.items() if k != "findings"}
+    logger.info(f"Extracted metadata: {report_fields}, {len(metadata['findings'])} finding(s)")
+    return metadata
  
  
-def process_audit_report(filename: str, content: bytes) -> tuple[list[str], dict]:
+def chunk_text(text: str, min_size: int = 100, max_size: int = 1000,
+               overlap: int = 0) -> list[Chunk]:
     """
-    Process an audit report file.
-    Returns (chunks, metadata) where metadata has region, severity, etc.
+    Same chunking as Project 1 (see src/chunker.py). Each chunk is a str
+    that also carries its character offsets and pages.
     """
+    return list(iter_chunks([text], min_size, max_size, overlap))
+ 
+ 
+def extract_text(filename: str, content: bytes) -> str:
+    """Extract raw text from a .txt or .pdf upload (the 'extract' stage)."""
     if filename.lower().endswith(".txt"):
         text = extract_text_from_txt(content)
     elif filename.lower().endswith(".pdf"):
@@ -108,7 +69,55 @@ def process_audit_report(filename: str, content: bytes) -> tuple[list[str], dict
  
     if not text.strip():
         raise ValueError(f"No text extracted from {filename}")
+    return text
  
+ 
+def process_audit_text(text: str) -> tuple[list[str], dict]:
+    """Metadata extraction + chunking of already-extracted text (the 'chunk' stage)."""
     metadata = extract_audit_metadata(text)
-    chunks = chunk_text(text)
+    chunks = chunk_text(text, settings.chunk_min_size, settings.chunk_max_size,
+                        settings.chunk_overlap)
+    attach_findings(chunks, metadata["findings"])
     return chunks, metadata
+ 
+ 
+def process_audit_pdf(path: str, executor: Executor = None,
+                      pages_per_task: int = 8) -> tuple[list[str], dict]:
+    """
+    process_audit_report() for a PDF on disk, without loading it whole:
+    pages are extracted in parallel (see src/pdf_extractor.py), and chunked
+    and scanned for metadata in page order as they arrive; no page is kept
+    once it has been through both. Same chunks and metadata as the
+    in-memory path.
+    """
+    extraction = metadata_extractor.stream()
+ 
+    def page_blocks():
+        for number, text in iter_pdf_pages(path, executor, pages_per_task):
+            if text:
+                block = _page_block(number, text)
+                extraction.feed(block)
+                yield block
+ 
+    try:
+        chunks = list(iter_chunks(page_blocks(), settings.chunk_min_size,
+                                  settings.chunk_max_size, settings.chunk_overlap))
+    except Exception as e:
+        raise RuntimeError(f"PDF extraction failed: {e}")
+    if not chunks:
+        raise ValueError(f"No text extracted from {os.path.basename(path)}")
+    metadata = _logged(extraction.finish())
+    attach_findings(chunks, metadata["findings"])
+    return chunks, metadata
+ 
+ 
+def _page_block(number: int, text: str) -> str:
+    return f"[Page {number}]\n{text}"
+ 
+ 
+def process_audit_report(filename: str, content: bytes) -> tuple[list[str], dict]:
+    """
+    Process an audit report file.
+    Returns (chunks, metadata) where metadata has region, severity, etc.
+    """
+    return process_audit_text(extract_text(filename, content))
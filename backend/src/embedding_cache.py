@@ -0,0 +1,164 @@
+"""
+Embedding Cache — persistent, content-addressed store for vectors.
+
+Re-uploading a quarterly pack re-embeds thousands of identical boilerplate
+chunks, and auditors ask the same questions over and over. This cache sits
+in front of the OpenAI Embeddings API so identical text is only paid for once:
+- Key: (embedding model, sha256 of whitespace-normalised text)
+- Value: the embedding, stored as a compact float32 blob
+- Eviction: least-recently-used, bounded by max_entries
+
+It is a small SQLite file next to the Chroma data, so it survives restarts.
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# SQLite limits the number of "?" parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially re-formatted text shares a key."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Size-bounded LRU cache of embeddings backed by SQLite."""
+
+    def __init__(self, path: str, max_entries: int = 200_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._clock = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: list[str]) -> list[Optional[list[float]]]:
+        """
+        Bulk lookup. Returns one entry per input text: the cached vector,
+        or None on a miss. Hits are touched so they survive eviction.
+        """
+        hashes = [text_hash(t) for t in texts]
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for i in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[i:i + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for h, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[h] = vec.tolist()
+            if found:
+                now = self._tick()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found]
+                )
+                self._conn.commit()
+
+        results = [found.get(h) for h in hashes]
+        hit_count = sum(1 for r in results if r is not None)
+        with self._lock:
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float]]) -> None:
+        """Store freshly computed embeddings, evicting the LRU tail if full."""
+        if not texts:
+            return
+        with self._lock:
+            now = self._tick()
+        rows = [
+            (model, text_hash(t), array("f", v).tobytes(), now)
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            # Only new rows grow the cache: counting the table after each
+            # insert is a full scan. A text already cached has the same vector,
+            # so an existing row just becomes recently used.
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            inserted = self._conn.total_changes - before
+            self._size += inserted
+            if inserted < len(rows):
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, row[1]) for row in rows]
+                )
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN ("
+                    " SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+                self._size -= overflow
+                logger.info(f"Embedding cache evicted {overflow} entries")
+            self._conn.commit()
+
+    def _tick(self) -> float:
+        """Strictly increasing timestamp so LRU order never ties."""
+        self._clock = max(time.time(), self._clock + 1e-6)
+        return self._clock
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size = 0
@@ -9,55 +9,228 @@ Think of it as a companion to llm_service.py:
 CRITICAL RULE: Always use the same model for documents AND queries.
 Mixing models is like mixing GPS coordinate systems — results are garbage.
 """
-from openai import OpenAI
+from openai import RateLimitError
 from src.config import settings
+from src.embedding_cache import EmbeddingCache
+from src.executors import run_io
+from src.metrics import record_openai_failure, record_openai_usage
+from src.openai_client import get_openai_client
+from src.single_flight import SingleFlight
+from src.tokenizer import count_tokens
+import asyncio
 import logging
+import os
+import random
  
 logger = logging.getLogger(__name__)
  
+ 
+def pack_batches(texts: list[str], max_tokens: int, max_items: int) -> list[list[int]]:
+    """
+    Group text indices into API batches by token budget, not item count.
+    Batches keep the original order; a single oversized text gets its own batch.
+    """
+    batches, current, current_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+ 
+ 
+def _retry_after(error: RateLimitError) -> float:
+    """Seconds OpenAI asked us to wait, if it said so (0 otherwise)."""
+    try:
+        return float(error.response.headers.get("retry-after", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+ 
+ 
+class AdaptiveConcurrency:
+    """
+    Concurrency limit that backs off when OpenAI rate-limits us (AIMD):
+    halve the number of in-flight batches on a 429, grow by one again
+    after a run of successes, never above max_limit.
+    """
+ 
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = None
+        self._loop = None
+ 
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one event loop; rebuild on a new one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._cond, self._loop, self._in_flight = asyncio.Condition(), loop, 0
+        return self._cond
+ 
+    async def acquire(self) -> None:
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+ 
+    async def release(self, rate_limited: bool = False) -> None:
+        cond = self._condition()
+        async with cond:
+            self._in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._successes = 0
+            cond.notify_all()
+ 
+ 
 class EmbeddingService:
     """Wrapper around the OpenAI Embeddings API."""
  
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = get_openai_client()
         self.model = settings.embedding_model  # text-embedding-3-small
+        # The `dimensions` parameter shortens text-embedding-3 vectors; cached
+        # vectors are keyed by model AND size so the two never mix
+        self.dimensions = settings.embedding_dimensions or None
+        self.request_options = {"dimensions": self.dimensions} if self.dimensions else {}
+        self.cache_key = f"{self.model}@{self.dimensions}" if self.dimensions else self.model
+        self.limiter = AdaptiveConcurrency(settings.embedding_max_concurrency)
+        # The same question asked by several people at once is embedded once
+        self.in_flight = SingleFlight("embeddings", enabled=settings.openai_coalesce_enabled)
+        self.cache = None
+        if settings.embedding_cache_enabled:
+            cache_path = settings.embedding_cache_path or os.path.join(
+                settings.chroma_path, "embedding_cache.sqlite3"
+            )
+            self.cache = EmbeddingCache(
+                path=cache_path,
+                max_entries=settings.embedding_cache_max_entries
+            )
  
-    def embed_text(self, text: str) -> list[float]:
+    async def embed_text(self, text: str) -> list[float]:
         """
         Convert a single piece of text to a vector.
         Use this for: embedding a user's question at query time.
         """
-        response = self.client.embeddings.create(
+        if self.cache:
+            cached = (await run_io(self.cache.get_many, self.cache_key, [text]))[0]
+            if cached is not None:
+                return cached
+        return await self.in_flight.do(text, lambda: self._embed_one(text))
+
+    async def _embed_one(self, text: str) -> list[float]:
+        response = await self.client.embeddings.create(
             input=text,
-            model=self.model
+            model=self.model,
+            **self.request_options
         )
-        return response.data[0].embedding
+        record_openai_usage("embeddings", self.model, getattr(response, "usage", None))
+        embedding = response.data[0].embedding
+        if self.cache:
+            await run_io(self.cache.put_many, self.cache_key, [text], [embedding])
+        return embedding
  
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
         """
-        Convert many texts to vectors in ONE API call.
+        Convert many texts to vectors in as few API calls as possible.
         ALWAYS use this when processing document chunks — never call
         embed_text() in a loop. Batch processing is 10-50x faster.
         
         Use this for: embedding all chunks when a document is uploaded.
+        Only cache misses are sent to OpenAI.
         """
         if not texts:
             return []
-        
-        # OpenAI accepts up to 2048 texts in one call.
-        # For very large documents, split into batches of 100.
-        BATCH_SIZE = 100
-        all_embeddings = []
-        
-        for i in range(0, len(texts), BATCH_SIZE):
-            batch = texts[i:i + BATCH_SIZE]
-            logger.info(f"Embedding batch {i//BATCH_SIZE + 1}: {len(batch)} texts")
-            response = self.client.embeddings.create(
-                input=batch,
-                model=self.model
-            )
-            all_embeddings.extend([d.embedding for d in response.data])
-        
+        if not self.cache:
+            return await self._embed_uncached(texts)
+ 
+        all_embeddings = await run_io(self.cache.get_many, self.cache_key, texts)
+        miss_idx = [i for i, e in enumerate(all_embeddings) if e is None]
+        if miss_idx:
+            logger.info(f"Embedding cache: {len(texts) - len(miss_idx)} hits, "
+                        f"{len(miss_idx)} misses")
+            miss_texts = list(dict.fromkeys(texts[i] for i in miss_idx))
+            fresh = await self._embed_uncached(miss_texts)
+            await run_io(self.cache.put_many, self.cache_key, miss_texts, fresh)
+            by_text = dict(zip(miss_texts, fresh))
+            for i in miss_idx:
+                all_embeddings[i] = by_text[texts[i]]
+        return all_embeddings
+ 
+    async def _embed_uncached(self, texts: list[str]) -> list[list[float]]:
+        """
+        Send texts to the OpenAI Embeddings API.
+        Batches are packed by token budget and several are kept in flight at
+        once, so a 300-page report costs a few parallel round trips instead
+        of a long serial chain. Results come back in the original order.
+        """
+        unique = list(dict.fromkeys(texts))
+        if len(unique) < len(texts):
+            # Repeated text (boilerplate chunks) is sent, and billed, once
+            vectors = dict(zip(unique, await self._embed_uncached(unique)))
+            return [vectors[text] for text in texts]
+        batches = pack_batches(
+            texts,
+            max_tokens=settings.embedding_batch_max_tokens,
+            max_items=settings.embedding_batch_max_items
+        )
+        if len(batches) > 1:
+            logger.info(f"Embedding {len(texts)} texts in {len(batches)} batches "
+                        f"(up to {self.limiter.limit} in flight)")
+        results = await asyncio.gather(*[
+            self._embed_with_retry([texts[i] for i in indices], batch_no)
+            for batch_no, indices in enumerate(batches, 1)
+        ])
+        all_embeddings: list = [None] * len(texts)
+        for indices, vectors in zip(batches, results):
+            for i, vec in zip(indices, vectors):
+                all_embeddings[i] = vec
         return all_embeddings
  
+    async def _embed_with_retry(self, batch: list[str], batch_no: int) -> list[list[float]]:
+        """One batch, with exponential backoff (plus jitter) on rate limits."""
+        max_retries = settings.embedding_max_retries
+        for attempt in range(max_retries):
+            await self.limiter.acquire()
+            try:
+                response = await self.client.embeddings.create(input=batch, model=self.model,
+                                                               **self.request_options)
+            except RateLimitError as e:
+                record_openai_failure("embeddings", self.model, rate_limited=True)
+                await self.limiter.release(rate_limited=True)
+                if attempt == max_retries - 1:
+                    raise
+                wait_time = _retry_after(e) or 2 ** attempt
+                wait_time += random.uniform(0, 0.5)
+                logger.warning(f"Embedding batch {batch_no} rate limited. "
+                               f"Waiting {wait_time:.1f}s (limit now {self.limiter.limit})")
+                await asyncio.sleep(wait_time)
+                continue
+            except BaseException as e:
+                if not isinstance(e, asyncio.CancelledError):
+                    record_openai_failure("embeddings", self.model)
+                await self.limiter.release()
+                raise
+            await self.limiter.release()
+            record_openai_usage("embeddings", self.model, getattr(response, "usage", None))
+            logger.info(f"Embedding batch {batch_no}: {len(batch)} texts")
+            return [d.embedding for d in response.data]
+ 
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for /health."""
+        if not self.cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
+ 
 embedding_service = EmbeddingService()
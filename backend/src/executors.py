@@ -0,0 +1,43 @@
+"""
+Executors for blocking work called from async endpoints.
+
+FastAPI runs every `async def` endpoint on ONE event loop. Anything that
+blocks inside them (PDF parsing, Chroma calls) freezes every other user.
+- run_cpu(): CPU-bound work (PDF parsing, chunking) in a process pool,
+  so it doesn't fight the event loop for the GIL
+- run_io(): blocking I/O (Chroma, SQLite) in a thread pool
+"""
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import functools
+import multiprocessing
+from src.config import settings
+
+_cpu_pool: ProcessPoolExecutor = None
+
+
+def get_cpu_pool() -> ProcessPoolExecutor:
+    """Created lazily so importing the app never spawns processes."""
+    global _cpu_pool
+    if _cpu_pool is None:
+        _cpu_pool = ProcessPoolExecutor(
+            max_workers=settings.cpu_workers or None,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _cpu_pool
+
+
+async def run_cpu(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_pool(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_io(fn, *args, **kwargs):
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+def shutdown() -> None:
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
@@ -0,0 +1,288 @@
+"""
+Findings Store — one SQLite row per audit finding.
+
+process_audit_report() already reads every "FINDING n" block (severity,
+region, responsible party, deadline), but until now those records only
+ended up as tags on chunks, so "critical findings due before March 2026"
+went through vector search and GPT. Here they are a table next to the
+report registry:
+- One row per finding, with its report's region, severity, audit type
+  and year alongside (a finding's own region is often a city, while
+  questions name the report's region)
+- Deadlines parsed to ISO dates are kept in deadline_date, so date ranges
+  are index range scans; a deadline that wasn't a date stays in deadline
+- Indexes on severity (by rank), region, deadline and owner. An owner
+  like "IT Security — Priya Sharma" is also indexed by its parts and their
+  last words ("priya sharma", "sharma", "it security", "security"), so
+  "owned by Priya Sharma" is an index range scan, not a LIKE '%...%' scan
+- query() answers the structured questions directly (see
+  src/structured_query.py for how questions are routed here)
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Optional
+from src.metadata_extractor import SEVERITY_RANK
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["report_id", "finding_id", "report_title", "title", "severity", "severity_rank",
+           "region", "report_region", "owner", "deadline", "deadline_date",
+           "report_severity", "audit_type", "year"]
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_OWNER_PARTS = re.compile(r"\s*[—–/,;|()]\s*|\s+-\s+")
+_KEY_END = "\U0010ffff"  # Sorts after every other character: key >= q AND key < q + _KEY_END
+
+
+class FindingsStore:
+    """SQLite-backed findings table. All methods are thread-safe."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._regions = None  # Cached until the next write
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS findings (
+                report_id       TEXT NOT NULL,
+                finding_id      TEXT NOT NULL,
+                report_title    TEXT,
+                title           TEXT,
+                severity        TEXT,
+                severity_rank   INTEGER,
+                region          TEXT,
+                report_region   TEXT,
+                owner           TEXT,
+                deadline        TEXT,
+                deadline_date   TEXT,
+                report_severity TEXT,
+                audit_type      TEXT,
+                year            INTEGER,
+                PRIMARY KEY (report_id, finding_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity_rank, deadline_date);
+            CREATE INDEX IF NOT EXISTS idx_findings_deadline ON findings(deadline_date);
+            CREATE INDEX IF NOT EXISTS idx_findings_region ON findings(region COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_findings_report_region
+                ON findings(report_region COLLATE NOCASE);
+            DROP INDEX IF EXISTS idx_findings_owner;
+            -- Normalised owner names, their parts and the parts' last words
+            CREATE TABLE IF NOT EXISTS finding_owners (
+                key        TEXT NOT NULL,
+                report_id  TEXT NOT NULL,
+                finding_id TEXT NOT NULL,
+                PRIMARY KEY (key, report_id, finding_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_finding_owners_report ON finding_owners(report_id);
+            -- Every indexed report, even one without findings (startup validation)
+            CREATE TABLE IF NOT EXISTS finding_reports (
+                report_id TEXT PRIMARY KEY,
+                findings  INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._conn.commit()
+        if self.count() and not self._conn.execute("SELECT 1 FROM finding_owners LIMIT 1").fetchone():
+            # Written before owners were indexed by their parts
+            rows = self._conn.execute(
+                "SELECT report_id, finding_id, owner FROM findings WHERE owner IS NOT NULL").fetchall()
+            self._conn.executemany("INSERT OR IGNORE INTO finding_owners VALUES (?, ?, ?)",
+                                   [(key, r[0], r[1]) for r in rows for key in owner_keys(r[2])])
+            self._conn.commit()
+
+    # ── WRITES ─────────────────────────────────────────────
+    def replace_report(self, report_id: str, report: dict, findings: list[dict]) -> None:
+        """
+        The findings of one report, replacing any it had. report holds the
+        report-level fields (title, region, severity, audit_type, year).
+        """
+        rows = [_row(report_id, report, finding) for finding in findings
+                if finding.get("finding_id")]
+        with self._lock:
+            self._conn.execute("DELETE FROM findings WHERE report_id = ?", (report_id,))
+            self._conn.execute("DELETE FROM finding_owners WHERE report_id = ?", (report_id,))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO findings ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                [[row[c] for c in COLUMNS] for row in rows]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO finding_owners VALUES (?, ?, ?)",
+                [(key, report_id, row["finding_id"]) for row in rows
+                 for key in owner_keys(row["owner"])]
+            )
+            self._conn.execute("INSERT OR REPLACE INTO finding_reports VALUES (?, ?)",
+                               (report_id, len(rows)))
+            self._conn.commit()
+            self._regions = None
+
+    def delete_report(self, report_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM findings WHERE report_id = ?", (report_id,))
+            self._conn.execute("DELETE FROM finding_owners WHERE report_id = ?", (report_id,))
+            self._conn.execute("DELETE FROM finding_reports WHERE report_id = ?", (report_id,))
+            self._conn.commit()
+            self._regions = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM findings")
+            self._conn.execute("DELETE FROM finding_owners")
+            self._conn.execute("DELETE FROM finding_reports")
+            self._conn.commit()
+            self._regions = None
+
+    # ── READS ──────────────────────────────────────────────
+    def query(self, severity: list[str] = None, region: list[str] = None, owner: str = None,
+              deadline_from: str = None, deadline_to: str = None,
+              year_min: int = None, year_max: int = None, report_severity: list[str] = None,
+              audit_type: list[str] = None, limit: int = None,
+              offset: int = 0) -> tuple[list[dict], int]:
+        """
+        Findings matching every given filter, soonest deadline first (then
+        most severe), plus the total number of matches.
+        - severity, report_severity, audit_type: any of the values
+        - region: the finding's region or its report's, any of the values
+        - owner: the start of the responsible party or of any of its parts
+          or words ("Priya Sharma", "sharma", "IT Sec"), case-insensitive
+        - deadline_from / deadline_to: ISO dates, inclusive; findings whose
+          deadline isn't a date never match a deadline filter
+        """
+        clauses, params = [], []
+
+        def any_of(column: str, values) -> None:
+            values = [v for v in (values or []) if v]
+            if values:
+                clauses.append(f"{column} COLLATE NOCASE IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+
+        if severity:
+            # By rank, which is indexed; a severity that doesn't exist matches nothing
+            ranks = sorted({SEVERITY_RANK[s.lower()] for s in severity
+                            if s and s.lower() in SEVERITY_RANK})
+            if not ranks:
+                return [], 0
+            clauses.append(f"severity_rank IN ({', '.join('?' * len(ranks))})")
+            params.extend(ranks)
+        any_of("report_severity", report_severity)
+        any_of("audit_type", audit_type)
+        regions = [r for r in (region or []) if r]
+        if regions:
+            marks = ", ".join("?" * len(regions))
+            clauses.append(f"(region COLLATE NOCASE IN ({marks}) "
+                           f"OR report_region COLLATE NOCASE IN ({marks}))")
+            params.extend(regions * 2)
+        owner = _normalise_owner(owner)
+        if owner:
+            clauses.append("(report_id, finding_id) IN (SELECT report_id, finding_id "
+                           "FROM finding_owners WHERE key >= ? AND key < ?)")
+            params.extend([owner, owner + _KEY_END])
+        if deadline_from:
+            clauses.append("deadline_date >= ?")
+            params.append(deadline_from)
+        if deadline_to:
+            clauses.append("deadline_date <= ?")
+            params.append(deadline_to)
+        if year_min:
+            clauses.append("year >= ?")
+            params.append(year_min)
+        if year_max:
+            clauses.append("year <= ?")
+            params.append(year_max)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM findings {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM findings {where} "
+                f"ORDER BY deadline_date IS NULL, deadline_date, severity_rank, finding_id "
+                f"LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset]
+            ).fetchall()
+        return [dict(r) for r in rows], total
+
+    def regions(self) -> list[str]:
+        """Every finding and report region, for recognising them in questions."""
+        with self._lock:
+            if self._regions is None:
+                rows = self._conn.execute(
+                    "SELECT region FROM findings WHERE region IS NOT NULL "
+                    "UNION SELECT report_region FROM findings WHERE report_region IS NOT NULL"
+                ).fetchall()
+                self._regions = sorted(r[0] for r in rows)
+            return self._regions
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM findings").fetchone()[0]
+
+    def report_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM finding_reports").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"findings": self.count(), "reports": self.report_count()}
+
+
+def _row(report_id: str, report: dict, finding: dict) -> dict:
+    deadline = finding.get("deadline")
+    return {
+        "report_id": report_id,
+        "finding_id": finding["finding_id"],
+        "report_title": report.get("title"),
+        "title": finding.get("title"),
+        "severity": finding.get("severity"),
+        "severity_rank": SEVERITY_RANK.get(finding.get("severity")),
+        "region": finding.get("region"),
+        "report_region": report.get("region"),
+        "owner": finding.get("owner"),
+        "deadline": deadline,
+        "deadline_date": deadline if deadline and _ISO_DATE.fullmatch(deadline) else None,
+        "report_severity": report.get("severity"),
+        "audit_type": report.get("audit_type"),
+        "year": report.get("year"),
+    }
+
+
+def _normalise_owner(owner: Optional[str]) -> str:
+    return " ".join((owner or "").lower().split())
+
+
+def owner_keys(owner: Optional[str]) -> set[str]:
+    """
+    What an owner is indexed under: the whole name, each part ("IT
+    Security — Priya Sharma" → "it security", "priya sharma") and each
+    part's trailing words ("security", "sharma"), normalised.
+    """
+    keys = set()
+    whole = _normalise_owner(owner)
+    if whole:
+        keys.add(whole)
+        for part in _OWNER_PARTS.split(whole):
+            words = part.split()
+            keys.update(" ".join(words[i:]) for i in range(len(words)))
+    return keys
+
+
+def findings_from_chunks(metadatas: list[dict]) -> list[dict]:
+    """
+    Rebuild a report's finding records from its chunk tags (finding_id,
+    finding_severity, finding_owner, finding_deadline), for reports indexed
+    before this store existed. Titles and finding regions aren't in the tags.
+    """
+    findings: dict[str, dict] = {}
+    for meta in sorted(metadatas, key=lambda m: m.get("chunk_index", 0)):
+        finding_id = meta.get("finding_id")
+        if not finding_id:
+            continue
+        finding = findings.setdefault(finding_id, {"finding_id": finding_id})
+        for field in ("severity", "owner", "deadline"):
+            value = meta.get(f"finding_{field}")
+            if value and field not in finding:
+                finding[field] = value
+    return list(findings.values())
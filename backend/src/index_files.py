@@ -0,0 +1,122 @@
+"""
+Index Files — how and when the chunk indexes' files are written.
+
+The BM25, metadata and theme indexes each persist as one .npz of flat
+arrays (no pickle):
+- Strings go in as one UTF-8 byte array plus offsets rather than numpy's
+  fixed-width unicode arrays: those pad every entry to the longest one at
+  4 bytes a character, so a single long token (a base64 blob or a URL in a
+  PDF) multiplied the size of the whole file
+- A save rewrites the whole file, so IndexSaver saves in the background
+  (at most every settings.index_save_interval_seconds, and at shutdown)
+  instead of after every write, which made each upload slower as the
+  archive grew
+"""
+from contextlib import contextmanager
+import atexit
+import logging
+import os
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def pack_strings(arrays: dict, name: str, strings: list) -> None:
+    """Add strings (None is stored as "") to arrays as <name>_utf8 + <name>_offsets."""
+    encoded = [(s or "").encode("utf-8", "surrogatepass") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    arrays[f"{name}_utf8"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    arrays[f"{name}_offsets"] = offsets
+
+
+def unpack_strings(data, name: str) -> list[str]:
+    """The strings pack_strings() stored, or a fixed-width array under name (older files)."""
+    if f"{name}_utf8" not in data.files:
+        return data[name].tolist()
+    buffer = data[f"{name}_utf8"].tobytes()
+    offsets = data[f"{name}_offsets"].tolist()
+    return [buffer[start:end].decode("utf-8", "surrogatepass")
+            for start, end in zip(offsets, offsets[1:])]
+
+
+def has_strings(data, name: str) -> bool:
+    return f"{name}_utf8" in data.files or name in data.files
+
+
+class IndexSaver:
+    """
+    Saves indexes at most every `interval` seconds after they change, and
+    on flush() (shutdown). Writes go through changing(); writes and saves
+    are serialised, so a save never holds half a write.
+
+    From the first write after a save until the next save, a marker file
+    exists. If the process dies in between, the next start finds it
+    (interrupted) and rebuilds the indexes from the collection instead of
+    loading files that miss those writes. interval 0 saves after every write.
+    """
+
+    def __init__(self, indexes: list, marker_path: str, interval: float = 30.0):
+        self.indexes = indexes
+        self.marker_path = marker_path
+        self.interval = interval
+        self.interrupted = os.path.exists(marker_path)
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._timer = None
+        atexit.register(self.flush)
+
+    @contextmanager
+    def changing(self):
+        """Wrap every write to the indexes."""
+        with self._lock:
+            if not self._dirty:
+                directory = os.path.dirname(self.marker_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                open(self.marker_path, "w").close()
+                self._dirty = True
+            try:
+                yield
+            finally:
+                if self.interval <= 0:
+                    self._save()
+                elif self._timer is None:
+                    self._timer = threading.Timer(self.interval, self._save_in_background)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def flush(self) -> None:
+        """Save now if anything changed since the last save."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                self._save()
+
+    def recovered(self) -> None:
+        """The indexes were rebuilt and saved after an interrupted run."""
+        with self._lock:
+            self.interrupted = False
+            if not self._dirty:
+                self._remove_marker()
+
+    def _save_in_background(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Saving the chunk indexes failed ({e}); retrying after the next write")
+
+    def _save(self) -> None:
+        for index in self.indexes:
+            index.save()
+        self._dirty = False
+        self._remove_marker()
+
+    def _remove_marker(self) -> None:
+        try:
+            os.unlink(self.marker_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,214 @@
+"""
+Ingestion Jobs — background processing of uploaded reports.
+
+POST /reports/upload used to extract, chunk, embed and index inside the
+HTTP request, so big PDFs hit the client timeout. Now the upload only
+queues a job and returns its id; a bounded pool of worker coroutines does
+the rest, and clients poll GET /jobs/{id} for per-stage progress:
+
+    extract (process pool) → chunk (process pool) → embed (OpenAI) → index (Chroma)
+
+Because each worker awaits between stages, one report's PDF parsing
+overlaps with another report's embedding. Identical uploads submitted while
+the first is still queued or running share a single job.
+
+Large PDFs arrive as a temp file instead of bytes (see
+src/pdf_extractor.py): their pages are extracted in parallel and chunked
+as they stream in, so for them "extract" covers chunking too. The worker
+deletes the file when the job ends.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from src.config import settings
+from src.document_processor import extract_text, process_audit_pdf, process_audit_text
+from src.executors import get_cpu_pool, run_cpu, run_io
+from src.metrics import observe_stage
+from src.pdf_extractor import remove_quietly
+from src.models import ChunkDiff, IngestionJob, JobStatus, ReportUploadResponse
+from src.vector_store import audit_vector_store
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["extract", "chunk", "embed", "index"]
+
+
+class IngestionQueueFull(Exception):
+    """Raised when too many uploads are already waiting."""
+
+
+class IngestionJobManager:
+    """Queue + worker pool + job registry for report ingestion."""
+
+    def __init__(self, workers: int = 4, queue_size: int = 100, history: int = 1000):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.history = history
+        self._jobs: OrderedDict[str, IngestionJob] = OrderedDict()
+        self._active_by_hash: dict[str, str] = {}  # content hash → job_id
+        self._queue: asyncio.Queue = None
+        self._tasks: list[asyncio.Task] = []
+        self._loop = None
+
+    # ── PUBLIC API ─────────────────────────────────────────
+    def submit(self, filename: str, content: bytes = None, path: str = None,
+               content_sha256: str = None, replaces: str = None) -> tuple[IngestionJob, bool]:
+        """
+        Queue a report for ingestion, given as bytes or as a spilled PDF
+        (path + the sha256 of its content). The manager owns path from here on
+        and deletes it once it is no longer needed. replaces: the report_id
+        of the indexed report this is a revision of.
+        Returns (job, deduplicated). Must be called from the event loop.
+        """
+        if path is None:
+            content_sha256 = hashlib.sha256(content).hexdigest()
+        content_hash = hashlib.sha256(
+            f"{filename}\0{content_sha256}\0{replaces or ''}".encode()).hexdigest()
+        existing = self._active_by_hash.get(content_hash)
+        if existing:
+            logger.info(f"Upload of '{filename}' coalesced into job {existing}")
+            if path:
+                remove_quietly(path)
+            return self._jobs[existing], True
+
+        self._ensure_workers()
+        job = IngestionJob(
+            job_id=str(uuid.uuid4())[:8],
+            filename=filename,
+            replaces=replaces,
+            created_at=datetime.utcnow().isoformat()
+        )
+        try:
+            self._queue.put_nowait((job.job_id, content_hash, content, path))
+        except asyncio.QueueFull:
+            if path:
+                remove_quietly(path)
+            raise IngestionQueueFull(f"{self.queue_size} uploads already waiting")
+
+        self._jobs[job.job_id] = job
+        self._active_by_hash[content_hash] = job.job_id
+        self._trim_history()
+        return job, False
+
+    def get(self, job_id: str) -> IngestionJob:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {"workers": len(self._tasks), "queued": self._queue.qsize() if self._queue else 0,
+                "jobs": counts}
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    # ── WORKERS ────────────────────────────────────────────
+    def _ensure_workers(self) -> None:
+        """Start the worker pool on first use, on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._tasks and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"ingest-worker-{n}")
+            for n in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} ingestion workers")
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job_id, content_hash, content, path = await self._queue.get()
+            try:
+                await self._run(self._jobs[job_id], content, path)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Ingestion job {job_id} failed")
+                job = self._jobs[job_id]
+                job.status = JobStatus.FAILED
+                job.error = str(e) if isinstance(e, ValueError) else "Report processing failed"
+                job.finished_at = datetime.utcnow().isoformat()
+            finally:
+                if path:
+                    remove_quietly(path)
+                self._active_by_hash.pop(content_hash, None)
+                self._queue.task_done()
+
+    async def _run(self, job: IngestionJob, content: bytes, path: str = None) -> None:
+        job.status = JobStatus.RUNNING
+        stage_started = time.perf_counter()
+
+        def on_stage(stage: str) -> None:
+            nonlocal stage_started
+            now = time.perf_counter()
+            if job.stage:
+                job.stage_seconds[job.stage] = round(now - stage_started, 3)
+                if job.stage in ("extract", "chunk"):
+                    # embed and index are timed by the vector store (bulk ingestion too)
+                    observe_stage("ingest", job.stage, now - stage_started)
+                job.progress = (STAGES.index(job.stage) + 1) / len(STAGES)
+            job.stage, stage_started = stage, now
+
+        on_stage("extract")
+        if path:
+            # Pages fan out to the process pool; this thread only chunks them
+            chunks, metadata = await run_io(process_audit_pdf, path, get_cpu_pool(),
+                                            settings.pdf_pages_per_task)
+            on_stage("chunk")
+        else:
+            text = await run_cpu(extract_text, job.filename, content)
+            on_stage("chunk")
+            chunks, metadata = await run_cpu(process_audit_text, text)
+
+        # A revision (or an identical copy) of a known report is updated chunk-by-chunk
+        report_id, diff = await audit_vector_store.upsert_report(
+            title=job.filename, chunks=chunks, report_id=job.replaces,
+            region=metadata.get("region"),
+            severity=metadata.get("severity"),
+            audit_type=metadata.get("audit_type"),
+            year=metadata.get("year"),
+            on_stage=on_stage,
+            findings=metadata.get("findings")
+        )
+        on_stage(None)  # Close the timing of the last stage
+
+        job.status = JobStatus.COMPLETED
+        job.progress = 1.0
+        job.finished_at = datetime.utcnow().isoformat()
+        job.result = ReportUploadResponse(
+            report_id=report_id, title=job.filename,
+            chunks_created=len(chunks), extracted_metadata=metadata
+        )
+        if diff:
+            job.result.version = diff["version"]
+            job.result.chunk_diff = ChunkDiff(**diff)
+            job.result.message = "Existing report updated incrementally"
+        logger.info(f"Job {job.job_id}: ingested '{job.filename}' as {report_id} "
+                    f"{job.stage_seconds}")
+
+    def _trim_history(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit."""
+        overflow = len(self._jobs) - self.history
+        for job_id in list(self._jobs):
+            if overflow <= 0:
+                break
+            if self._jobs[job_id].status in (JobStatus.COMPLETED, JobStatus.FAILED):
+                del self._jobs[job_id]
+                overflow -= 1
+
+
+ingestion_jobs = IngestionJobManager(
+    workers=settings.ingest_workers,
+    queue_size=settings.ingest_queue_size,
+    history=settings.ingest_job_history
+)
@@ -0,0 +1,121 @@
+"""
+Incremental JSON Parser — read the LLM's answer object while it streams.
+
+GPT returns {"answer": ..., "key_findings": [...], ...} one token at a time.
+json.loads() needs the whole document, so this small state machine walks
+the characters as they arrive instead and reports:
+- ("answer_delta", text): new characters of the top-level "answer" string
+- ("finding", text): each key_findings item, as soon as its string closes
+
+Anything before the first "{" (e.g. a ```json fence) and after the final
+"}" is ignored. The full text is still parsed with json.loads() at the end;
+this parser only exists to show progress early.
+"""
+import json
+
+STREAMED_TEXT_KEY = "answer"
+STREAMED_LIST_KEY = "key_findings"
+
+
+class IncrementalAnswerParser:
+    """Feed raw completion deltas, get back newly available answer events."""
+
+    def __init__(self):
+        self._stack: list[str] = []  # Open containers: "{" or "["
+        self._started = False
+        self._done = False
+        self._expect_key = False
+        self._top_key = None  # Most recent key of the top-level object
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._raw = []  # Raw (still escaped) characters of the current string
+        self._last_escape = -1  # Index in _raw of the latest backslash escape
+        self._answer_done = 0  # Answer characters in _raw already decoded and sent
+
+    def feed(self, delta: str) -> list[tuple[str, str]]:
+        events = []
+        for char in delta:
+            if self._done:
+                break
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._stack.append("{")
+                    self._expect_key = True
+                continue
+            if self._in_string:
+                self._consume_string_char(char, events)
+                continue
+            if char == '"':
+                self._in_string = True
+                self._raw = []
+                self._last_escape = -1
+                self._string_is_key = self._stack[-1] == "{" and self._expect_key
+                self._answer_done = 0
+            elif char in "{[":
+                self._stack.append(char)
+                self._expect_key = char == "{"
+            elif char in "}]":
+                self._stack.pop()
+                self._done = not self._stack
+            elif char == ":":
+                self._expect_key = False
+            elif char == ",":
+                self._expect_key = self._stack[-1] == "{"
+
+        if self._in_string and self._in_answer():
+            self._emit_answer(events, final=False)
+        return events
+
+    def _consume_string_char(self, char: str, events: list) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+            self._last_escape = len(self._raw)
+        elif char == '"':
+            self._in_string = False
+            self._close_string(events)
+            return
+        self._raw.append(char)
+
+    def _close_string(self, events: list) -> None:
+        if self._string_is_key:
+            if len(self._stack) == 1:
+                self._top_key = "".join(self._raw)
+        elif self._in_answer():
+            self._emit_answer(events, final=True)
+        elif (len(self._stack) == 2 and self._stack[-1] == "["
+              and self._top_key == STREAMED_LIST_KEY):
+            events.append(("finding", _decode("".join(self._raw))))
+
+    def _in_answer(self) -> bool:
+        return (not self._string_is_key and len(self._stack) == 1
+                and self._top_key == STREAMED_TEXT_KEY)
+
+    def _emit_answer(self, events: list, final: bool) -> None:
+        # Only the characters since the last emit are decoded: escapes never
+        # straddle that point, because an incomplete one is held back
+        end = len(self._raw)
+        if not final:
+            # Hold back a trailing, incomplete escape sequence (\ or \uXX)
+            start = self._last_escape
+            if start >= self._answer_done and (
+                    self._escape or (self._raw[start + 1] == "u" and end - start < 6)):
+                end = start
+        raw = "".join(self._raw[self._answer_done:end])
+        text = _decode(raw)
+        if not final and text and "\ud800" <= text[-1] <= "\udbff" and raw[-6:-4] == "\\u":
+            # First half of a surrogate pair (\ud83d\ude00): decoded with its second
+            end, text = end - 6, text[:-1]
+        if text:
+            events.append(("answer_delta", text))
+        self._answer_done = end
+
+
+def _decode(raw: str) -> str:
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw
@@ -1,14 +1,22 @@
 """
-LLM Service — REUSED UNCHANGED from Phase 1.
+LLM Service — reused from Phase 1, now asynchronous.
  
 This file handles all GPT text generation calls.
-Notice: we did NOT change a single line from Phase 1.
-This is the payoff of good service design.
+The only change from Phase 1: generate() is a coroutine on the shared
+AsyncOpenAI client, so waiting for GPT no longer blocks the event loop.
+stream() yields the completion token by token for the SSE endpoint.
+Every call's token usage and cost is recorded in src.metrics.
+Identical generate() calls made at the same time share one request
+(src/single_flight.py).
 """
-from openai import OpenAI, APIError, RateLimitError
+from openai import APIError, RateLimitError
 from src.config import settings
+from src.metrics import record_openai_failure, record_openai_usage
+from src.openai_client import get_openai_client
+from src.single_flight import SingleFlight
+from typing import AsyncIterator
+import asyncio
 import logging
-import time
  
 logger = logging.getLogger(__name__)
  
@@ -16,35 +24,90 @@ class LLMService:
     """Wrapper around the OpenAI Chat API with retry logic."""
  
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = get_openai_client()
         self.model = settings.openai_model
         self.max_tokens = settings.max_tokens
+        self.in_flight = SingleFlight("chat", enabled=settings.openai_coalesce_enabled)
  
-    def generate(self, prompt: str, system_message: str = None,
-                 temperature: float = 0.7, max_retries: int = 3) -> str:
-        """Send a prompt to GPT and return the response text."""
+    @staticmethod
+    def _messages(prompt: str, system_message: str = None) -> list[dict]:
         messages = []
         if system_message:
             messages.append({"role": "system", "content": system_message})
         messages.append({"role": "user", "content": prompt})
- 
+        return messages
+
+    async def generate(self, prompt: str, system_message: str = None,
+                       temperature: float = 0.7, max_retries: int = 3) -> str:
+        """Send a prompt to GPT and return the response text."""
+        return await self.in_flight.do(
+            (system_message, prompt, temperature),
+            lambda: self._generate(self._messages(prompt, system_message), temperature, max_retries)
+        )
+
+    async def _generate(self, messages: list[dict], temperature: float, max_retries: int) -> str:
         for attempt in range(max_retries):
             try:
-                response = self.client.chat.completions.create(
+                response = await self.client.chat.completions.create(
                     model=self.model,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=self.max_tokens,
                 )
+                record_openai_usage("chat", self.model, getattr(response, "usage", None))
                 return response.choices[0].message.content
             except RateLimitError:
+                record_openai_failure("chat", self.model, rate_limited=True)
                 wait_time = 2 ** attempt
                 logger.warning(f"Rate limited. Waiting {wait_time}s...")
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
             except APIError as e:
+                record_openai_failure("chat", self.model)
                 logger.error(f"OpenAI API error: {str(e)}")
                 if attempt == max_retries - 1:
                     raise
-                time.sleep(1)
+                await asyncio.sleep(1)
+
+    async def stream(self, prompt: str, system_message: str = None,
+                     temperature: float = 0.7, max_retries: int = 3) -> AsyncIterator[str]:
+        """
+        Send a prompt to GPT and yield the response text as it is generated.
+        Retries only happen before the first token; once text has been
+        yielded, a failure is raised to the caller.
+        """
+        messages = self._messages(prompt, system_message)
+        started = False
+        for attempt in range(max_retries):
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=self.max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},  # Token counts in the last event
+                )
+                usage = None
+                async for event in response:
+                    usage = getattr(event, "usage", None) or usage
+                    delta = event.choices[0].delta.content if event.choices else None
+                    if delta:
+                        started = True
+                        yield delta
+                record_openai_usage("chat_stream", self.model, usage)
+                return
+            except RateLimitError:
+                record_openai_failure("chat_stream", self.model, rate_limited=True)
+                if started:
+                    raise
+                wait_time = 2 ** attempt
+                logger.warning(f"Rate limited. Waiting {wait_time}s...")
+                await asyncio.sleep(wait_time)
+            except APIError as e:
+                record_openai_failure("chat_stream", self.model)
+                logger.error(f"OpenAI API error: {str(e)}")
+                if started or attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep(1)
  
 llm_service = LLMService()
@@ -0,0 +1,544 @@
+"""
+Local Vector Index — an in-process alternative to Chroma.
+
+Chroma serialises every call and hides its HNSW parameters. For corpora
+that fit on one machine, a plain matrix is simpler and often faster:
+- Vectors are normalised once at insert, so cosine similarity is a dot
+  product, and live in a float32 matrix memory-mapped from disk
+  (vectors.f32); the OS pages it in, startup does not load it
+- Search is a vectorised matrix-vector product + argpartition for top-k
+- Metadata filters become boolean masks over per-field code arrays, applied
+  BEFORE scoring (pre-filtering), so a filtered query always returns up to
+  n_results matches
+- Optional IVF: rows are clustered with k-means; a query only scores rows in
+  the ivf_probes closest clusters. Enabled once a corpus reaches
+  ivf_min_rows, retrained whenever it doubles
+- Optional compact storage (storage="float16" or "int8"): search scans a
+  half- or quarter-size copy of the matrix (int8 is per-row scalar
+  quantization: a float32 scale per row), and only the best
+  n_results * rescore candidates are rescored exactly against the float32
+  matrix, which stays on disk and is otherwise never paged in. int8 scans
+  at close to float32 speed; float16 is several times slower (NumPy's
+  half-float conversion is slow), so it only makes sense for memory.
+  Switching modes rebuilds the compact copy from the float32 vectors at startup
+- Documents and metadata sit in SQLite next to the matrix; a deleted row is
+  recycled by the next insert
+
+Implements the VectorBackend interface (Chroma-shaped results), so
+AuditVectorStore does not know which engine it is talking to.
+"""
+from src.vector_backends import VectorBackend
+import json
+import logging
+import os
+import sqlite3
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL = ("report_id", "region", "severity", "audit_type", "finding_severity")
+NUMERIC = ("year", "chunk_index")
+MISSING = np.iinfo(np.int64).min
+STORAGE = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+_SQL_BATCH = 900  # Stay below SQLite's bound-parameter limit
+_SCAN_BLOCK = 1024  # Compact rows decoded to float32 at a time (stays in CPU cache)
+
+
+class LocalVectorIndex(VectorBackend):
+    """NumPy/memmap vector engine with metadata pre-filtering and optional IVF."""
+
+    def __init__(self, directory: str, ivf_lists: int = 0, ivf_probes: int = 8,
+                 ivf_min_rows: int = 50_000, storage: str = "float32", rescore: int = 4):
+        if storage not in STORAGE:
+            raise ValueError(f"Unknown vector storage '{storage}' (use one of {', '.join(STORAGE)})")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        self.ivf_min_rows = ivf_min_rows
+        self.storage = storage
+        self.rescore = max(1, rescore)
+        self._lock = threading.RLock()
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._codes_path = os.path.join(directory, "vectors.f16" if storage == "float16"
+                                        else "vectors.i8")
+        self._scales_path = os.path.join(directory, "vectors.scale")
+        self._manifest_path = os.path.join(directory, "manifest.json")
+        self._centroids_path = os.path.join(directory, "ivf_centroids.npy")
+
+        self._db = sqlite3.connect(os.path.join(directory, "chunks.sqlite3"),
+                                   check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                row      INTEGER PRIMARY KEY,
+                id       TEXT NOT NULL UNIQUE,
+                document TEXT,
+                metadata TEXT NOT NULL
+            )
+        """)
+        self._db.commit()
+
+        manifest = {"dim": None, "capacity": 0}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path) as f:
+                manifest = json.load(f)
+        self.dim = manifest["dim"]
+        self._capacity = 0
+        self._vectors = None
+        self._codes = None  # Compact copy of _vectors (storage float16/int8)
+        self._scales = None  # int8: one dequantization factor per row
+        self._ids: list = []
+        self._row_of: dict[str, int] = {}
+        self._free: list[int] = []  # Deleted rows, reused by the next insert
+        self._next_row = 0  # First never-used row
+        self._alive = np.zeros(0, dtype=bool)
+        self._cat = {f: np.zeros(0, dtype=np.int32) for f in CATEGORICAL}
+        self._num = {f: np.zeros(0, dtype=np.int64) for f in NUMERIC}
+        self._values = {f: [] for f in CATEGORICAL}  # code → value
+        self._code_of = {f: {} for f in CATEGORICAL}  # value → code
+        self._centroids = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_rows = 0
+        if self.dim:
+            compact = [path for path, _, _ in self._matrices()[1:]]
+            rebuild = bool(compact) and (manifest.get("storage", "float32") != self.storage
+                                         or not all(os.path.exists(path) for path in compact))
+            if rebuild:
+                for path in compact:
+                    if os.path.exists(path):
+                        os.remove(path)
+            self._open_vectors(manifest["capacity"])
+            self._load_rows()
+            if rebuild:
+                self._encode_all()
+                self._save_manifest()
+                if self._centroids is not None:
+                    self._assign_rows(np.flatnonzero(self._alive))
+
+    # ── STORAGE ────────────────────────────────────────────
+    def _matrices(self) -> list[tuple[str, type, tuple]]:
+        """(path, dtype, row shape) of each per-row file: float32 vectors, then the compact copy."""
+        files = [(self._vectors_path, np.float32, (self.dim,))]
+        if self.storage != "float32":
+            files.append((self._codes_path, STORAGE[self.storage], (self.dim,)))
+        if self.storage == "int8":
+            files.append((self._scales_path, np.float32, ()))
+        return files
+
+    def _open_vectors(self, capacity: int) -> None:
+        opened = [np.memmap(path, dtype=dtype, mode="r+" if os.path.exists(path) else "w+",
+                            shape=(capacity, *row)) for path, dtype, row in self._matrices()]
+        self._vectors = opened[0]
+        self._codes = opened[1] if len(opened) > 1 else None
+        self._scales = opened[2] if len(opened) > 2 else None
+        self._capacity = capacity
+        self._grow_columns(capacity)
+
+    def _grow_columns(self, capacity: int) -> None:
+        extra = capacity - len(self._alive)
+        if extra <= 0:
+            return
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        self._assign = np.concatenate([self._assign, np.full(extra, -1, dtype=np.int32)])
+        for f in CATEGORICAL:
+            self._cat[f] = np.concatenate([self._cat[f], np.full(extra, -1, dtype=np.int32)])
+        for f in NUMERIC:
+            self._num[f] = np.concatenate([self._num[f], np.full(extra, MISSING, dtype=np.int64)])
+        self._ids.extend([None] * extra)
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow the memory-mapped matrix (doubling) to hold `needed` rows."""
+        if needed <= self._capacity:
+            return
+        capacity = max(1024, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+        current = [self._vectors, self._codes, self._scales]
+        self._vectors = self._codes = self._scales = None
+        for (path, dtype, row), old in zip(self._matrices(), current):
+            tmp = f"{path}.tmp"
+            grown = np.memmap(tmp, dtype=dtype, mode="w+", shape=(capacity, *row))
+            if old is not None:
+                grown[:self._capacity] = old
+            grown.flush()
+            del grown, old
+            os.replace(tmp, path)
+        self._open_vectors(capacity)
+
+    def _encode(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Write the compact copy of (normalised) vectors for these rows."""
+        if self.storage == "float16":
+            self._codes[rows] = vectors.astype(np.float16)
+        elif self.storage == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales[scales == 0] = 1.0
+            self._codes[rows] = np.rint(vectors / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        else:
+            return
+        self._codes.flush()
+        if self._scales is not None:
+            self._scales.flush()
+
+    def _encode_all(self) -> None:
+        for start in range(0, self._next_row, _SCAN_BLOCK):
+            rows = np.arange(start, min(start + _SCAN_BLOCK, self._next_row))
+            self._encode(rows, np.asarray(self._vectors[rows]))
+        logger.info(f"Local index: built {self.storage} search matrix for {self._next_row} rows")
+
+    def _decode(self, rows) -> np.ndarray:
+        """Search-precision float32 vectors for rows (an index array or a slice)."""
+        if self._codes is None:
+            return np.asarray(self._vectors[rows])
+        vectors = self._codes[rows].astype(np.float32)
+        if self._scales is not None:
+            vectors *= self._scales[rows][:, None]
+        return vectors
+
+    def _load_rows(self) -> None:
+        rows = self._db.execute("SELECT row, id, metadata FROM chunks").fetchall()
+        for row, chunk_id, metadata in rows:
+            self._set_row(row, chunk_id, json.loads(metadata))
+        used = {row for row, _, _ in rows}
+        top = max(used) + 1 if used else 0
+        self._free = [r for r in range(top) if r not in used]
+        self._next_row = top
+        if os.path.exists(self._centroids_path):
+            self._centroids = np.load(self._centroids_path)
+            self._trained_rows = self.count()
+            self._assign_rows(np.flatnonzero(self._alive))
+        logger.info(f"Local vector index loaded: {len(rows)} chunks, dim {self.dim}")
+
+    def _save_manifest(self) -> None:
+        tmp = f"{self._manifest_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "capacity": self._capacity, "storage": self.storage}, f)
+        os.replace(tmp, self._manifest_path)
+
+    def _set_row(self, row: int, chunk_id: str, meta: dict) -> None:
+        self._ids[row] = chunk_id
+        self._row_of[chunk_id] = row
+        self._alive[row] = True
+        for f in CATEGORICAL:
+            self._cat[f][row] = self._code(f, meta.get(f))
+        for f in NUMERIC:
+            value = meta.get(f)
+            self._num[f][row] = MISSING if value is None else int(value)
+
+    def _code(self, field: str, value) -> int:
+        if value is None:
+            return -1
+        codes = self._code_of[field]
+        if value not in codes:
+            codes[value] = len(self._values[field])
+            self._values[field].append(value)
+        return codes[value]
+
+    # ── VectorBackend ──────────────────────────────────────
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def max_batch_size(self) -> int:
+        return 50_000
+
+    def stats(self) -> dict:
+        rows, dim = self._next_row, self.dim or 0
+        full = rows * dim * 4
+        search = full if self._codes is None else (
+            rows * dim * self._codes.itemsize + (rows * 4 if self._scales is not None else 0))
+        return {"backend": "local", "chunks": self.count(), "dim": dim, "storage": self.storage,
+                "rescore": self.rescore if self._codes is not None else None,
+                "search_matrix_mb": round(search / 2**20, 1),
+                "full_precision_mb": round(full / 2**20, 1),
+                "ivf_lists": len(self._centroids) if self._centroids is not None else 0}
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        self.upsert(ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        if not ids:
+            return
+        vectors = _normalise(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} != index dimension {self.dim}")
+            rows = []
+            for chunk_id in ids:
+                row = self._row_of.get(chunk_id)
+                if row is None:
+                    row = self._free.pop() if self._free else self._take_new_row()
+                rows.append(row)
+            self._ensure_capacity(self._next_row)
+            rows = np.asarray(rows, dtype=np.int64)
+            self._vectors[rows] = vectors
+            self._vectors.flush()
+            self._encode(rows, vectors)
+            for row, chunk_id, meta in zip(rows, ids, metadatas):
+                self._set_row(int(row), chunk_id, meta)
+            self._write_rows(rows, ids, documents, metadatas)
+            self._save_manifest()
+            if self._centroids is not None:
+                self._assign_rows(rows)
+            self._maybe_train_ivf()
+
+    def _take_new_row(self) -> int:
+        row = self._next_row
+        self._next_row += 1
+        return row
+
+    def _write_rows(self, rows, ids, documents, metadatas) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO chunks (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+            [(int(r), i, d, json.dumps(m)) for r, i, d, m in zip(rows, ids, documents, metadatas)]
+        )
+        self._db.commit()
+
+    def update(self, ids, metadatas) -> None:
+        with self._lock:
+            known = [(self._row_of[i], i, m) for i, m in zip(ids, metadatas) if i in self._row_of]
+            if not known:
+                return
+            current = self._fetch_rows([row for row, _, _ in known])
+            updates = []
+            for row, chunk_id, meta in known:
+                merged = {**current[row][2], **meta}  # Chroma merges metadata on update
+                self._set_row(row, chunk_id, merged)
+                updates.append((json.dumps(merged), row))
+            self._db.executemany("UPDATE chunks SET metadata = ? WHERE row = ?", updates)
+            self._db.commit()
+
+    def delete(self, ids=None, where=None) -> None:
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[i] for i in ids if i in self._row_of]
+            else:
+                rows = np.flatnonzero(self._where_mask(where)).tolist()
+            for row in rows:
+                del self._row_of[self._ids[row]]
+                self._ids[row] = None
+                self._alive[row] = False
+                self._assign[row] = -1
+                self._free.append(row)
+            for i in range(0, len(rows), _SQL_BATCH):
+                part = rows[i:i + _SQL_BATCH]
+                self._db.execute(f"DELETE FROM chunks WHERE row IN ({','.join('?' * len(part))})",
+                                 [int(r) for r in part])
+            self._db.commit()
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None) -> dict:
+        include = ["metadatas", "documents"] if include is None else include
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[i] for i in ids if i in self._row_of]
+            else:
+                rows = np.flatnonzero(self._where_mask(where)).tolist()
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return self._result(rows, include)
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None) -> dict:
+        include = ["metadatas", "documents", "distances"] if include is None else include
+        out = {key: [] for key in ("ids", "documents", "metadatas", "distances", "embeddings")}
+        with self._lock:
+            mask = self._where_mask(where)
+            for query in np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)):
+                rows, sims = self._top_k(_normalise(query[None, :])[0], n_results, mask)
+                result = self._result(rows.tolist(), include)
+                for key in ("ids", "documents", "metadatas", "embeddings"):
+                    out[key].append(result[key])
+                out["distances"].append((1.0 - sims).tolist() if "distances" in include else None)
+        return out
+
+    def query_ids(self, query_embeddings, ids, n_results=10, include_embeddings=False) -> dict:
+        """Exact top-n among the given ids, scored straight from the matrix."""
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+        out = {key: [] for key in ("ids", "documents", "metadatas", "distances", "embeddings")}
+        with self._lock:
+            rows = np.asarray([self._row_of[i] for i in ids if i in self._row_of], dtype=np.int64)
+            mask = np.zeros(self._next_row, dtype=bool)
+            mask[rows] = True
+            for query in np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)):
+                top, sims = self._top_k(_normalise(query[None, :])[0], n_results, mask, exact=True)
+                result = self._result(top.tolist(), include)
+                for key in ("ids", "documents", "metadatas", "embeddings"):
+                    out[key].append(result[key])
+                out["distances"].append((1.0 - sims).tolist())
+        return out
+
+    # ── SEARCH ─────────────────────────────────────────────
+    def _top_k(self, query: np.ndarray, k: int, mask: np.ndarray,
+               exact: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows among those allowed by mask: IVF-restricted and scored on
+        the compact matrix when those are enabled, unless exact=True (small
+        subsets, scored in full precision directly).
+        """
+        n = self._next_row
+        if n == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if self._centroids is not None and not exact:
+            probes = np.argsort(-(self._centroids @ query))[:self.ivf_probes]
+            ivf_mask = mask & np.isin(self._assign[:n], probes)
+            # A selective filter can leave too few rows in the probed lists:
+            # fall back to exact search over the filtered subset
+            if np.count_nonzero(ivf_mask) >= k:
+                mask = ivf_mask
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return candidates, np.zeros(0, dtype=np.float32)
+        if self._codes is not None and not exact:
+            # Shortlist on the compact matrix, then rescore it in full precision
+            shortlist = min(len(candidates), k * self.rescore)
+            sims = self._compact_scores(query, candidates, contiguous=len(candidates) > n // 2)
+            if len(candidates) > shortlist:
+                candidates = np.sort(candidates[np.argpartition(-sims, shortlist - 1)[:shortlist]])
+        if len(candidates) > n // 2:
+            # Most rows qualify: one contiguous matmul beats a gather
+            sims = self._vectors[:n] @ query
+            sims = sims[candidates]
+        else:
+            sims = self._vectors[candidates] @ query
+        if len(candidates) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            candidates, sims = candidates[top], sims[top]
+        order = np.argsort(-sims, kind="stable")
+        return candidates[order], sims[order]
+
+    def _compact_scores(self, query: np.ndarray, candidates: np.ndarray,
+                        contiguous: bool) -> np.ndarray:
+        """Approximate similarities of candidates, decoding _SCAN_BLOCK rows at a time."""
+        if contiguous:
+            n = self._next_row
+            sims = np.empty(n, dtype=np.float32)
+            for start in range(0, n, _SCAN_BLOCK):
+                block = slice(start, min(start + _SCAN_BLOCK, n))
+                sims[block] = self._codes[block].astype(np.float32) @ query
+            if self._scales is not None:
+                sims *= self._scales[:n]
+            return sims[candidates]
+        sims = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), _SCAN_BLOCK):
+            rows = candidates[start:start + _SCAN_BLOCK]
+            sims[start:start + len(rows)] = self._codes[rows].astype(np.float32) @ query
+        if self._scales is not None:
+            sims *= self._scales[candidates]
+        return sims
+
+    def _where_mask(self, where: dict) -> np.ndarray:
+        """Chroma-style where clause → boolean row mask (live rows only)."""
+        n = self._next_row
+        mask = self._alive[:n].copy()
+        if not where:
+            return mask
+        return mask & self._clause_mask(where, n)
+
+    def _clause_mask(self, where: dict, n: int) -> np.ndarray:
+        mask = np.ones(n, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self._clause_mask(sub, n)
+            elif key == "$or":
+                any_mask = np.zeros(n, dtype=bool)
+                for sub in condition:
+                    any_mask |= self._clause_mask(sub, n)
+                mask &= any_mask
+            else:
+                mask &= self._field_mask(key, condition, n)
+        return mask
+
+    def _field_mask(self, field: str, condition, n: int) -> np.ndarray:
+        ops = condition if isinstance(condition, dict) else {"$eq": condition}
+        mask = np.ones(n, dtype=bool)
+        if field in CATEGORICAL:
+            column = self._cat[field][:n]
+            codes = self._code_of[field]
+            for op, value in ops.items():
+                if op in ("$eq", "$ne"):
+                    hit = column == codes.get(value, -2)
+                elif op in ("$in", "$nin"):
+                    hit = np.isin(column, [codes[v] for v in value if v in codes])
+                else:
+                    raise ValueError(f"Operator {op} is not supported on '{field}'")
+                mask &= ~hit if op in ("$ne", "$nin") else hit
+        elif field in NUMERIC:
+            column = self._num[field][:n]
+            present = column != MISSING
+            for op, value in ops.items():
+                if op == "$in":
+                    hit = np.isin(column, value)
+                elif op == "$nin":
+                    hit = ~np.isin(column, value)
+                else:
+                    hit = {"$eq": np.equal, "$ne": np.not_equal, "$gt": np.greater,
+                           "$gte": np.greater_equal, "$lt": np.less,
+                           "$lte": np.less_equal}[op](column, value)
+                mask &= hit & present
+        else:
+            raise ValueError(f"Filtering on '{field}' is not supported by the local index")
+        return mask
+
+    def _result(self, rows: list[int], include: list[str]) -> dict:
+        fetched = self._fetch_rows(rows) if {"documents", "metadatas"} & set(include) else {}
+        return {
+            "ids": [self._ids[r] for r in rows],
+            "documents": [fetched[r][1] for r in rows] if "documents" in include else None,
+            "metadatas": [fetched[r][2] for r in rows] if "metadatas" in include else None,
+            "embeddings": [np.array(self._vectors[r]) for r in rows]
+            if "embeddings" in include else None,
+        }
+
+    def _fetch_rows(self, rows: list[int]) -> dict[int, tuple]:
+        fetched = {}
+        for i in range(0, len(rows), _SQL_BATCH):
+            part = [int(r) for r in rows[i:i + _SQL_BATCH]]
+            for row, chunk_id, document, metadata in self._db.execute(
+                f"SELECT row, id, document, metadata FROM chunks WHERE row IN "
+                f"({','.join('?' * len(part))})", part
+            ):
+                fetched[row] = (chunk_id, document, json.loads(metadata))
+        return fetched
+
+    # ── IVF ────────────────────────────────────────────────
+    def _maybe_train_ivf(self) -> None:
+        live = self.count()
+        if not self.ivf_lists or live < max(self.ivf_min_rows, self.ivf_lists * 10):
+            return
+        if self._centroids is not None and live < 2 * self._trained_rows:
+            return
+        self._train_ivf()
+
+    def _train_ivf(self, iterations: int = 10, sample_size: int = 100_000) -> None:
+        """Spherical mini k-means on a sample of live rows; then assign every row."""
+        rows = np.flatnonzero(self._alive[:self._next_row])
+        rng = np.random.default_rng(0)
+        sample = self._decode(np.sort(rng.choice(rows, min(sample_size, len(rows)),
+                                                 replace=False)))
+        centroids = sample[rng.choice(len(sample), self.ivf_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(self.ivf_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalise(centroids)
+        self._centroids = centroids
+        self._trained_rows = len(rows)
+        np.save(self._centroids_path, centroids)
+        self._assign_rows(rows)
+        logger.info(f"Local index: trained IVF with {self.ivf_lists} lists on {len(sample)} rows")
+
+    def _assign_rows(self, rows: np.ndarray, block: int = 65_536) -> None:
+        for i in range(0, len(rows), block):
+            part = rows[i:i + block]
+            self._assign[part] = np.argmax(self._decode(part) @ self._centroids.T, axis=1)
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
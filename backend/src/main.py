@@ -1,77 +1,198 @@
 """Audit Report Intelligence Hub — FastAPI Backend."""
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from src.models import (
-    ReportUploadResponse, AuditSearchRequest, AuditAnswer,
-    ReportsListResponse, ReportRecord
+    AuditSearchRequest, AuditBatchRequest, AuditAnswer, ReportsListResponse, ReportRecord,
+    IngestionJob, JobAcceptedResponse, BulkIngestResponse, ThemesResponse, Theme,
+    FindingRecord, FindingsResponse
 )
 from src.vector_store import audit_vector_store
+from src.embedding_service import embedding_service
+from src.llm_service import llm_service
 from src.rag_service import audit_rag_service
-from src.document_processor import process_audit_report
+from src.ingestion_jobs import ingestion_jobs, IngestionQueueFull
+from src.pdf_extractor import spill_upload
+from src.bulk_ingest import bulk_ingest, iter_zip_reports, iter_directory_reports
+from src import executors, metrics
+from src.openai_client import get_openai_client
 from src.config import settings
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import List, Optional
+import json
 import logging
+import os
+import time
+import zipfile
  
 logging.basicConfig(level=settings.log_level)
 logger = logging.getLogger(__name__)
  
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop ingestion workers, save the chunk indexes, then release processes
+    # and pooled connections
+    await ingestion_jobs.stop()
+    await executors.run_io(audit_vector_store.index_saver.flush)
+    executors.shutdown()
+    await get_openai_client().close()
+ 
 app = FastAPI(
     title="Audit Report Intelligence Hub API",
     description="Semantic search and Q&A across audit reports.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 app.add_middleware(CORSMiddleware, allow_origins=["*"],
                    allow_methods=["*"], allow_headers=["*"])
  
 @app.get("/health")
 async def health_check():
-    reports = audit_vector_store.list_reports()
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "reports_indexed": len(reports),
-        "chunks_indexed": audit_vector_store.total_chunks,
-        "regions": audit_vector_store.get_regions()
+        "reports_indexed": await audit_vector_store.count_reports(),
+        "chunks_indexed": await audit_vector_store.count_chunks(),
+        "regions": await audit_vector_store.get_regions(),
+        "embedding_cache": embedding_service.cache_stats(),
+        "query_cache": audit_rag_service.cache_stats(),
+        "coalescing": {"embeddings": embedding_service.in_flight.stats(),
+                       "chat": llm_service.in_flight.stats()},
+        "context": audit_rag_service.context_builder.stats(),
+        "indexes": {"search_mode": settings.search_mode,
+                    "lexical": audit_vector_store.lexical_index.stats(),
+                    "metadata": audit_vector_store.metadata_index.stats(),
+                    "themes": audit_vector_store.theme_index.stats(),
+                    "findings": await executors.run_io(audit_vector_store.findings.stats),
+                    "vectors": await executors.run_io(audit_vector_store.collection.stats),
+                    "filter_strategies": audit_vector_store.filter_strategies},
+        "ingestion": ingestion_jobs.stats()
     }
  
-@app.post("/reports/upload", response_model=ReportUploadResponse)
-async def upload_report(file: UploadFile = File(...)):
-    """Upload and ingest an audit report with automatic metadata extraction."""
+def _cache_metrics() -> list:
+    """Cache hit/miss and coalescing counters (kept by their owners) as metrics."""
+    hits = metrics.Counter("audit_cache_hits_total", "Cache hits", ("cache",))
+    misses = metrics.Counter("audit_cache_misses_total", "Cache misses", ("cache",))
+    ratio = metrics.Gauge("audit_cache_hit_ratio", "Hits / lookups since start", ("cache",))
+    query_caches = audit_rag_service.cache_stats()
+    caches = {"embedding": embedding_service.cache_stats(),
+              "retrieval": query_caches.get("retrieval"),
+              "answers": query_caches.get("answers"),
+              "semantic": query_caches.get("semantic")}
+    for name, stats in caches.items():
+        if not stats or "hits" not in stats:
+            continue  # Disabled
+        hits.inc(stats["hits"], cache=name)
+        misses.inc(stats["misses"], cache=name)
+        ratio.set(stats["hit_rate"], cache=name)
+    context = audit_rag_service.context_builder.stats()
+    tokens = metrics.Counter("audit_context_tokens_total",
+                             "Prompt context tokens before/after the context builder", ("kind",))
+    tokens.inc(context["tokens_in"], kind="naive")
+    tokens.inc(context["tokens_out"], kind="sent")
+    upstream = metrics.Counter("audit_openai_calls_total",
+                               "OpenAI calls by whether they went upstream or joined one in flight",
+                               ("service", "kind"))
+    for flight in (embedding_service.in_flight, llm_service.in_flight):
+        upstream.inc(flight.calls, service=flight.name, kind="upstream")
+        upstream.inc(flight.coalesced, service=flight.name, kind="coalesced")
+    return [hits, misses, ratio, tokens, upstream]
+ 
+metrics.register_collector(_cache_metrics)
+ 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage latencies, OpenAI tokens/cost and cache hit rates (Prometheus text format)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+ 
+@app.post("/reports/upload", response_model=JobAcceptedResponse, status_code=202)
+async def upload_report(file: UploadFile = File(...),
+                        report_id: Optional[str] = Form(None)):
+    """
+    Queue an audit report for ingestion with automatic metadata extraction.
+    Returns immediately with a job id; poll GET /jobs/{job_id} for progress.
+    To upload a revision of an indexed report, pass its report_id: only the
+    chunks that changed are re-embedded. Without it, a file is a new report
+    unless its content is identical to one already indexed.
+    """
     if not file.filename.endswith((".txt", ".pdf")):
         raise HTTPException(400, "Only .txt and .pdf files are supported")
+    if report_id and not await audit_vector_store.get_report(report_id):
+        raise HTTPException(404, "Report not found")
     try:
-        content = await file.read()
-        chunks, metadata = process_audit_report(file.filename, content)
-        report_id = audit_vector_store.add_report(
-            title=file.filename, chunks=chunks,
-            region=metadata.get("region"),
-            severity=metadata.get("severity"),
-            audit_type=metadata.get("audit_type"),
-            year=metadata.get("year")
-        )
-        return ReportUploadResponse(
-            report_id=report_id, title=file.filename,
-            chunks_created=len(chunks), extracted_metadata=metadata
-        )
-    except ValueError as e:
+        if file.filename.endswith(".pdf") and (file.size or 0) > settings.pdf_spill_bytes:
+            # Large PDF: to disk, then extracted page by page in the worker
+            path, sha256 = await executors.run_io(spill_upload, file.file, settings.upload_spool_dir)
+            job, deduplicated = ingestion_jobs.submit(file.filename, path=path,
+                                                      content_sha256=sha256, replaces=report_id)
+        else:
+            content = await file.read()
+            if not content:
+                raise HTTPException(400, "Uploaded file is empty")
+            job, deduplicated = ingestion_jobs.submit(file.filename, content, replaces=report_id)
+    except IngestionQueueFull as e:
+        raise HTTPException(503, f"Ingestion queue is full ({e}), retry later")
+    return JobAcceptedResponse(job_id=job.job_id, status=job.status,
+                               deduplicated=deduplicated)
+ 
+@app.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_job(job_id: str):
+    """Status and per-stage progress of an ingestion job."""
+    job = ingestion_jobs.get(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return job
+ 
+@app.post("/reports/bulk", response_model=BulkIngestResponse)
+async def bulk_upload(file: Optional[UploadFile] = File(None),
+                      directory: Optional[str] = Form(None)):
+    """
+    Ingest many reports at once: either a .zip upload, or a directory on the
+    server (only under settings.bulk_ingest_root). Returns per-file results.
+    """
+    if file is not None:
+        if not file.filename.lower().endswith(".zip"):
+            raise HTTPException(400, "Bulk upload expects a .zip archive")
+        files = iter_zip_reports(file.file)
+    elif directory:
+        root = os.path.realpath(settings.bulk_ingest_root) if settings.bulk_ingest_root else None
+        target = os.path.realpath(directory)
+        if not root or os.path.commonpath([root, target]) != root:
+            raise HTTPException(400, "Directory ingestion is only allowed under BULK_INGEST_ROOT")
+        files = iter_directory_reports(target)
+    else:
+        raise HTTPException(400, "Provide a .zip file or a directory")
+    try:
+        return await bulk_ingest(files)
+    except (ValueError, zipfile.BadZipFile) as e:
         raise HTTPException(400, str(e))
-    except Exception as e:
-        logger.error(f"Upload failed: {e}")
-        raise HTTPException(500, "Report processing failed")
  
 @app.get("/reports", response_model=ReportsListResponse)
-async def list_reports():
-    reports = audit_vector_store.list_reports()
+async def list_reports(limit: int = Query(100, ge=1, le=1000),
+                       offset: int = Query(0, ge=0),
+                       region: Optional[str] = None,
+                       severity: Optional[str] = None,
+                       audit_type: Optional[str] = None,
+                       year: Optional[int] = None):
+    """Paginated report list (newest first), optionally filtered."""
+    reports, total = await audit_vector_store.list_reports(
+        limit=limit, offset=offset, region=region,
+        severity=severity, audit_type=audit_type, year=year
+    )
     return ReportsListResponse(
         reports=[ReportRecord(**r) for r in reports],
-        total_reports=len(reports),
-        total_chunks=audit_vector_store.total_chunks,
-        regions=audit_vector_store.get_regions()
+        total_reports=total,
+        total_chunks=await audit_vector_store.count_chunks(),
+        regions=await audit_vector_store.get_regions(),
+        limit=limit,
+        offset=offset
     )
  
 @app.delete("/reports/{report_id}")
 async def delete_report(report_id: str):
-    if not audit_vector_store.delete_report(report_id):
+    if not await audit_vector_store.delete_report(report_id):
         raise HTTPException(404, "Report not found")
     return {"message": f"Report {report_id} deleted"}
  
@@ -80,13 +201,119 @@ async def ask_audit_question(request: AuditSearchRequest):
     """Ask a natural language question across all indexed audit reports."""
     logger.info(f"Audit question: {request.question[:80]}")
     try:
-        return audit_rag_service.answer_question(
-            question=request.question,
-            n_results=request.n_results,
-            filter_region=request.filter_region,
-            filter_severity=request.filter_severity,
-            filter_year=request.filter_year
-        )
+        started = time.perf_counter()
+        with metrics.trace() as timings:
+            answer = await audit_rag_service.answer_question(
+                question=request.question,
+                n_results=request.n_results,
+                **request.filters()
+            )
+        if request.include_timings:
+            timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+            answer.timings = timings
+        return answer
     except Exception as e:
         logger.error(f"Question failed: {e}")
         raise HTTPException(500, "Failed to generate answer")
+ 
+@app.post("/intelligence/ask/stream")
+async def ask_audit_question_stream(request: AuditSearchRequest):
+    """
+    Streaming variant of /intelligence/ask (server-sent events).
+    Events: sources → answer_delta* / finding* → done (full AuditAnswer),
+    or error if generation fails midway.
+    """
+    logger.info(f"Audit question (stream): {request.question[:80]}")
+ 
+    async def events():
+        try:
+            async for event, data in audit_rag_service.answer_question_stream(
+                question=request.question,
+                n_results=request.n_results,
+                **request.filters()
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming question failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Failed to generate answer'})}\n\n"
+ 
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+ 
+@app.post("/intelligence/ask/batch")
+async def ask_audit_questions_batch(request: AuditBatchRequest):
+    """
+    Answer up to 200 questions in one call (server-sent events).
+    Questions are embedded and retrieved together and answered concurrently;
+    each result is sent as soon as it is ready, so order is NOT preserved:
+    answer {index, answer} / error {index, detail} per question, then
+    done {questions, answered, failed, cached}.
+    """
+    logger.info(f"Audit question batch: {len(request.questions)} questions")
+ 
+    async def events():
+        answered = failed = cached = 0
+        try:
+            async for index, result in audit_rag_service.answer_batch(
+                questions=request.questions,
+                n_results=request.n_results,
+                **request.filters()
+            ):
+                if isinstance(result, Exception):
+                    failed += 1
+                    data = {"index": index, "detail": "Failed to generate answer"}
+                    yield f"event: error\ndata: {json.dumps(data)}\n\n"
+                    continue
+                answered += 1
+                cached += result.cached
+                data = {"index": index, "answer": result.model_dump()}
+                yield f"event: answer\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            logger.error(f"Question batch failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Failed to answer batch'})}\n\n"
+            return
+        summary = {"questions": len(request.questions), "answered": answered,
+                   "failed": failed, "cached": cached}
+        yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+ 
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+ 
+@app.get("/intelligence/themes", response_model=ThemesResponse)
+async def list_themes(min_reports: int = Query(1, ge=1),
+                      limit: int = Query(50, ge=1, le=500)):
+    """
+    Recurring themes across reports, most reports first. Chunks are
+    clustered as they are indexed, so this reads a precomputed index:
+    no LLM call, no pass over the corpus.
+    """
+    themes = await audit_vector_store.themes(min_reports=min_reports, limit=limit)
+    stats = audit_vector_store.theme_index.stats()
+    return ThemesResponse(
+        themes=[Theme(**t) for t in themes],
+        total_themes=len(await executors.run_io(audit_vector_store.theme_index.summary)),
+        chunks_assigned=stats["chunks"]
+    )
+ 
+@app.get("/findings", response_model=FindingsResponse)
+async def list_findings(severity: Optional[List[str]] = Query(None),
+                        region: Optional[List[str]] = Query(None),
+                        owner: Optional[str] = None,
+                        deadline_from: Optional[date] = None,
+                        deadline_to: Optional[date] = None,
+                        year_min: Optional[int] = None,
+                        year_max: Optional[int] = None,
+                        limit: int = Query(100, ge=1, le=1000),
+                        offset: int = Query(0, ge=0)):
+    """
+    Findings from the findings table, soonest deadline first: severity and
+    region match any of the values, owner any part of the responsible
+    party, deadlines are inclusive ISO dates. No retrieval, no LLM call.
+    """
+    rows, total = await audit_vector_store.query_findings(
+        severity=severity, region=region, owner=owner,
+        deadline_from=deadline_from.isoformat() if deadline_from else None,
+        deadline_to=deadline_to.isoformat() if deadline_to else None,
+        year_min=year_min, year_max=year_max, limit=limit, offset=offset)
+    return FindingsResponse(findings=[FindingRecord(**r) for r in rows],
+                            total=total, limit=limit, offset=offset)
@@ -0,0 +1,281 @@
+"""
+Metadata Index — per-value bitmaps for filtered search.
+
+Chroma evaluates a `where` clause inside its ANN search: with a selective
+filter (one region, one year) HNSW walks a graph in which almost every
+neighbour is rejected, so queries are slow AND often come back with fewer
+than n_results hits. This index answers "which chunks match?" on its own:
+- Every chunk gets a row number; every (field, value) pair has a bitmap of
+  the rows holding that value (packed into uint64 words)
+- A filter is an intersection of unions: (APAC) AND (critical OR high)
+  AND (2024 OR 2025); year ranges are unions of the per-year bitmaps
+- The popcount of the result is the filter's exact selectivity, which
+  AuditVectorStore uses to choose between exact scoring of the matching
+  subset and a filtered ANN query
+
+Kept in sync like the BM25 index (add/update/delete) and persisted as one
+.npz next to the Chroma data (strings packed, see src/index_files.py).
+"""
+import logging
+import os
+import threading
+from typing import Optional
+import numpy as np
+from src.index_files import has_strings, pack_strings, unpack_strings
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("region", "severity", "audit_type", "year", "finding_severity")
+_ONE = np.uint64(1)
+
+
+def normalize_filters(region=None, severity=None, audit_type=None, year=None,
+                      year_min: int = None, year_max: int = None,
+                      finding_severity=None) -> dict:
+    """
+    Canonical filter dict used by every index: each field maps to a sorted
+    list of accepted values; year_min / year_max bound the year inclusively.
+    Each argument may be a single value or a list; empty values mean "any".
+    """
+    filters = {}
+    for field, value in (("region", region), ("severity", severity),
+                         ("audit_type", audit_type), ("year", year),
+                         ("finding_severity", finding_severity)):
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        values = sorted({v for v in values if v}, key=str)
+        if values:
+            filters[field] = values
+    if year_min:
+        filters["year_min"] = int(year_min)
+    if year_max:
+        filters["year_max"] = int(year_max)
+    return filters
+
+
+def to_where(filters: dict) -> Optional[dict]:
+    """Canonical filters → Chroma-style where clause (None if unfiltered)."""
+    clauses = []
+    for field in FIELDS:
+        values = filters.get(field)
+        if values:
+            clauses.append({field: values[0]} if len(values) == 1 else {field: {"$in": values}})
+    if "year_min" in filters:
+        clauses.append({"year": {"$gte": filters["year_min"]}})
+    if "year_max" in filters:
+        clauses.append({"year": {"$lte": filters["year_max"]}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class MetadataIndex:
+    """Bitmap index over chunk metadata. All methods are thread-safe."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+        if path and os.path.exists(path):
+            try:
+                self._load(path)
+            except Exception as e:
+                logger.warning(f"Could not load metadata index from {path} ({e}); starting empty")
+                self._reset()
+
+    def _reset(self) -> None:
+        self._words = 0  # uint64 words per bitmap
+        self._alive = np.zeros(0, dtype=np.uint64)
+        self._bitmaps: dict[str, dict] = {f: {} for f in FIELDS}  # field → value → words
+        self._row_values: dict[str, list] = {f: [] for f in FIELDS}  # field → row → value
+        self._chunk_ids: list = []
+        self._row_of: dict[str, int] = {}
+        self._free: list[int] = []
+
+    # ── WRITES ─────────────────────────────────────────────
+    def add(self, chunk_ids: list[str], metadatas: list[dict]) -> None:
+        """Index chunks; an already indexed chunk id is re-indexed in place."""
+        with self._lock:
+            pending: dict[int, dict] = {}  # New rows, set in bulk below
+            for chunk_id, meta in zip(chunk_ids, metadatas):
+                row = self._row_of.get(chunk_id)
+                if row is not None and row not in pending:
+                    self._set_values(row, meta)
+                    continue
+                if row is None:
+                    row = self._free.pop() if self._free else len(self._chunk_ids)
+                    if row == len(self._chunk_ids):
+                        self._chunk_ids.append(None)
+                        for f in FIELDS:
+                            self._row_values[f].append(None)
+                    self._chunk_ids[row] = chunk_id
+                    self._row_of[chunk_id] = row
+                pending[row] = meta
+            if not pending:
+                return
+            self._grow(len(self._chunk_ids))
+            rows = np.fromiter(pending, dtype=np.int64, count=len(pending))
+            _set_many(self._alive, rows)
+            for field in FIELDS:
+                by_value: dict = {}
+                for row, meta in pending.items():
+                    value = meta.get(field)
+                    self._row_values[field][row] = value
+                    if value is not None:
+                        by_value.setdefault(value, []).append(row)
+                for value, value_rows in by_value.items():
+                    bitmap = self._bitmaps[field].get(value)
+                    if bitmap is None:
+                        bitmap = self._bitmaps[field][value] = np.zeros(self._words, dtype=np.uint64)
+                    _set_many(bitmap, np.asarray(value_rows, dtype=np.int64))
+
+    def update(self, chunk_ids: list[str], metadatas: list[dict]) -> None:
+        with self._lock:
+            for chunk_id, meta in zip(chunk_ids, metadatas):
+                row = self._row_of.get(chunk_id)
+                if row is not None:
+                    self._set_values(row, meta)
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                row = self._row_of.pop(chunk_id, None)
+                if row is None:
+                    continue
+                self._set_values(row, {})
+                _clear(self._alive, row)
+                self._chunk_ids[row] = None
+                self._free.append(row)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _grow(self, rows: int) -> None:
+        words = (rows + 63) // 64
+        if words <= self._words:
+            return
+        words = max(words, 2 * self._words, 16)
+        extra = words - self._words
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=np.uint64)])
+        for values in self._bitmaps.values():
+            for value, bitmap in values.items():
+                values[value] = np.concatenate([bitmap, np.zeros(extra, dtype=np.uint64)])
+        self._words = words
+
+    def _set_values(self, row: int, meta: dict) -> None:
+        for field in FIELDS:
+            new = meta.get(field)
+            old = self._row_values[field][row]
+            if new == old:
+                continue
+            if old is not None:
+                _clear(self._bitmaps[field][old], row)
+            if new is not None:
+                bitmap = self._bitmaps[field].get(new)
+                if bitmap is None:
+                    bitmap = self._bitmaps[field][new] = np.zeros(self._words, dtype=np.uint64)
+                _set(bitmap, row)
+            self._row_values[field][row] = new
+
+    # ── QUERIES ────────────────────────────────────────────
+    def _match(self, filters: dict) -> np.ndarray:
+        result = self._alive.copy()
+        for field in FIELDS:
+            values = filters.get(field)
+            if field == "year" and ("year_min" in filters or "year_max" in filters):
+                # A range is the union of the bitmaps of the years inside it
+                low = filters.get("year_min", -np.inf)
+                high = filters.get("year_max", np.inf)
+                pool = values if values is not None else list(self._bitmaps["year"])
+                values = [y for y in pool if low <= y <= high]
+            if values is None:
+                continue
+            union = np.zeros(self._words, dtype=np.uint64)
+            for value in values:
+                bitmap = self._bitmaps[field].get(value)
+                if bitmap is not None:
+                    union |= bitmap
+            result &= union
+        return result
+
+    def count(self, filters: dict) -> int:
+        """Number of chunks matching the filters (exact)."""
+        with self._lock:
+            return _popcount(self._match(filters))
+
+    def chunk_ids(self, filters: dict) -> list[str]:
+        """Ids of all chunks matching the filters, in row order."""
+        with self._lock:
+            bits = np.unpackbits(self._match(filters).view(np.uint8), bitorder="little")
+            return [self._chunk_ids[row] for row in np.flatnonzero(bits)]
+
+    def values(self, field: str) -> list:
+        """Distinct values of a field that at least one chunk holds."""
+        with self._lock:
+            return sorted((v for v, bitmap in self._bitmaps[field].items() if bitmap.any()), key=str)
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"chunks": len(self._row_of),
+                    "bitmaps": sum(len(v) for v in self._bitmaps.values()),
+                    "bytes": int(self._words * 8 * (1 + sum(len(v) for v in self._bitmaps.values())))}
+
+    # ── PERSISTENCE ────────────────────────────────────────
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            arrays = {}
+            pack_strings(arrays, "chunk_ids", self._chunk_ids)
+            for field in FIELDS:
+                column = self._row_values[field]
+                if field == "year":
+                    arrays[field] = np.array([v if v is not None else 0 for v in column],
+                                             dtype=np.int64)
+                else:
+                    pack_strings(arrays, field, column)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self.path)
+
+    def _load(self, path: str) -> None:
+        """Bitmaps are rebuilt from the per-row columns, which are far smaller on disk."""
+        with np.load(path, allow_pickle=False) as data:
+            chunk_ids = unpack_strings(data, "chunk_ids")
+            # Fields added since the file was written are simply empty
+            columns = {f: [None] * len(chunk_ids) for f in FIELDS}
+            for f in FIELDS:
+                if f == "year" and f in data.files:
+                    columns[f] = data[f].tolist()
+                elif f != "year" and has_strings(data, f):
+                    columns[f] = unpack_strings(data, f)
+        ids, metas = [], []
+        for row, chunk_id in enumerate(chunk_ids):
+            if chunk_id:
+                ids.append(chunk_id)
+                metas.append({f: columns[f][row] or None for f in FIELDS})
+        self.add(ids, metas)
+        logger.info(f"Loaded metadata index: {len(ids)} chunks")
+
+
+def _set(bitmap: np.ndarray, row: int) -> None:
+    bitmap[row >> 6] |= _ONE << np.uint64(row & 63)
+
+
+def _clear(bitmap: np.ndarray, row: int) -> None:
+    bitmap[row >> 6] &= ~(_ONE << np.uint64(row & 63))
+
+
+def _set_many(bitmap: np.ndarray, rows: np.ndarray) -> None:
+    np.bitwise_or.at(bitmap, rows >> 6, _ONE << (rows & 63).astype(np.uint64))
+
+
+def _popcount(bitmap: np.ndarray) -> int:
+    return int(np.unpackbits(bitmap.view(np.uint8)).sum())
@@ -0,0 +1,217 @@
+"""
+Metrics — where the time (and the money) goes, for GET /metrics.
+
+A deliberately small Prometheus-compatible layer (counters, gauges and
+histograms rendered in the text exposition format), so the service needs
+no client library and recording a sample is a dict update under a lock:
+- stage(pipeline, name) times a block into audit_stage_seconds, e.g. the
+  query pipeline's embed → retrieve → prompt → generate → parse stages
+  or ingestion's extract → chunk → embed → index
+- Inside trace(), the same stages are also summed into a per-request
+  {stage: milliseconds} breakdown (AuditAnswer.timings)
+- record_openai_usage() counts tokens and their cost from the `usage`
+  block of each OpenAI response
+- Collectors registered with register_collector() are called at scrape
+  time, for numbers that already live elsewhere (cache hit counters)
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+import math
+import threading
+import time
+from src.config import settings
+
+# Stages run from ~1 ms (a cached embedding) to ~30 s (a long GPT answer)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple, extra: dict = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            yield f"{self.name}{self._labels(key)} {_number(value)}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative buckets plus _sum and _count, per label set."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield f"{self.name}_bucket{self._labels(key, {'le': _number(bound)})} {cumulative}"
+            yield f"{self.name}_bucket{self._labels(key, {'le': '+Inf'})} {count}"
+            yield f"{self.name}_sum{self._labels(key)} {_number(total)}"
+            yield f"{self.name}_count{self._labels(key)} {count}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ── METRICS ──────────────────────────────────────────────
+STAGE_SECONDS = Histogram("audit_stage_seconds", "Time spent per pipeline stage",
+                          ("pipeline", "stage"))
+OPENAI_REQUESTS = Counter("audit_openai_requests_total", "OpenAI API calls by outcome",
+                          ("operation", "model", "outcome"))
+OPENAI_TOKENS = Counter("audit_openai_tokens_total", "Tokens billed by OpenAI",
+                        ("operation", "model", "kind"))
+OPENAI_COST = Counter("audit_openai_cost_usd_total",
+                      "Estimated OpenAI spend in USD (settings *_cost_per_1m prices)",
+                      ("operation", "model"))
+
+_METRICS: list[_Metric] = [STAGE_SECONDS, OPENAI_REQUESTS, OPENAI_TOKENS, OPENAI_COST]
+_collectors: list[Callable[[], Iterable[_Metric]]] = []
+_trace: ContextVar[Optional[dict]] = ContextVar("audit_trace", default=None)
+
+
+def register_collector(collector: Callable[[], Iterable[_Metric]]) -> None:
+    """collector() returns freshly filled metrics each time /metrics is scraped."""
+    _collectors.append(collector)
+
+
+def observe_stage(pipeline: str, name: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, pipeline=pipeline, stage=name)
+    timings = _trace.get()
+    if timings is not None:
+        timings[name] = round(timings.get(name, 0.0) + seconds * 1000, 2)
+
+
+@contextmanager
+def stage(pipeline: str, name: str):
+    """Time the enclosed block as one stage (failures are timed too)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(pipeline, name, time.perf_counter() - start)
+
+
+@contextmanager
+def trace():
+    """Collect the stages run inside the block into a {stage: ms} dict."""
+    timings: dict = {}
+    token = _trace.set(timings)
+    try:
+        yield timings
+    finally:
+        _trace.reset(token)
+
+
+def record_openai_usage(operation: str, model: str, usage) -> None:
+    """
+    Count the tokens of one OpenAI response (its `usage`, which may be
+    missing: older streams, test doubles) and what they cost.
+    """
+    OPENAI_REQUESTS.inc(operation=operation, model=model, outcome="ok")
+    if usage is None:
+        return
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    OPENAI_TOKENS.inc(prompt, operation=operation, model=model, kind="prompt")
+    if operation == "embeddings":
+        cost = prompt * settings.embedding_cost_per_1m
+    else:
+        OPENAI_TOKENS.inc(completion, operation=operation, model=model, kind="completion")
+        cost = prompt * settings.chat_input_cost_per_1m + completion * settings.chat_output_cost_per_1m
+    OPENAI_COST.inc(cost / 1_000_000, operation=operation, model=model)
+
+
+def record_openai_failure(operation: str, model: str, rate_limited: bool = False) -> None:
+    OPENAI_REQUESTS.inc(operation=operation, model=model,
+                        outcome="rate_limited" if rate_limited else "error")
+
+
+def render() -> str:
+    """Every metric in the Prometheus text format (version 0.0.4)."""
+    metrics = list(_METRICS)
+    for collector in _collectors:
+        metrics.extend(collector())
+    return "\n".join(m.render() for m in metrics) + "\n"
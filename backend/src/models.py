@@ -5,10 +5,13 @@ These models extend Project 1's models with audit-specific fields:
 - ReportMetadata: structured audit report information
 - AuditFinding: individual finding with severity and deadline
 - AdvancedSearchRequest: includes filters for year, region, severity
+- AuditBatchRequest: many questions under the same filters
 - AuditAnswer: includes finding list and cross-report analysis
+- ThemesResponse: recurring themes across reports, from the theme index
+- FindingsResponse: rows of the findings table, for structured queries
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, Dict, List, Optional, Union
 from enum import Enum
  
 class SeverityLevel(str, Enum):
@@ -24,25 +27,103 @@ class ConfidenceLevel(str, Enum):
     LOW = "low"
  
 # ── REPORT UPLOAD ─────────────────────────────────────────
+class ChunkDiff(BaseModel):
+    """What an incremental re-ingestion actually changed."""
+    added: int  # New or edited chunks (the only ones re-embedded)
+    removed: int  # Chunks no longer in the revised report
+    unchanged: int  # Kept with their existing ids and embeddings
+    metadata_updated: int = 0  # Unchanged text, but position/metadata moved
+ 
 class ReportUploadResponse(BaseModel):
     report_id: str
     title: str
     chunks_created: int
     extracted_metadata: dict  # Auto-extracted: region, date, severity
+    version: int = 1
+    chunk_diff: Optional[ChunkDiff] = None  # Set when an earlier version was updated
     message: str = "Report processed and indexed for search"
  
+# ── INGESTION JOBS ────────────────────────────────────────
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+ 
+class IngestionJob(BaseModel):
+    """Progress of one background ingestion (extract → chunk → embed → index)."""
+    job_id: str
+    filename: str
+    replaces: Optional[str] = None  # report_id this upload is a revision of
+    status: JobStatus = JobStatus.QUEUED
+    stage: Optional[str] = None  # Current stage while running
+    progress: float = 0.0  # 0.0 → 1.0, advances per completed stage
+    stage_seconds: dict = {}  # How long each finished stage took
+    created_at: str
+    finished_at: Optional[str] = None
+    result: Optional[ReportUploadResponse] = None
+    error: Optional[str] = None
+ 
+class JobAcceptedResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    deduplicated: bool = False  # True if an identical upload was already queued
+    message: str = "Report accepted for ingestion. Poll GET /jobs/{job_id} for progress."
+ 
+# ── BULK INGESTION ────────────────────────────────────────
+class BulkFileResult(BaseModel):
+    filename: str
+    status: str  # "indexed" or "failed"
+    report_id: Optional[str] = None
+    chunks: int = 0
+    extracted_metadata: dict = {}
+    error: Optional[str] = None
+ 
+class BulkIngestResponse(BaseModel):
+    files: List[BulkFileResult]
+    files_indexed: int
+    files_failed: int
+    total_chunks: int
+    elapsed_seconds: float
+    docs_per_second: float
+    chunks_per_second: float
+ 
 # ── SEARCH REQUEST (with filters) ─────────────────────────
-class AuditSearchRequest(BaseModel):
+class AuditFilters(BaseModel):
+    """Metadata filters shared by the question endpoints."""
+    # Optional filters — leave None to search across everything.
+    # A list means "any of these" (e.g. ["critical", "high"])
+    filter_region: Optional[Union[str, List[str]]] = Field(None, description="Filter by region (e.g. APAC)")
+    filter_severity: Optional[Union[str, List[str]]] = Field(None, description="Filter by severity level")
+    filter_year: Optional[Union[int, List[int]]] = Field(None, description="Filter by report year")
+    filter_audit_type: Optional[Union[str, List[str]]] = Field(None, description="Filter by audit type")
+    filter_year_min: Optional[int] = Field(None, description="Reports from this year onwards")
+    filter_year_max: Optional[int] = Field(None, description="Reports up to this year")
+    filter_finding_severity: Optional[Union[str, List[str]]] = Field(
+        None, description="Only chunks belonging to findings of this severity"
+    )
+ 
+    def filters(self) -> dict:
+        """The filter_* fields as keyword arguments for search/answer calls."""
+        return {name: getattr(self, name) for name in type(self).model_fields
+                if name.startswith("filter_")}
+ 
+class AuditSearchRequest(AuditFilters):
     """Advanced search with metadata filters."""
     question: str = Field(
         ..., min_length=5, max_length=500,
         description="Natural language question about audit reports"
     )
     n_results: int = Field(default=5, ge=1, le=15)
-    # Optional filters — leave None to search across everything
-    filter_region: Optional[str] = Field(None, description="Filter by region (e.g. APAC)")
-    filter_severity: Optional[str] = Field(None, description="Filter by severity level")
-    filter_year: Optional[int] = Field(None, description="Filter by report year")
+    include_timings: bool = Field(False, description="Add a per-stage timing breakdown (ms)")
+ 
+class AuditBatchRequest(AuditFilters):
+    """Many questions answered in one call, e.g. a quarterly committee pack."""
+    questions: List[Annotated[str, Field(min_length=5, max_length=500)]] = Field(
+        ..., min_length=1, max_length=200,
+        description="Questions to answer; all share n_results and the filters"
+    )
+    n_results: int = Field(default=5, ge=1, le=15)
  
 # ── ANSWER MODELS ─────────────────────────────────────────
 class SourceChunk(BaseModel):
@@ -52,6 +133,12 @@ class SourceChunk(BaseModel):
     relevance_score: float
     region: Optional[str] = None
     severity: Optional[str] = None
+    page_start: Optional[int] = None  # Pages the chunk spans, for PDFs
+    page_end: Optional[int] = None
+    char_start: Optional[int] = None  # Character offsets into the extracted report text
+    char_end: Optional[int] = None
+    finding_id: Optional[str] = None  # The finding this excerpt belongs to, if any
+    finding_severity: Optional[str] = None
  
 class AuditAnswer(BaseModel):
     """Complete structured response to an audit question."""
@@ -62,6 +149,10 @@ class AuditAnswer(BaseModel):
     sources: List[SourceChunk] = []
     reports_searched: int
     total_chunks_searched: int
+    cached: bool = False  # Served from a cache (no GPT call)
+    matched_question: Optional[str] = None  # Earlier question whose answer was reused
+    timings: Optional[dict] = None  # Milliseconds per stage, when requested
+    answered_from: Optional[str] = None  # "findings": from the findings table, no retrieval or GPT
  
 # ── DOCUMENT MANAGEMENT ───────────────────────────────────
 class ReportRecord(BaseModel):
@@ -72,9 +163,57 @@ class ReportRecord(BaseModel):
     region: Optional[str] = None
     severity: Optional[str] = None
     audit_type: Optional[str] = None
+    version: int = 1
+    updated_at: Optional[str] = None
  
 class ReportsListResponse(BaseModel):
     reports: List[ReportRecord]
     total_reports: int
     total_chunks: int
     regions: List[str]  # Unique regions in the index
+    limit: Optional[int] = None  # Page size used for this listing
+    offset: int = 0
+ 
+# ── THEMES ────────────────────────────────────────────────
+class ThemeReport(BaseModel):
+    report_id: str
+    title: str
+    chunks: int  # Chunks of this report in the theme
+ 
+class Theme(BaseModel):
+    """Chunks from any number of reports that the theme index clustered together."""
+    theme_id: int
+    chunks: int
+    report_count: int
+    reports: List[ThemeReport]  # Most chunks first
+    regions: Dict[str, int]  # Chunks per region
+    severities: Dict[str, int]  # Chunks per finding (or report) severity
+    representative_chunk_id: str
+    representative_text: Optional[str] = None  # The chunk closest to the theme centre
+ 
+class ThemesResponse(BaseModel):
+    themes: List[Theme]
+    total_themes: int  # Themes with members, before min_reports / limit
+    chunks_assigned: int
+ 
+class FindingRecord(BaseModel):
+    """One row of the findings table: a finding plus its report's fields."""
+    report_id: str
+    finding_id: str
+    report_title: Optional[str] = None
+    title: Optional[str] = None
+    severity: Optional[str] = None
+    region: Optional[str] = None  # The finding's own (often a city)
+    report_region: Optional[str] = None
+    owner: Optional[str] = None
+    deadline: Optional[str] = None  # As written in the report
+    deadline_date: Optional[str] = None  # ISO date, when the deadline was one
+    report_severity: Optional[str] = None
+    audit_type: Optional[str] = None
+    year: Optional[int] = None
+ 
+class FindingsResponse(BaseModel):
+    findings: List[FindingRecord]  # Soonest deadline first, then most severe
+    total: int  # Matches before limit / offset
+    limit: int
+    offset: int
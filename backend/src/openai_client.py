@@ -0,0 +1,24 @@
+"""
+Shared AsyncOpenAI client.
+
+LLMService and EmbeddingService used to build their own blocking clients.
+They now share ONE async client, so chat and embedding calls reuse the
+same pool of keep-alive HTTPS connections instead of re-handshaking.
+"""
+from functools import lru_cache
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from src.config import settings
+import httpx
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_connections
+            )
+        )
+    )
@@ -0,0 +1,198 @@
+"""
+PDF Extractor — streaming, page-parallel text extraction.
+
+extract_text_from_pdf() parses a whole in-memory PDF in one process. For a
+500-page report that means the upload bytes, the parser's object graph and
+the full text all held at once, one core doing all the work. Here:
+- Large uploads are spilled to a temp file (spill_upload) instead of
+  travelling through the job queue as bytes
+- Workers open that file memory-mapped, so the OS pages it in on demand
+- Page ranges are extracted in parallel in the process pool, each page
+  exactly once. A worker keeps its reader (and the page tree) for the
+  next range of the same file, but drops everything parsed for a range
+  once it is done, so its memory stays bounded
+- A worker closes the file and its mapping after every range and reopens
+  them for the next one, so between ranges it holds parsed objects only:
+  once a job is done, nothing keeps its temp file open and it can be
+  removed (and its disk space freed) right away, on any OS
+- iter_pdf_pages() yields (page number, text) in page order, with only a
+  few ranges in flight, so chunking starts on page 1 while later pages are
+  still being parsed
+"""
+from collections import deque
+from concurrent.futures import Executor
+from typing import BinaryIO, Iterator
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+COPY_BUFFER = 1024 * 1024
+
+
+def spill_upload(fileobj: BinaryIO, directory: str = None) -> tuple[str, str]:
+    """
+    Copy an upload to a temp .pdf file in 1 MB pieces.
+    Returns (path, sha256 of the content); the caller owns the file.
+    """
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="upload_", dir=directory or None)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = fileobj.read(COPY_BUFFER)
+                if not block:
+                    break
+                digest.update(block)
+                out.write(block)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()
+
+
+class _MappedPdf:
+    """A PDF file opened memory-mapped, with a PdfReader over the mapping."""
+
+    def __init__(self, path: str):
+        import PyPDF2
+        self.path = path
+        self._file = self._map = None
+        self.reattach()
+        try:
+            self.reader = PyPDF2.PdfReader(self._map)
+        except Exception:
+            self.close()
+            raise
+
+    def reattach(self) -> None:
+        """Reopen the file after detach(); the reader reads from the new mapping."""
+        if self._map is not None:
+            return
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.detach()
+            raise
+        if getattr(self, "reader", None) is not None:
+            self.reader.stream = self._map
+
+    def detach(self) -> None:
+        """Close the file and its mapping, keeping what the reader has parsed."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        self.reader = None
+        self.detach()
+
+    def __enter__(self) -> "_MappedPdf":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def page_count(path: str) -> int:
+    with _MappedPdf(path) as pdf:
+        return len(pdf.reader.pages)
+
+
+# Per-worker reader cache: opening a reader walks the whole page tree, so
+# each worker parses a file once and keeps the reader for all the ranges it
+# gets (detached from the file in between, see extract_pages).
+# Per thread, not just per process: a PdfReader must not be shared between
+# threads (with a thread pool, concurrent reads corrupt its stream position)
+_local = threading.local()
+
+
+def _cached_pdf(path: str) -> tuple["_MappedPdf", set]:
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if getattr(_local, "key", None) != key:
+        release_pdf()
+        pdf = _MappedPdf(path)
+        len(pdf.reader.pages)  # Walk the page tree now, once
+        _local.pdf, _local.tree, _local.key = pdf, set(pdf.reader.resolved_objects), key
+    else:
+        _local.pdf.reattach()
+    return _local.pdf, _local.tree
+
+
+def release_pdf() -> None:
+    """Drop this thread's cached reader."""
+    if getattr(_local, "pdf", None) is not None:
+        _local.pdf.close()
+    _local.pdf = _local.tree = _local.key = None
+
+
+def extract_pages(path: str, start: int, stop: int) -> list[tuple[int, str]]:
+    """(1-based page number, text) for pages [start, stop). Runs in the process pool."""
+    pdf, tree = _cached_pdf(path)
+    pages = pdf.reader.pages
+    try:
+        return [(i + 1, pages[i].extract_text() or "") for i in range(start, min(stop, len(pages)))]
+    finally:
+        # Forget the content streams and fonts parsed for this range, so a
+        # worker's memory doesn't grow with the number of pages it has seen
+        cache = pdf.reader.resolved_objects
+        for obj_key in [k for k in cache if k not in tree]:
+            del cache[obj_key]
+        pdf.detach()
+
+
+def iter_pdf_pages(path: str, executor: Executor = None, pages_per_task: int = 8,
+                   max_in_flight: int = None) -> Iterator[tuple[int, str]]:
+    """
+    (page number, text) for every page of the PDF at path, in page order.
+    With an executor, ranges of pages_per_task pages are extracted in
+    parallel, at most max_in_flight ranges at a time (default: two per CPU);
+    without one, pages are extracted here, one range at a time.
+    """
+    total = page_count(path)
+    ranges = [(start, min(start + pages_per_task, total))
+              for start in range(0, total, max(1, pages_per_task))]
+    if executor is None or len(ranges) < 2:
+        try:
+            for start, stop in ranges:
+                yield from extract_pages(path, start, stop)
+        finally:
+            release_pdf()
+        return
+
+    max_in_flight = max_in_flight or 2 * (os.cpu_count() or 2)
+    todo = iter(ranges)
+    pending = deque()
+    try:
+        for start, stop in todo:
+            pending.append(executor.submit(extract_pages, path, start, stop))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            pages = pending.popleft().result()
+            for start, stop in todo:
+                pending.append(executor.submit(extract_pages, path, start, stop))
+                break
+            yield from pages
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def remove_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove temp file {path}: {e}")
+
@@ -0,0 +1,89 @@
+"""
+Query Cache — in-memory TTL + LRU cache for the RAG answer path.
+
+Dashboards and shared team questions repeat heavily, yet every ask used to
+pay for embed → Chroma query → GPT. Two instances of this cache cut that:
+- retrieval cache: (query embedding, filters, n_results) → search results
+- answer cache: hash of the full prompt → final AuditAnswer
+
+Both are tied to the vector store's index generation: any add, update or
+delete bumps the generation, and the next lookup drops every entry built
+against the old index. Entries also expire after ttl_seconds.
+"""
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import threading
+import time
+
+
+def make_key(*parts) -> str:
+    """Stable hash of JSON-serialisable parts (floats, dicts, strings...)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class QueryCache:
+    """Size-bounded LRU with per-entry TTL and generation-based invalidation."""
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl_seconds: float = 600):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict = OrderedDict()  # key → (expires_at, value)
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _sync_generation(self, generation: int) -> None:
+        """Drop everything if the index changed since entries were stored."""
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key: str, generation: int):
+        """Cached value (a deep copy, safe to mutate) or None."""
+        with self._lock:
+            self._sync_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def set(self, key: str, value, generation: int) -> None:
+        """
+        Store a value computed against index `generation`. If the index
+        changed while it was being computed, the value is discarded.
+        """
+        with self._lock:
+            self._sync_generation(max(generation, self._generation or 0))
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
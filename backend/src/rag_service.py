@@ -6,11 +6,39 @@ New vs Project 1:
 - Supports metadata filtering (region, severity, year)
 - Detects cross-report patterns and themes
 - Confidence scoring with detailed reasoning
+- Answer cache: an identical prompt against an unchanged index is
+  answered from memory instead of calling GPT again
+- Semantic cache: a rephrasing of a recently answered question (same
+  filters) reuses that answer
+- Streaming: answer_question_stream() sends the sources first, then the
+  answer and key findings while GPT is still writing them
+- Token-aware context: excerpts are deduplicated, merged and packed into
+  a token budget before they reach the prompt (see src/context_builder.py)
+- Batches: answer_batch() embeds and retrieves many questions at once and
+  runs their GPT calls concurrently
+- Every stage (embed, retrieve, prompt, generate, parse) is timed into
+  src.metrics
+- Structured fast path: questions that are really filters over findings
+  ("critical findings due before March 2026") are answered from the
+  findings table (src/structured_query.py), with no embedding or GPT call
 """
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+import asyncio
 import json
+import time
+from src.config import settings
+from src.executors import run_io
+from src.query_cache import QueryCache, make_key
+from src.semantic_cache import SemanticAnswerCache
+from src.embedding_service import embedding_service
 from src.vector_store import audit_vector_store
 from src.llm_service import llm_service
+from src.json_stream import IncrementalAnswerParser
+from src.context_builder import ContextBuilder
+from src.metrics import observe_stage, stage
 from src.models import AuditAnswer, SourceChunk, ConfidenceLevel
+from src.structured_query import FindingsQuery, parse_findings_question
 import logging
  
 logger = logging.getLogger(__name__)
@@ -39,25 +67,303 @@ Return ONLY a JSON object with this exact structure:
 class AuditRAGService:
     """RAG service optimised for audit intelligence queries."""
  
-    def answer_question(
+    def __init__(self):
+        self.answer_cache = QueryCache(
+            "answers",
+            max_entries=settings.answer_cache_max_entries,
+            ttl_seconds=settings.query_cache_ttl_seconds
+        ) if settings.query_cache_enabled else None
+        self.semantic_cache = SemanticAnswerCache(
+            threshold=settings.semantic_cache_threshold,
+            max_entries=settings.semantic_cache_max_entries
+        ) if settings.semantic_cache_enabled else None
+        self.context_builder = ContextBuilder(
+            max_tokens=settings.context_max_tokens,
+            dedup_threshold=settings.context_dedup_threshold,
+            merge_adjacent=settings.context_merge_adjacent
+        )
+ 
+    def cache_stats(self) -> dict:
+        """Hit rates of the retrieval and answer caches, for /health."""
+        stats = {"enabled": bool(self.answer_cache)}
+        if self.answer_cache:
+            stats["retrieval"] = audit_vector_store.retrieval_cache.stats()
+            stats["answers"] = self.answer_cache.stats()
+        if self.semantic_cache:
+            stats["semantic"] = self.semantic_cache.stats()
+        return stats
+ 
+    async def answer_question(
         self, question: str, n_results: int = 5,
-        filter_region: str = None,
-        filter_severity: str = None,
-        filter_year: int = None
+        filter_region=None,
+        filter_severity=None,
+        filter_year=None,
+        **filters
     ) -> AuditAnswer:
-        """Full RAG pipeline for audit questions with optional filters."""
+        """
+        Full RAG pipeline for audit questions with optional filters.
+        Extra filters (filter_audit_type, filter_year_min, filter_year_max,
+        filter_finding_severity) are passed through to AuditVectorStore.search().
+        """
+        structured = await self._answer_structured(
+            question, dict(filters, filter_region=filter_region,
+                           filter_severity=filter_severity, filter_year=filter_year))
+        if structured:
+            return structured
+        prepared = await self._prepare(question, n_results, filter_region=filter_region,
+                                       filter_severity=filter_severity,
+                                       filter_year=filter_year, **filters)
+        if prepared.answer:
+            return prepared.answer
  
-        # ── RETRIEVE ──────────────────────────────────────
-        chunks = audit_vector_store.search(
-            query=question,
-            n_results=n_results,
-            filter_region=filter_region,
-            filter_severity=filter_severity,
-            filter_year=filter_year
+        # ── GENERATE (with JSON output) ────────────────────
+        with stage("query", "generate"):
+            raw = await llm_service.generate(
+                prompt=prepared.prompt,
+                system_message=AUDIT_RAG_SYSTEM_PROMPT,
+                temperature=0.1
+            )
+        return await self._finish(prepared, raw)
+ 
+    async def answer_question_stream(
+        self, question: str, n_results: int = 5,
+        filter_region=None,
+        filter_severity=None,
+        filter_year=None,
+        **filters
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Same pipeline as answer_question(), as a stream of (event, data):
+        - "sources": retrieved excerpts, sent before GPT is even called
+        - "answer_delta": new text of the answer as GPT writes it
+        - "finding": each key finding as soon as it is complete
+        - "done": the final AuditAnswer (identical to answer_question's)
+        """
+        structured = await self._answer_structured(
+            question, dict(filters, filter_region=filter_region,
+                           filter_severity=filter_severity, filter_year=filter_year))
+        if structured:
+            yield "sources", {"sources": [s.model_dump() for s in structured.sources],
+                              "reports_searched": structured.reports_searched}
+            yield "done", structured.model_dump()
+            return
+        prepared = await self._prepare(question, n_results, filter_region=filter_region,
+                                       filter_severity=filter_severity,
+                                       filter_year=filter_year, **filters)
+        if prepared.answer:
+            yield "sources", {"sources": [s.model_dump() for s in prepared.answer.sources],
+                              "reports_searched": prepared.answer.reports_searched}
+            yield "done", prepared.answer.model_dump()
+            return
+ 
+        sources = _source_chunks(prepared.chunks)
+        yield "sources", {"sources": [s.model_dump() for s in sources],
+                          "reports_searched": _unique_reports(prepared.chunks)}
+ 
+        parser = IncrementalAnswerParser()
+        parts = []
+        started = time.perf_counter()
+        with stage("query", "generate"):
+            async for delta in llm_service.stream(
+                prompt=prepared.prompt,
+                system_message=AUDIT_RAG_SYSTEM_PROMPT,
+                temperature=0.1
+            ):
+                if not parts:
+                    observe_stage("query", "first_token", time.perf_counter() - started)
+                parts.append(delta)
+                for event, text in parser.feed(delta):
+                    yield event, {"text": text}
+        answer = await self._finish(prepared, "".join(parts))
+        yield "done", answer.model_dump()
+ 
+    async def answer_batch(
+        self, questions: list[str], n_results: int = 5,
+        filter_region=None,
+        filter_severity=None,
+        filter_year=None,
+        **filters
+    ) -> AsyncIterator[tuple[int, object]]:
+        """
+        Answer many questions under the same filters, yielding
+        (index, AuditAnswer) as each one completes — not in input order.
+        A question whose generation fails yields (index, exception) instead,
+        so one bad answer doesn't sink the batch.
+        - all questions are embedded in one embed_batch() call
+        - questions the semantic cache can't answer are retrieved with one
+          multi-query search
+        - GPT calls run concurrently, at most batch_max_concurrency at a time;
+          a question asked twice in the batch costs one call
+        - questions the findings table answers skip all of the above
+        """
+        filters.update(filter_region=filter_region, filter_severity=filter_severity,
+                       filter_year=filter_year)
+        structured = {}
+        for i, question in enumerate(questions):
+            answer = await self._answer_structured(question, filters)
+            if answer:
+                structured[i] = answer
+        for i, answer in structured.items():
+            yield i, answer
+        indices = [i for i in range(len(questions)) if i not in structured]
+        if not indices:
+            return
+        questions = [questions[i] for i in indices]
+ 
+        generation = audit_vector_store.generation
+        with stage("query", "embed"):
+            embeddings = await embedding_service.embed_batch(questions)
+        filter_key = make_key(filters, n_results)
+        batch = [self._start(q, emb, filter_key, generation)
+                 for q, emb in zip(questions, embeddings)]
+ 
+        to_search = [p for p in batch if not p.answer]
+        if to_search:
+            with stage("query", "retrieve"):
+                results = await audit_vector_store.search_many(
+                    [p.question for p in to_search],
+                    n_results=n_results,
+                    query_embeddings=[p.query_embedding for p in to_search],
+                    **filters
+                )
+            for prepared, chunks in zip(to_search, results):
+                self._build_prompt(prepared, chunks)
+        chunk_ids = [c["chunk_id"] for p in to_search for c in p.chunks]
+        logger.info(f"Batch of {len(questions)}: {len(to_search)} retrieved, "
+                    f"{len(chunk_ids)} chunks ({len(set(chunk_ids))} unique)")
+ 
+        # ── GENERATE (bounded concurrency) ─────────────────
+        semaphore = asyncio.Semaphore(max(1, settings.batch_max_concurrency))
+        by_prompt: dict[str, asyncio.Task] = {}
+ 
+        async def generate(prepared: _PreparedQuestion) -> AuditAnswer:
+            async with semaphore:
+                with stage("query", "generate"):
+                    raw = await llm_service.generate(
+                        prompt=prepared.prompt,
+                        system_message=AUDIT_RAG_SYSTEM_PROMPT,
+                        temperature=0.1
+                    )
+            return await self._finish(prepared, raw)
+ 
+        async def answer(i: int, prepared: _PreparedQuestion) -> tuple[int, object]:
+            try:
+                return i, await by_prompt[prepared.cache_key]
+            except Exception as e:
+                logger.error(f"Batch question {i} failed: {e}")
+                return i, e
+ 
+        pending = []
+        for i, prepared in zip(indices, batch):
+            if prepared.answer:
+                continue
+            if prepared.cache_key not in by_prompt:
+                by_prompt[prepared.cache_key] = asyncio.create_task(generate(prepared))
+            pending.append(answer(i, prepared))
+        for i, prepared in zip(indices, batch):
+            if prepared.answer:
+                yield i, prepared.answer
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for task in by_prompt.values():
+                task.cancel()
+ 
+    async def _answer_structured(self, question: str, filters: dict) -> Optional[AuditAnswer]:
+        """
+        The findings fast path: a question parse_findings_question()
+        understands is answered from findings table rows. Request filters
+        the table can't express exactly, or an empty table, send the
+        question down the RAG pipeline instead (None).
+        """
+        if not settings.structured_answers_enabled:
+            return None
+        findings = audit_vector_store.findings
+        with stage("query", "structured"):
+            query = parse_findings_question(question, await run_io(findings.regions))
+            extra = _findings_filters(query, filters) if query else None
+            if extra is None:
+                return None
+            rows, total = await audit_vector_store.query_findings(
+                **query.filters(), **extra,
+                limit=0 if query.count_only else settings.structured_answer_max_findings)
+            if total == 0 and not await run_io(findings.count):
+                return None  # Nothing indexed has findings: let RAG read the reports
+ 
+        described = query.describe()
+        noun = "finding" if total == 1 else "findings"
+        if query.count_only:
+            text = f"There {'is' if total == 1 else 'are'} {total} {noun} {described}."
+        elif total == 0:
+            text = f"No findings {described} were found in the indexed reports."
+        else:
+            text = f"{total} {noun} {described}, soonest deadline first."
+            if total > len(rows):
+                text += f" The first {len(rows)} are listed."
+        lines = [_finding_line(row) for row in rows]
+        return AuditAnswer(
+            question=question,
+            answer=text,
+            confidence=ConfidenceLevel.HIGH,
+            key_findings=lines,
+            sources=[SourceChunk(
+                report_title=row["report_title"] or "Unknown",
+                chunk_text=line,
+                relevance_score=1.0,
+                region=row["region"] or row["report_region"],
+                severity=row["report_severity"],
+                finding_id=row["finding_id"],
+                finding_severity=row["severity"]
+            ) for row, line in zip(rows, lines)],
+            reports_searched=len({row["report_id"] for row in rows}),
+            total_chunks_searched=0,
+            answered_from="findings"
         )
  
+    async def _prepare(self, question: str, n_results: int, **filters) -> "_PreparedQuestion":
+        """Everything up to the GPT call: caches, retrieval and prompt."""
+        with stage("query", "embed"):
+            query_embedding = await embedding_service.embed_text(question)
+        prepared = self._start(question, query_embedding, make_key(filters, n_results),
+                               audit_vector_store.generation)
+        if prepared.answer:
+            return prepared
+ 
+        # ── RETRIEVE ──────────────────────────────────────
+        with stage("query", "retrieve"):
+            chunks = await audit_vector_store.search(
+                query=question,
+                n_results=n_results,
+                query_embedding=prepared.query_embedding,
+                **filters
+            )
+        return self._build_prompt(prepared, chunks)
+ 
+    def _start(self, question: str, query_embedding: list[float], filter_key: str,
+               generation: int) -> "_PreparedQuestion":
+        """New question state, answered straight away on a semantic cache hit."""
+        prepared = _PreparedQuestion(question=question, generation=generation,
+                                     query_embedding=query_embedding, filter_key=filter_key)
+ 
+        # ── SEMANTIC CACHE ────────────────────────────────
+        if self.semantic_cache:
+            hit = self.semantic_cache.lookup(question, query_embedding, filter_key, generation)
+            if hit:
+                answer, matched_question = hit
+                answer.question = question
+                answer.cached = True
+                answer.matched_question = matched_question
+                prepared.answer = answer
+        return prepared
+ 
+    def _build_prompt(self, prepared: "_PreparedQuestion", chunks: list[dict]) -> "_PreparedQuestion":
+        """Retrieved chunks → prompt (or the cached answer for that prompt)."""
+        question = prepared.question
+        prepared.chunks = chunks
+ 
         if not chunks:
-            return AuditAnswer(
+            prepared.answer = AuditAnswer(
                 question=question,
                 answer="No audit reports have been uploaded, or no reports match the filters.",
                 confidence=ConfidenceLevel.HIGH,
@@ -66,59 +372,146 @@ class AuditRAGService:
                 reports_searched=0,
                 total_chunks_searched=0
             )
+            return prepared
  
         # ── BUILD CONTEXT ──────────────────────────────────
-        context_parts = []
-        for i, chunk in enumerate(chunks, 1):
-            meta_str = f"Report: {chunk['report_title']}"
-            if chunk.get("region"): meta_str += f" | Region: {chunk['region']}"
-            if chunk.get("severity"): meta_str += f" | Severity: {chunk['severity']}"
-            context_parts.append(f"[Excerpt {i} — {meta_str}]\n{chunk['text']}")
-        context = "\n\n".join(context_parts)
+        with stage("query", "prompt"):
+            context = self.context_builder.build(chunks).text
  
         # ── BUILD PROMPT ───────────────────────────────────
-        prompt = (
+        prepared.prompt = (
             f"=== AUDIT REPORT EXCERPTS ===\n{context}\n=== END EXCERPTS ===\n\n"
             f"=== AUDITOR'S QUESTION ===\n{question}\n=== END QUESTION ==="
         )
  
-        # ── GENERATE (with JSON output) ────────────────────
-        raw = llm_service.generate(
-            prompt=prompt,
-            system_message=AUDIT_RAG_SYSTEM_PROMPT,
-            temperature=0.1
-        )
+        # ── ANSWER CACHE ───────────────────────────────────
+        # The prompt embeds the retrieved excerpts, so its hash changes
+        # whenever the evidence does
+        prepared.cache_key = make_key(llm_service.model, AUDIT_RAG_SYSTEM_PROMPT, prepared.prompt)
+        if self.answer_cache:
+            cached = self.answer_cache.get(prepared.cache_key, prepared.generation)
+            if cached is not None:
+                cached.cached = True
+                prepared.answer = cached
+        return prepared
  
-        # Parse JSON response from LLM
-        try:
-            clean = raw.strip()
-            if clean.startswith("```"): clean = clean.split("\n", 1)[1]
-            if clean.endswith("```"): clean = clean.rsplit("\n", 1)[0]
-            data = json.loads(clean)
-        except json.JSONDecodeError as e:
-            logger.warning(f"JSON parse failed, using raw text: {e}")
-            data = {"answer": raw, "key_findings": [], "confidence": "medium", "reasoning": ""}
+    async def _finish(self, prepared: "_PreparedQuestion", raw: str) -> AuditAnswer:
+        """Parse GPT's JSON, build the AuditAnswer and cache it."""
+        with stage("query", "parse"):
+            try:
+                clean = raw.strip()
+                if clean.startswith("```"): clean = clean.split("\n", 1)[1]
+                if clean.endswith("```"): clean = clean.rsplit("\n", 1)[0]
+                data = json.loads(clean)
+            except json.JSONDecodeError as e:
+                logger.warning(f"JSON parse failed, using raw text: {e}")
+                data = {"answer": raw, "key_findings": [], "confidence": "medium", "reasoning": ""}
  
         # ── BUILD RESPONSE ─────────────────────────────────
-        unique_reports = len(set(c["report_title"] for c in chunks))
- 
-        return AuditAnswer(
-            question=question,
+        answer = AuditAnswer(
+            question=prepared.question,
             answer=data.get("answer", raw),
             confidence=ConfidenceLevel(data.get("confidence", "medium")),
             key_findings=data.get("key_findings", []),
-            sources=[
-                SourceChunk(
-                    report_title=c["report_title"],
-                    chunk_text=c["text"][:250] + "..." if len(c["text"]) > 250 else c["text"],
-                    relevance_score=c["relevance_score"],
-                    region=c.get("region"),
-                    severity=c.get("severity")
-                ) for c in chunks
-            ],
-            reports_searched=unique_reports,
-            total_chunks_searched=audit_vector_store.total_chunks
+            sources=_source_chunks(prepared.chunks),
+            reports_searched=_unique_reports(prepared.chunks),
+            total_chunks_searched=await audit_vector_store.count_chunks()
         )
+        if self.answer_cache:
+            self.answer_cache.set(prepared.cache_key, answer, prepared.generation)
+        if self.semantic_cache:
+            self.semantic_cache.add(prepared.query_embedding, prepared.filter_key,
+                                    prepared.question, answer, prepared.generation)
+        return answer
+ 
+ 
+@dataclass
+class _PreparedQuestion:
+    """State carried from retrieval to generation for one question."""
+    question: str
+    generation: int
+    query_embedding: list[float] = None
+    filter_key: str = None
+    chunks: list[dict] = field(default_factory=list)
+    prompt: str = None
+    cache_key: str = None
+    answer: Optional[AuditAnswer] = None  # Set when no GPT call is needed
+ 
+ 
+def _source_chunks(chunks: list[dict]) -> list[SourceChunk]:
+    return [
+        SourceChunk(
+            report_title=c["report_title"],
+            chunk_text=c["text"][:250] + "..." if len(c["text"]) > 250 else c["text"],
+            relevance_score=c["relevance_score"],
+            region=c.get("region"),
+            severity=c.get("severity"),
+            page_start=c.get("page_start"),
+            page_end=c.get("page_end"),
+            char_start=c.get("char_start"),
+            char_end=c.get("char_end"),
+            finding_id=c.get("finding_id"),
+            finding_severity=c.get("finding_severity")
+        ) for c in chunks
+    ]
+ 
+ 
+def _unique_reports(chunks: list[dict]) -> int:
+    return len(set(c["report_title"] for c in chunks))
+ 
+ 
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return [v for v in value if v] if isinstance(value, (list, tuple, set)) else [value]
+ 
+ 
+def _findings_filters(query: FindingsQuery, filters: dict) -> Optional[dict]:
+    """
+    Request filters → FindingsStore.query() arguments on top of the
+    question's own. None when they can't be expressed exactly: a region or
+    finding severity in both the question and the request, or a set of
+    years that isn't a range.
+    """
+    extra = {}
+    for name, value in filters.items():
+        if value in (None, [], ""):
+            continue
+        if name == "filter_region" and not query.region:
+            query.region = _as_list(value)
+        elif name == "filter_finding_severity" and not query.severity:
+            query.severity = _as_list(value)
+        elif name == "filter_severity":
+            extra["report_severity"] = _as_list(value)
+        elif name == "filter_audit_type":
+            extra["audit_type"] = _as_list(value)
+        elif name == "filter_year":
+            years = sorted(int(y) for y in _as_list(value))
+            if years != list(range(years[0], years[-1] + 1)):
+                return None
+            extra["year_min"] = max(years[0], extra.get("year_min", years[0]))
+            extra["year_max"] = min(years[-1], extra.get("year_max", years[-1]))
+        elif name == "filter_year_min":
+            extra["year_min"] = max(int(value), extra.get("year_min", int(value)))
+        elif name == "filter_year_max":
+            extra["year_max"] = min(int(value), extra.get("year_max", int(value)))
+        else:
+            return None
+    return extra
+ 
+ 
+def _finding_line(row: dict) -> str:
+    """"IA-2025-Q3-APAC-001-F2 (Critical, Singapore): title — owner — due 2025-11-30 [report]"."""
+    details = ", ".join(filter(None, [(row["severity"] or "").capitalize(),
+                                      row["region"] or row["report_region"]]))
+    parts = [f"{row['finding_id']}" + (f" ({details})" if details else "")
+             + (f": {row['title']}" if row["title"] else "")]
+    if row["owner"]:
+        parts.append(f"owner {row['owner']}")
+    if row["deadline"]:
+        parts.append(f"due {row['deadline']}")
+    line = " — ".join(parts)
+    return f"{line} [{row['report_title']}]" if row["report_title"] else line
  
  
 audit_rag_service = AuditRAGService()
@@ -0,0 +1,145 @@
+"""
+Report Registry — durable, indexed catalogue of ingested reports.
+
+The registry used to be a dict on AuditVectorStore, so after a restart
+/reports, /health and delete_report forgot every report whose chunks were
+still sitting in the persistent Chroma collection. It now lives in a small
+SQLite file next to the Chroma data:
+- One row per report (title, chunk count, region, severity, year, version...)
+- Indexes on the columns we filter and look up by, so listing, region
+  lists and "is this a revision of a known report?" never scan every report
+- Startup validation compares the registry's chunk total with the
+  collection count; only on a mismatch is it rebuilt from Chroma metadata
+"""
+import logging
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["report_id", "title", "chunks", "uploaded_at", "updated_at", "region",
+           "severity", "audit_type", "year", "version", "fingerprint"]
+FILTERABLE = ("region", "severity", "audit_type", "year")
+
+
+class ReportRegistry:
+    """SQLite-backed report catalogue. All methods are thread-safe."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reports (
+                report_id   TEXT PRIMARY KEY,
+                title       TEXT NOT NULL,
+                chunks      INTEGER NOT NULL DEFAULT 0,
+                uploaded_at TEXT NOT NULL,
+                updated_at  TEXT,
+                region      TEXT,
+                severity    TEXT,
+                audit_type  TEXT,
+                year        INTEGER,
+                version     INTEGER NOT NULL DEFAULT 1,
+                fingerprint TEXT
+            );
+            DROP INDEX IF EXISTS idx_reports_title;  -- Reports are never looked up by title
+            CREATE INDEX IF NOT EXISTS idx_reports_fingerprint ON reports(fingerprint);
+            CREATE INDEX IF NOT EXISTS idx_reports_region ON reports(region);
+            CREATE INDEX IF NOT EXISTS idx_reports_severity ON reports(severity);
+            CREATE INDEX IF NOT EXISTS idx_reports_audit_type ON reports(audit_type);
+            CREATE INDEX IF NOT EXISTS idx_reports_year ON reports(year);
+            CREATE INDEX IF NOT EXISTS idx_reports_uploaded_at ON reports(uploaded_at);
+        """)
+        self._conn.commit()
+
+    # ── WRITES ─────────────────────────────────────────────
+    def upsert(self, report_id: str, **fields) -> None:
+        """Insert a report, or update the given fields of an existing one."""
+        fields = {k: v for k, v in fields.items() if k in COLUMNS and k != "report_id"}
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM reports WHERE report_id = ?", (report_id,)
+            ).fetchone()
+            if exists:
+                if fields:
+                    assignments = ", ".join(f"{k} = ?" for k in fields)
+                    self._conn.execute(f"UPDATE reports SET {assignments} WHERE report_id = ?",
+                                       [*fields.values(), report_id])
+            else:
+                columns = ["report_id", *fields]
+                self._conn.execute(
+                    f"INSERT INTO reports ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))})",
+                    [report_id, *fields.values()]
+                )
+            self._conn.commit()
+
+    def upsert_many(self, rows: list[dict]) -> None:
+        for row in rows:
+            self.upsert(**row)
+
+    def delete(self, report_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM reports")
+            self._conn.commit()
+
+    # ── READS ──────────────────────────────────────────────
+    def get(self, report_id: str) -> Optional[dict]:
+        return self._one("SELECT * FROM reports WHERE report_id = ?", (report_id,))
+
+    def find_by_fingerprint(self, fingerprint: str) -> Optional[dict]:
+        return self._one("SELECT * FROM reports WHERE fingerprint = ? LIMIT 1", (fingerprint,))
+
+    def list_page(self, limit: int = None, offset: int = 0, **filters) -> tuple[list[dict], int]:
+        """
+        One page of reports (newest first) matching the filters, plus the
+        total number of matches. Filters: region, severity, audit_type, year.
+        """
+        clauses, params = [], []
+        for key in FILTERABLE:
+            if filters.get(key) is not None:
+                clauses.append(f"{key} = ?")
+                params.append(filters[key])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM reports {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM reports {where} ORDER BY uploaded_at DESC LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset]
+            ).fetchall()
+        return [dict(r) for r in rows], total
+
+    def regions(self) -> list[str]:
+        """Distinct regions, straight from the region index."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT region FROM reports WHERE region IS NOT NULL ORDER BY region"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def total_chunks(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(chunks), 0) FROM reports").fetchone()[0]
+
+    def _one(self, sql: str, params: tuple) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
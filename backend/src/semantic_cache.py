@@ -0,0 +1,107 @@
+"""
+Semantic Answer Cache — reuse answers for near-duplicate questions.
+
+The exact-match answer cache misses whenever auditors phrase the same
+question differently ("critical APAC findings" vs "APAC critical issues").
+This cache keeps the embeddings of recently answered questions in a small
+in-memory matrix. A new question whose embedding is within a cosine
+threshold of a cached one, with IDENTICAL filters, gets the stored answer
+and the GPT call is skipped.
+
+Every hit is logged with both questions and the similarity, and the last
+hits are kept in stats(), so false positives can be audited and the
+threshold tuned. Like the other query caches, it is emptied whenever the
+index generation changes.
+"""
+from collections import deque
+import copy
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """Fixed-capacity ring of (question embedding, filters) → AuditAnswer."""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.recent_hits: deque = deque(maxlen=20)
+        self._matrix: np.ndarray = None  # (max_entries, dim), unit-length rows
+        self._filter_keys: list = [None] * max_entries
+        self._questions: list = [None] * max_entries
+        self._answers: list = [None] * max_entries
+        self._size = 0
+        self._next = 0  # Ring position of the next insert (oldest entry once full)
+        self._generation = None
+
+    def _sync_generation(self, generation: int) -> None:
+        if generation != self._generation:
+            self._size, self._next = 0, 0
+            self._generation = generation
+
+    def lookup(self, question: str, embedding: list[float], filter_key: str, generation: int):
+        """(answer copy, matched question) for the best match above the threshold, or None."""
+        self._sync_generation(generation)
+        if self._size == 0:
+            self.misses += 1
+            return None
+        query = _unit(embedding)
+        if query.shape[0] != self._matrix.shape[1]:
+            self.misses += 1
+            return None
+
+        sims = self._matrix[:self._size] @ query
+        same_filters = np.fromiter(
+            (k == filter_key for k in self._filter_keys[:self._size]), dtype=bool, count=self._size
+        )
+        sims[~same_filters] = -1.0
+        best = int(np.argmax(sims))
+        similarity = float(sims[best])
+        if similarity < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.recent_hits.append({"question": question, "similarity": round(similarity, 4),
+                                 "cached_question": self._questions[best]})
+        logger.info(f"Semantic cache hit (cos={similarity:.3f}): '{question[:80]}' "
+                    f"served the answer of '{self._questions[best][:80]}'")
+        return copy.deepcopy(self._answers[best]), self._questions[best]
+
+    def add(self, embedding: list[float], filter_key: str, question: str,
+            answer, generation: int) -> None:
+        """Remember an answer; dropped if the index changed meanwhile."""
+        if generation != self._generation:
+            return
+        vector = _unit(embedding)
+        if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+            self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            self._size, self._next = 0, 0
+        slot = self._next
+        self._matrix[slot] = vector
+        self._filter_keys[slot] = filter_key
+        self._questions[slot] = question
+        self._answers[slot] = copy.deepcopy(answer)
+        self._next = (slot + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "recent_hits": list(self.recent_hits)
+        }
+
+
+def _unit(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,66 @@
+"""
+Single Flight — concurrent identical calls share one upstream request.
+
+When a committee meeting starts, several people ask the same question
+within seconds. The caches can't help yet (nothing has been answered), so
+each ask used to send its own embedding and GPT request. Here the first
+caller for a key starts the call and everyone who arrives while it is in
+flight awaits the same result (or the same exception):
+- Nothing is kept once the call finishes: the next caller starts a fresh
+  call, so results are never stale (caching stays the caches' job)
+- A caller that gives up (client disconnect, timeout) doesn't cancel the
+  call for the others; the call is only cancelled when nobody waits for it
+- Counters: calls that went upstream vs calls that joined one in flight
+"""
+from typing import Awaitable, Callable, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """Per-key coalescing of concurrent async calls."""
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self.calls = 0  # Went upstream
+        self.coalesced = 0  # Joined a call already in flight
+        self._flights: dict[Hashable, tuple[asyncio.Task, list]] = {}
+        self._loop = None
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable]):
+        """Result of call(), shared with every concurrent do() for the same key."""
+        if not self.enabled:
+            return await call()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks belong to one event loop; start over on a new one
+            self._flights, self._loop = {}, loop
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            task = asyncio.ensure_future(call())
+            flight = self._flights[key] = (task, [0])
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+        task, waiters = flight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and waiters[0] == 1:
+                task.cancel()  # The last one waiting gave up
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is task:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        total = self.calls + self.coalesced
+        return {"enabled": self.enabled, "calls": self.calls, "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+                "coalesced_rate": round(self.coalesced / total, 4) if total else 0.0}
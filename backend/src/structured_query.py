@@ -0,0 +1,218 @@
+"""
+Structured Query — questions the findings table can answer on its own.
+
+"Which critical findings have deadlines before March 2026?" is a filter,
+not a reading-comprehension task: retrieval plus GPT is slow, costs
+tokens, and can miss findings that didn't make the top n_results. This
+parser turns such questions into FindingsStore.query() filters:
+- severities ("critical", "high-risk"), known regions, owners ("owned by
+  Priya Sharma", "responsible party is IT Security")
+- deadlines: before / by / until / after / since / in / between a month,
+  a quarter, a year or a date ("before March 2026", "due in Q4 2025"),
+  and "overdue"
+- "how many" turns the listing into a count
+
+It is deliberately strict: every word of the question must be either one
+of those constraints or a filler word ("which", "findings", "have"...).
+Anything else ("why", "root cause", "compared to") means the question
+needs the reports' text, and it goes through the RAG pipeline as before.
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Optional
+import calendar
+import re
+
+_MONTHS = {name: i for i, name in enumerate(
+    ["january", "february", "march", "april", "may", "june", "july", "august",
+     "september", "october", "november", "december"], 1)}
+_MONTHS.update({name[:3]: i for name, i in list(_MONTHS.items())})
+_MONTHS["sept"] = 9
+
+_MONTH = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_DATE = (rf"(?:(?:\d{{1,2}} )?(?:{_MONTH})\.?(?: \d{{1,2}}(?:st|nd|rd|th)?,?)? \d{{4}}"
+         rf"|\d{{4}}-\d{{2}}-\d{{2}}|q[1-4] \d{{4}}|(?:end of )?\d{{4}})")
+_DEADLINE_WORDS = r"(?:deadlines?|due(?: dates?)?|target dates?|to be (?:fixed|remediated|closed))"
+_BETWEEN = re.compile(rf"\b(?:{_DEADLINE_WORDS} )?between ({_DATE}) and ({_DATE})\b")
+_BOUND = re.compile(
+    rf"\b(?:(?:with |having |has |have )?(?:a |an |their |the )?{_DEADLINE_WORDS} )?"
+    rf"(before|by|until|prior to|no later than|after|from|since|in|on|during|within)"
+    rf" (?:the )?({_DATE})\b")
+_DUE_DATE = re.compile(rf"\b(?:{_DEADLINE_WORDS}) ({_DATE})\b")
+_HAS_DEADLINE_WORD = re.compile(rf"\b{_DEADLINE_WORDS}\b")
+_OVERDUE = re.compile(r"\b(?:overdue|past (?:their |the )?(?:deadlines?|due dates?))\b")
+_SEVERITY = re.compile(r"\b(critical|high|medium|low)(?:[- ](?:severity|risk|priority|rated|rating))?\b")
+_OWNER = re.compile(
+    r"\b(?:owned by|assigned to|(?:the )?responsible party(?: is)?|(?:the )?owner(?: is)?"
+    r"|(?:with|whose) (?:owner|responsible party)(?: is)?)\s+"
+    r"(.+?)(?=\s+(?:with|that|which|due|before|after|by|in|and|having|whose|are|is|for)\b|[?.!,;]|$)")
+_HOW_MANY = re.compile(r"\bhow many\b")
+_FINDING_WORD = re.compile(r"\b(?:findings?|issues?)\b")
+_WORD = re.compile(r"[a-z0-9']+")
+
+FILLER = set("""
+a about all an and any are audit audits by currently do does each exist findings finding for from
+give has have having in is issue issues list me of on open or our outstanding please rated region
+regions remaining report reports severity show still that the their there these those to we were
+what which whose with
+""".split())
+
+
+@dataclass
+class FindingsQuery:
+    """A question turned into findings filters, and how to describe them."""
+    severity: list[str] = field(default_factory=list)
+    region: list[str] = field(default_factory=list)
+    owner: Optional[str] = None
+    deadline_from: Optional[str] = None
+    deadline_to: Optional[str] = None
+    count_only: bool = False
+
+    def filters(self) -> dict:
+        """Keyword arguments for FindingsStore.query()."""
+        return {"severity": self.severity, "region": self.region, "owner": self.owner,
+                "deadline_from": self.deadline_from, "deadline_to": self.deadline_to}
+
+    def describe(self) -> str:
+        parts = []
+        if self.severity:
+            parts.append(f"of {' or '.join(self.severity)} severity")
+        if self.region:
+            parts.append(f"in {' or '.join(self.region)}")
+        if self.owner:
+            parts.append(f"owned by '{self.owner}'")
+        if self.deadline_from and self.deadline_to:
+            parts.append(f"with a deadline from {self.deadline_from} to {self.deadline_to}")
+        elif self.deadline_to:
+            parts.append(f"with a deadline on or before {self.deadline_to}")
+        elif self.deadline_from:
+            parts.append(f"with a deadline on or after {self.deadline_from}")
+        return " ".join(parts)
+
+
+def _period(text: str) -> Optional[tuple[date, date]]:
+    """A month, quarter, year or day → its (first, last) day."""
+    text = text.replace(",", "").replace(".", "").removeprefix("end of ").strip()
+    words = text.split()
+    try:
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+            day = date.fromisoformat(text)
+            return day, day
+        if words[0].startswith("q") and len(words) == 2:
+            quarter, year = int(words[0][1]), int(words[1])
+            first = date(year, 3 * quarter - 2, 1)
+            return first, date(year, 3 * quarter, calendar.monthrange(year, 3 * quarter)[1])
+        if len(words) == 1:
+            year = int(words[0])
+            return date(year, 1, 1), date(year, 12, 31)
+        year = int(words[-1])
+        day = None
+        if words[0].isdigit():  # "15 March 2026"
+            day, words = int(words[0]), words[1:]
+        month = _MONTHS[words[0]]
+        if len(words) == 3:  # "March 15th 2026"
+            day = int(re.sub(r"\D", "", words[1]))
+        if day:
+            exact = date(year, month, day)
+            return exact, exact
+        return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+    except (ValueError, KeyError, IndexError):
+        return None
+
+
+def _bound(op: str, period: tuple[date, date]) -> tuple[Optional[date], Optional[date]]:
+    first, last = period
+    if op in ("before", "prior to"):
+        return None, first - timedelta(days=1)
+    if op in ("by", "until", "no later than"):
+        return None, last
+    if op == "after":
+        return last + timedelta(days=1), None
+    if op in ("from", "since"):
+        return first, None
+    return first, last  # in, on, during, within
+
+
+def parse_findings_question(question: str, regions: list[str] = (),
+                            today: date = None) -> Optional[FindingsQuery]:
+    """
+    The findings filters a question asks for, or None when it isn't a
+    question the findings table can answer exactly.
+    """
+    text = " ".join(question.lower().replace("’", "'").split()).rstrip("?.! ")
+    if not _FINDING_WORD.search(text):
+        return None
+    query, consumed = FindingsQuery(), []
+
+    def take(match: re.Match) -> None:
+        consumed.append(match.span())
+
+    how_many = _HOW_MANY.search(text)
+    if how_many:
+        query.count_only = True
+        take(how_many)
+
+    # Owners first: a name may contain words the other rules would take
+    for match in _OWNER.finditer(text):
+        if query.owner:
+            return None
+        start, end = match.span(1)
+        query.owner = _original_case(question, text, start, end).strip(" '\"")
+        take(match)
+
+    low, high = None, None
+    deadline_rules = [(m, "between") for m in _BETWEEN.finditer(text)]
+    deadline_rules += [(m, m.group(1)) for m in _BOUND.finditer(text)]
+    deadline_rules += [(m, "in") for m in _DUE_DATE.finditer(text)]
+    for match, op in deadline_rules:
+        if any(s <= match.start() < e for s, e in consumed):
+            continue
+        if op == "between":
+            first, second = _period(match.group(1)), _period(match.group(2))
+            if not first or not second:
+                return None
+            start, end = first[0], second[1]
+        else:
+            period = _period(match.group(2) if match.re is _BOUND else match.group(1))
+            if period is None:
+                return None
+            start, end = _bound(op, period)
+        low = max(filter(None, (low, start)), default=None)
+        high = min(filter(None, (high, end)), default=None)
+        take(match)
+    overdue = _OVERDUE.search(text)
+    if overdue:
+        yesterday = (today or date.today()) - timedelta(days=1)
+        high = min(filter(None, (high, yesterday)))
+        take(overdue)
+    if (low or high) and not (overdue or _HAS_DEADLINE_WORD.search(text)):
+        return None  # "findings in 2025" may mean the report year: leave it to RAG
+    query.deadline_from = low.isoformat() if low else None
+    query.deadline_to = high.isoformat() if high else None
+
+    for match in _SEVERITY.finditer(text):
+        if not any(s <= match.start() < e for s, e in consumed):
+            if match.group(1) not in query.severity:
+                query.severity.append(match.group(1))
+            take(match)
+
+    for region in sorted(regions, key=len, reverse=True):
+        for match in re.finditer(rf"\b{re.escape(region.lower())}\b", text):
+            if not any(s <= match.start() < e for s, e in consumed):
+                if region not in query.region:
+                    query.region.append(region)
+                take(match)
+
+    if not (query.severity or query.region or query.owner or low or high):
+        return None
+    leftover = "".join(" " if any(s <= i < e for s, e in consumed) else ch
+                       for i, ch in enumerate(text))
+    if any(word not in FILLER for word in _WORD.findall(leftover)):
+        return None
+    return query
+
+
+def _original_case(question: str, normalised: str, start: int, end: int) -> str:
+    """The question's own spelling of a span of its normalised text (names keep their case)."""
+    original = " ".join(question.replace("’", "'").split())
+    return original[start:end] if original.lower().startswith(normalised) else normalised[start:end]
@@ -0,0 +1,230 @@
+"""
+Theme Index — recurring themes across reports, clustered at ingest time.
+
+"Which issues keep coming back across regions?" used to be answered by
+stuffing a handful of retrieved chunks into one GPT call. Here every chunk
+is given a theme when it is indexed, by mini-batch k-means over its
+embedding:
+- Spherical k-means (unit vectors, cosine) with settings.theme_count
+  centroids, seeded k-means++ style from chunks that are not already
+  close to a theme
+- Each ingest batch is one mini-batch: its chunks go to the nearest
+  centroid, which moves towards them at a rate of 1 / (chunks it has
+  absorbed), so a centroid is the running mean of its members
+- A chunk keeps the theme it was given (re-clustering old chunks would
+  mean keeping every vector here); centroids settle after a few hundred
+  members, and deleting the index file rebuilds it from the collection
+- summary() groups the assignments by theme with member reports, regions
+  and severities, cached until the next write: no LLM, no vector scan
+
+Kept in sync like the BM25 and metadata indexes (add/update/delete) and
+persisted with them as one .npz next to the Chroma data (strings packed,
+saved in the background: see src/index_files.py).
+"""
+import logging
+import os
+import threading
+from collections import Counter
+import numpy as np
+from src.index_files import pack_strings, unpack_strings
+
+logger = logging.getLogger(__name__)
+
+_SEED_MAX_SIMILARITY = 0.8  # A chunk this close to a theme never seeds a new one
+_COLUMNS = ("report_id", "report_title", "region", "severity")
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _fields(meta: dict) -> tuple:
+    """What summaries need from chunk metadata; a finding's severity beats its report's."""
+    severity = meta.get("finding_severity") or meta.get("severity")
+    region = meta.get("region")
+    return (meta.get("report_id", ""), meta.get("report_title", "Unknown"),
+            None if region == "unknown" else region,
+            None if severity == "unknown" else severity)
+
+
+class ThemeIndex:
+    """Incremental k-means over chunk embeddings. All methods are thread-safe."""
+
+    def __init__(self, path: str = None, n_themes: int = 24, seed: int = 0):
+        self.path = path
+        self.n_themes = n_themes
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._reset()
+        if path and os.path.exists(path):
+            try:
+                self._load(path)
+            except Exception as e:
+                logger.warning(f"Could not load theme index from {path} ({e}); starting empty")
+                self._reset()
+
+    def _reset(self) -> None:
+        self._centroids = np.zeros((0, 0), dtype=np.float32)
+        self._absorbed = np.zeros(0, dtype=np.int64)  # Chunks each centroid has learnt from
+        self._chunks: dict[str, tuple] = {}  # chunk id → (theme, similarity, *_COLUMNS)
+        self._summary = None
+
+    # ── WRITES ─────────────────────────────────────────────
+    def add(self, chunk_ids: list[str], embeddings, metadatas: list[dict]) -> None:
+        """Assign chunks to themes (an already indexed chunk is reassigned)."""
+        if not len(chunk_ids):
+            return
+        vectors = _normalise(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            if self._centroids.size and self._centroids.shape[1] != vectors.shape[1]:
+                logger.warning("Embedding size changed; theme index starts over")
+                self._reset()
+            self._seed(vectors)
+            sims = vectors @ self._centroids.T
+            themes = sims.argmax(axis=1)
+            best = sims[np.arange(len(vectors)), themes]
+            self._learn(vectors, themes)
+            for chunk_id, theme, similarity, meta in zip(chunk_ids, themes.tolist(),
+                                                         best.tolist(), metadatas):
+                self._chunks[chunk_id] = (theme, round(similarity, 4), *_fields(meta))
+            self._summary = None
+
+    def update(self, chunk_ids: list[str], metadatas: list[dict]) -> None:
+        with self._lock:
+            for chunk_id, meta in zip(chunk_ids, metadatas):
+                entry = self._chunks.get(chunk_id)
+                if entry is not None:
+                    self._chunks[chunk_id] = (*entry[:2], *_fields(meta))
+            self._summary = None
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self._chunks.pop(chunk_id, None)
+            self._summary = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _seed(self, vectors: np.ndarray) -> None:
+        """k-means++: new centroids drawn with probability ∝ distance² to the nearest one."""
+        missing = self.n_themes - len(self._centroids)
+        if missing <= 0:
+            return
+        closest = ((vectors @ self._centroids.T).max(axis=1) if len(self._centroids)
+                   else np.full(len(vectors), -1.0, dtype=np.float32))
+        seeds = []
+        for _ in range(missing):
+            weights = np.where(closest < _SEED_MAX_SIMILARITY, (1.0 - closest) ** 2, 0.0)
+            total = weights.sum()
+            if total <= 0:
+                break
+            pick = int(self._rng.choice(len(vectors), p=weights / total))
+            seeds.append(pick)
+            np.maximum(closest, vectors @ vectors[pick], out=closest)
+        if seeds:
+            self._centroids = np.vstack([self._centroids.reshape(-1, vectors.shape[1]),
+                                         vectors[seeds]])
+            self._absorbed = np.concatenate([self._absorbed, np.zeros(len(seeds), dtype=np.int64)])
+
+    def _learn(self, vectors: np.ndarray, themes: np.ndarray) -> None:
+        """Mini-batch step: every centroid moves to the running mean of its members."""
+        k = len(self._centroids)
+        counts = np.bincount(themes, minlength=k)
+        members = np.zeros((k, len(vectors)), dtype=np.float32)
+        members[themes, np.arange(len(vectors))] = 1.0
+        sums = members @ vectors
+        moved = counts > 0
+        self._absorbed += counts
+        rate = (counts[moved] / self._absorbed[moved])[:, None].astype(np.float32)
+        means = sums[moved] / counts[moved, None]
+        self._centroids[moved] = _normalise((1 - rate) * self._centroids[moved] + rate * means)
+
+    # ── QUERIES ────────────────────────────────────────────
+    def summary(self) -> list[dict]:
+        """
+        One entry per theme with members, most reports first: chunk count,
+        reports (with their chunk counts), region and severity counts, and
+        the chunk closest to the centroid (representative_chunk_id).
+        """
+        with self._lock:
+            if self._summary is None:
+                self._summary = self._summarise()
+            return self._summary
+
+    def _summarise(self) -> list[dict]:
+        themes: dict[int, dict] = {}
+        for chunk_id, (theme, similarity, report_id, title, region, severity) in self._chunks.items():
+            entry = themes.get(theme)
+            if entry is None:
+                entry = themes[theme] = {"chunks": 0, "reports": {}, "regions": Counter(),
+                                         "severities": Counter(), "best": (-2.0, chunk_id)}
+            entry["chunks"] += 1
+            report = entry["reports"].setdefault(
+                report_id, {"report_id": report_id, "title": title, "chunks": 0})
+            report["chunks"] += 1
+            if region:
+                entry["regions"][region] += 1
+            if severity:
+                entry["severities"][severity] += 1
+            if similarity > entry["best"][0]:
+                entry["best"] = (similarity, chunk_id)
+        summary = [{
+            "theme_id": theme,
+            "chunks": entry["chunks"],
+            "report_count": len(entry["reports"]),
+            "reports": sorted(entry["reports"].values(), key=lambda r: (-r["chunks"], r["title"])),
+            "regions": dict(entry["regions"].most_common()),
+            "severities": dict(entry["severities"].most_common()),
+            "representative_chunk_id": entry["best"][1]
+        } for theme, entry in themes.items()]
+        summary.sort(key=lambda t: (-t["report_count"], -t["chunks"], t["theme_id"]))
+        return summary
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"themes": len(self._centroids), "max_themes": self.n_themes,
+                    "chunks": len(self._chunks)}
+
+    # ── PERSISTENCE ────────────────────────────────────────
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            rows = list(self._chunks.items())
+            arrays = {
+                "centroids": self._centroids,
+                "absorbed": self._absorbed,
+                "themes": np.array([entry[0] for _, entry in rows], dtype=np.int64),
+                "similarity": np.array([entry[1] for _, entry in rows], dtype=np.float32),
+            }
+            pack_strings(arrays, "chunk_ids", [chunk_id for chunk_id, _ in rows])
+            for i, column in enumerate(_COLUMNS, 2):
+                pack_strings(arrays, column, [entry[i] for _, entry in rows])
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self.path)
+
+    def _load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            self._centroids = data["centroids"].astype(np.float32)
+            self._absorbed = data["absorbed"].astype(np.int64)
+            columns = [unpack_strings(data, c) for c in _COLUMNS]
+            for row, (chunk_id, theme, similarity) in enumerate(zip(
+                    unpack_strings(data, "chunk_ids"), data["themes"].tolist(),
+                    data["similarity"].tolist())):
+                self._chunks[chunk_id] = (theme, round(similarity, 4),
+                                          *(column[row] or None for column in columns))
+        if len(self._centroids) > self.n_themes:
+            logger.warning(f"Theme index has {len(self._centroids)} themes, more than "
+                           f"theme_count={self.n_themes}; delete it to recluster")
+        logger.info(f"Loaded theme index: {len(self._chunks)} chunks, {len(self._centroids)} themes")
@@ -0,0 +1,41 @@
+"""
+Token counting — shared helper for anything that budgets by tokens.
+
+Uses tiktoken (the same BPE tokenizer OpenAI uses) when it is installed
+and its encoding file can be loaded. Otherwise falls back to the usual
+"~4 characters per token" rule of thumb. Counts are used for packing
+batches and prompts, never for billing, so an estimate is good enough.
+"""
+from functools import lru_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # Not installed, or offline with no cached BPE file
+        logger.info(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text (exact with tiktoken, estimated otherwise)."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text that fits in max_tokens."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
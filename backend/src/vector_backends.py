@@ -0,0 +1,173 @@
+"""
+Vector Backends — the storage engine behind AuditVectorStore.
+
+AuditVectorStore only needs a handful of collection operations (add,
+upsert, update, delete, get, query, count). They are described once here,
+in the shape of Chroma's collection API, so the engine can be swapped with
+one setting:
+
+    VECTOR_BACKEND=chroma  → ChromaBackend (default): chromadb.PersistentClient
+    VECTOR_BACKEND=local   → LocalVectorIndex: in-process NumPy engine with a
+                             memory-mapped matrix (see src/local_index.py)
+
+Return values follow Chroma: get() returns {"ids", "documents",
+"metadatas", "embeddings"}, query() the same keys (plus "distances") with
+one list per query vector. `where` filters use Chroma's syntax
+({"region": "APAC"}, {"$and": [...]}, {"year": {"$gte": 2024}}).
+"""
+from abc import ABC, abstractmethod
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorBackend(ABC):
+    """Minimal collection interface used by AuditVectorStore."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks."""
+
+    @abstractmethod
+    def max_batch_size(self) -> int:
+        """Largest number of chunks one add()/upsert() call accepts."""
+
+    @abstractmethod
+    def add(self, ids: list[str], embeddings: list, documents: list[str],
+            metadatas: list[dict]) -> None:
+        """Store new chunks."""
+
+    @abstractmethod
+    def upsert(self, ids: list[str], embeddings: list, documents: list[str],
+               metadatas: list[dict]) -> None:
+        """Store chunks, replacing any with the same id."""
+
+    @abstractmethod
+    def update(self, ids: list[str], metadatas: list[dict]) -> None:
+        """Change the metadata of existing chunks."""
+
+    @abstractmethod
+    def delete(self, ids: list[str] = None, where: dict = None) -> None:
+        """Remove chunks by id or by filter."""
+
+    @abstractmethod
+    def get(self, ids: list[str] = None, where: dict = None, limit: int = None,
+            offset: int = None, include: list[str] = None) -> dict:
+        """Fetch chunks by id, by filter, or page through all of them."""
+
+    @abstractmethod
+    def query(self, query_embeddings: list, n_results: int = 10, where: dict = None,
+              include: list[str] = None) -> dict:
+        """Nearest chunks (cosine) for each query vector, optionally filtered."""
+
+    def stats(self) -> dict:
+        """Engine, size and storage figures for /health."""
+        return {"chunks": self.count()}
+
+    def query_ids(self, query_embeddings: list, ids: list[str],
+                  n_results: int = 10, include_embeddings: bool = False) -> dict:
+        """
+        Exact top-n among the given chunk ids, for each query vector
+        (query()-shaped result). Used for selective filters, where scoring
+        the small matching subset beats a filtered ANN search. The subset is
+        fetched once, however many query vectors there are.
+        """
+        out = {key: [] for key in ("ids", "documents", "metadatas", "distances", "embeddings")}
+        found = self.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+        if not found["ids"]:
+            for key in out:
+                out[key] = [[] for _ in query_embeddings]
+            return out
+        matrix = _normalise(np.asarray(found["embeddings"], dtype=np.float32))
+        queries = _normalise(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        for sims in queries @ matrix.T:
+            top = _top_n(sims, n_results)
+            out["ids"].append([found["ids"][i] for i in top])
+            out["documents"].append([found["documents"][i] for i in top])
+            out["metadatas"].append([found["metadatas"][i] for i in top])
+            out["distances"].append((1.0 - sims[top]).tolist())
+            out["embeddings"].append([found["embeddings"][i] for i in top]
+                                     if include_embeddings else None)
+        return out
+
+
+class ChromaBackend(VectorBackend):
+    """The original engine: a persistent Chroma collection with cosine HNSW."""
+
+    def __init__(self, path: str, name: str = "audit_reports"):
+        import chromadb
+        self.client = chromadb.PersistentClient(path=path)
+        self.collection = self.client.get_or_create_collection(
+            name=name,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def max_batch_size(self) -> int:
+        return self.client.get_max_batch_size()
+
+    def stats(self) -> dict:
+        return {"backend": "chroma", "chunks": self.count(), "storage": "float32"}
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents,
+                            metadatas=metadatas)
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents,
+                               metadatas=metadatas)
+
+    def update(self, ids, metadatas) -> None:
+        self.collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(self, ids=None, where=None) -> None:
+        self.collection.delete(ids=ids, where=where)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None) -> dict:
+        return self.collection.get(ids=ids, where=where, limit=limit, offset=offset,
+                                   include=include if include is not None
+                                   else ["metadatas", "documents"])
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None) -> dict:
+        return self.collection.query(query_embeddings=query_embeddings, n_results=n_results,
+                                     where=where,
+                                     include=include if include is not None
+                                     else ["metadatas", "documents", "distances"])
+
+
+def _top_n(scores: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the n highest scores, best first (argpartition + small sort)."""
+    if len(scores) > n:
+        top = np.argpartition(-scores, n - 1)[:n]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def create_backend(settings) -> VectorBackend:
+    """Backend selected by settings.vector_backend."""
+    if settings.vector_backend == "chroma":
+        if settings.local_index_storage != "float32":
+            logger.warning("LOCAL_INDEX_STORAGE only applies to VECTOR_BACKEND=local; "
+                           "Chroma keeps float32 vectors")
+        return ChromaBackend(settings.chroma_path)
+    if settings.vector_backend == "local":
+        from src.local_index import LocalVectorIndex
+        return LocalVectorIndex(
+            settings.local_index_path or os.path.join(settings.chroma_path, "local_index"),
+            ivf_lists=settings.local_index_ivf_lists,
+            ivf_probes=settings.local_index_ivf_probes,
+            ivf_min_rows=settings.local_index_ivf_min_rows,
+            storage=settings.local_index_storage,
+            rescore=settings.local_index_rescore
+        )
+    raise ValueError(f"Unknown vector backend: {settings.vector_backend}")
@@ -5,148 +5,852 @@ New capability vs Project 1:
 - Store region, severity, audit_type as searchable metadata
 - Filter search results by region, severity, or year
 - Get statistics about the indexed content
+- Incremental re-ingestion: a revised report only re-embeds changed chunks
+- Durable, indexed report registry (SQLite) that survives restarts
+- Retrieval cache, invalidated through an index generation counter
+- Pluggable engine: Chroma (default) or a local NumPy index, picked by
+  settings.vector_backend (see src/vector_backends.py)
+- Hybrid retrieval: a BM25 index over the same chunks catches exact finding
+  IDs and control numbers; its ranking is fused with the dense one (RRF)
+- Metadata bitmap index: multi-value and year-range filters, and exact
+  scoring of the matching subset when a filter is selective
+- search_many(): many queries in one multi-query backend call
+- Diversity reranking: candidates are over-fetched and re-picked with MMR
+  (src/mmr.py), optionally capping how many results one report supplies
+- Theme index: chunks are clustered into cross-report themes as they are
+  indexed (src/theme_index.py), so themes() needs no LLM or vector scan
+- Findings table: every report's findings (severity, owner, deadline...)
+  are stored as rows (src/findings_store.py) for structured queries
  
 ChromaDB's WHERE clause works like SQL WHERE:
   collection.query(query_embeddings=[...], where={"region": "APAC"})
-Returns only chunks from APAC reports.
+Returns only chunks from APAC reports. Both backends accept it.
+
+All public methods are coroutines: embedding awaits OpenAI, and every
+(blocking) backend call runs in a worker thread via run_io().
 """
-import chromadb
+import numpy as np
+from src.bm25_index import BM25Index
+from src.metadata_index import MetadataIndex, normalize_filters, to_where
 from src.config import settings
+from src.embedding_cache import text_hash
 from src.embedding_service import embedding_service
+from src.executors import run_io
+from src.index_files import IndexSaver
+from src.findings_store import FindingsStore, findings_from_chunks
+from src.metrics import stage
+from src.mmr import mmr
+from src.query_cache import QueryCache, make_key
+from src.report_registry import ReportRegistry
+from src.theme_index import ThemeIndex
+from src.vector_backends import create_backend
+import asyncio
+import hashlib
 import logging
+import os
 import uuid
+import weakref
+from contextlib import AsyncExitStack
 from datetime import datetime
+from typing import Callable, Optional
  
 logger = logging.getLogger(__name__)
  
+ 
+def report_fingerprint(chunk_hashes: list[str]) -> str:
+    """Content fingerprint of a whole report, derived from its chunk hashes."""
+    return hashlib.sha256("\n".join(chunk_hashes).encode()).hexdigest()
+ 
+ 
+def _chunk_id(report_id: str, chunk_hash: str, taken: set) -> str:
+    """
+    Content-addressed chunk id: an unchanged chunk keeps its id across
+    revisions. Identical chunks within one report get a numeric suffix.
+    """
+    chunk_id, n = f"{report_id}_{chunk_hash[:16]}", 1
+    while chunk_id in taken:
+        chunk_id, n = f"{report_id}_{chunk_hash[:16]}_{n}", n + 1
+    taken.add(chunk_id)
+    return chunk_id
+ 
+ 
+def _known(value):
+    """Chunk metadata stores missing values as "unknown"; the registry uses NULL."""
+    return None if value in (None, "unknown") else value
+ 
+ 
 class AuditVectorStore:
-    """ChromaDB store optimised for audit report search with filtering."""
+    """Vector store optimised for audit report search with filtering."""
  
     def __init__(self):
-        self.client = chromadb.PersistentClient(path=settings.chroma_path)
-        self.collection = self.client.get_or_create_collection(
-            name="audit_reports",
-            metadata={"hnsw:space": "cosine"}
+        # Chroma collection or local index — same Chroma-shaped interface
+        self.collection = create_backend(settings)
+        self.registry = ReportRegistry(
+            settings.report_registry_path
+            or os.path.join(settings.chroma_path, "report_registry.sqlite3")
+        )
+        self._validate_registry()
+        self.findings = FindingsStore(
+            settings.findings_db_path
+            or os.path.join(settings.chroma_path, "findings.sqlite3")
+        )
+        self._validate_findings()
+        self.lexical_index = BM25Index(
+            settings.bm25_index_path
+            or os.path.join(settings.chroma_path, "bm25_index.npz")
+        )
+        self.metadata_index = MetadataIndex(
+            settings.metadata_index_path
+            or os.path.join(settings.chroma_path, "metadata_index.npz")
+        )
+        self.theme_index = ThemeIndex(
+            settings.theme_index_path
+            or os.path.join(settings.chroma_path, "theme_index.npz"),
+            n_themes=settings.theme_count
+        )
+        # Index files are saved in the background, not after every write
+        self.index_saver = IndexSaver(
+            [self.lexical_index, self.metadata_index, self.theme_index],
+            os.path.join(settings.chroma_path, "chunk_indexes.unsaved"),
+            interval=settings.index_save_interval_seconds
         )
-        self._report_registry: dict = {}
+        self._validate_lexical_index()
+        # How filtered dense searches were executed (see _dense_search)
+        self.filter_strategies = {"exact": 0, "ann": 0, "ann_fallback": 0}
  
-    def add_report(self, title: str, chunks: list[str],
-                   region: str = None, severity: str = None,
-                   audit_type: str = None, year: int = None) -> str:
-        """Ingest an audit report with metadata for filtering."""
-        report_id = str(uuid.uuid4())[:8]
-        uploaded_at = datetime.utcnow().isoformat()
-        year_val = year or datetime.now().year
+        # Bumped after every add/update/delete; caches keyed on it go stale
+        self.generation = 0
+        # upsert_report() holds these per title and per target report id
+        # (weak: a lock is dropped once no upsert holds or waits for it)
+        self._upsert_locks = weakref.WeakValueDictionary()
+        self.retrieval_cache = QueryCache(
+            "retrieval",
+            max_entries=settings.retrieval_cache_max_entries,
+            ttl_seconds=settings.query_cache_ttl_seconds
+        ) if settings.query_cache_enabled else None
+ 
+    def _validate_registry(self) -> None:
+        """
+        Cheap startup check: the registry's chunk total must equal the
+        collection count. Only if they disagree (first run after upgrading,
+        or a crash between Chroma and registry writes) do we rebuild the
+        registry from chunk metadata.
+        """
+        expected = self.collection.count()
+        if self.registry.total_chunks() == expected:
+            return
+        logger.warning(f"Report registry out of sync with Chroma ({expected} chunks); rebuilding")
+        reports: dict[str, dict] = {}
+        page = 5000
+        for offset in range(0, expected, page):
+            batch = self.collection.get(include=["metadatas"], limit=page, offset=offset)
+            for meta in batch["metadatas"]:
+                entry = reports.setdefault(meta["report_id"], {
+                    "report_id": meta["report_id"],
+                    "title": meta.get("report_title", "Unknown"),
+                    "uploaded_at": meta.get("uploaded_at", ""),
+                    "region": _known(meta.get("region")),
+                    "severity": _known(meta.get("severity")),
+                    "audit_type": _known(meta.get("audit_type")),
+                    "year": meta.get("year"),
+                    "chunks": 0
+                })
+                entry["chunks"] += 1
+                entry.setdefault("_hashes", []).append(
+                    (meta.get("chunk_index", 0), meta.get("chunk_hash")))
+        for entry in reports.values():
+            hashes = [h for _, h in sorted(entry.pop("_hashes"), key=lambda x: x[0])]
+            if all(hashes):
+                entry["fingerprint"] = report_fingerprint(hashes)
+        self.registry.clear()
+        self.registry.upsert_many(list(reports.values()))
+        logger.info(f"Report registry rebuilt: {len(reports)} reports")
  
-        logger.info(f"Embedding {len(chunks)} chunks for '{title}'")
-        embeddings = embedding_service.embed_batch(chunks)
+    def _validate_findings(self) -> None:
+        """
+        The findings table knows every report it has seen (even those
+        without findings); if that count differs from the registry's, it is
+        rebuilt from the finding tags on the chunks (titles are lost).
+        """
+        expected = self.registry.count()
+        if self.findings.report_count() == expected:
+            return
+        logger.warning(f"Findings table out of sync with the registry ({expected} reports); rebuilding")
+        by_report: dict[str, list] = {}
+        page, total = 5000, self.collection.count()
+        for offset in range(0, total, page):
+            batch = self.collection.get(include=["metadatas"], limit=page, offset=offset)
+            for meta in batch["metadatas"]:
+                by_report.setdefault(meta["report_id"], []).append(meta)
+        self.findings.clear()
+        for report_id, metas in by_report.items():
+            report = self.registry.get(report_id) or {"title": metas[0].get("report_title")}
+            self.findings.replace_report(report_id, report, findings_from_chunks(metas))
+        logger.info(f"Findings table rebuilt: {self.findings.count()} findings")
  
-        chunk_ids = [f"{report_id}_chunk_{i}" for i in range(len(chunks))]
+    def _validate_lexical_index(self) -> None:
+        """
+        Same idea as _validate_registry(): rebuild the BM25, metadata and
+        theme indexes from the collection only when their chunk count
+        disagrees, or when the last run stopped before saving its writes
+        (embeddings are only read back for the theme index).
+        """
+        expected = self.collection.count()
+        unsaved = self.index_saver.indexes if self.index_saver.interrupted else []
+        stale = [index for index in (self.lexical_index, self.metadata_index, self.theme_index)
+                 if len(index) != expected or index in unsaved]
+        if not stale:
+            return
+        logger.warning(f"Chunk indexes out of sync with the collection ({expected} chunks); rebuilding")
+        for index in stale:
+            index.clear()
+        page = 5000
+        include = ["documents", "metadatas"] + (["embeddings"] if self.theme_index in stale else [])
+        for offset in range(0, expected, page):
+            batch = self.collection.get(include=include, limit=page, offset=offset)
+            if self.lexical_index in stale:
+                self.lexical_index.add(batch["ids"], batch["documents"], batch["metadatas"])
+            if self.metadata_index in stale:
+                self.metadata_index.add(batch["ids"], batch["metadatas"])
+            if self.theme_index in stale:
+                self.theme_index.add(batch["ids"], batch["embeddings"], batch["metadatas"])
+        for index in stale:
+            index.save()
+        self.index_saver.recovered()
+ 
+    def _update_lexical_index(self, add: tuple = None, update: tuple = None,
+                              delete: list[str] = None, embeddings: list = None) -> None:
+        """
+        Apply one mutation batch to the BM25, metadata and theme indexes
+        (runs in a thread); index_saver persists them. add = (ids,
+        documents, metadatas) with the added chunks' embeddings, update =
+        (ids, metadatas).
+        """
+        with self.index_saver.changing():
+            if add:
+                self.lexical_index.add(*add)
+                self.metadata_index.add(add[0], add[2])
+                self.theme_index.add(add[0], embeddings, add[2])
+            if update:
+                self.lexical_index.update_metadata(*update)
+                self.metadata_index.update(*update)
+                self.theme_index.update(*update)
+            if delete:
+                self.lexical_index.delete(delete)
+                self.metadata_index.delete(delete)
+                self.theme_index.delete(delete)
  
-        # Metadata stored with each chunk — enables filtering later
-        metadatas = [{
+    @staticmethod
+    def _chunk_metadata(report_id: str, report: dict, chunk_index: int,
+                        chunk_hash: str, uploaded_at: str) -> dict:
+        """Metadata stored with each chunk — enables filtering later."""
+        meta = {
             "report_id": report_id,
-            "report_title": title,
-            "chunk_index": i,
+            "report_title": report["title"],
+            "chunk_index": chunk_index,
+            "chunk_hash": chunk_hash,
             "uploaded_at": uploaded_at,
             # These fields enable the WHERE filtering:
-            "region": region or "unknown",
-            "severity": severity or "unknown",
-            "audit_type": audit_type or "unknown",
-            "year": year_val
-        } for i in range(len(chunks))]
- 
-        self.collection.add(
-            embeddings=embeddings,
-            documents=chunks,
-            metadatas=metadatas,
-            ids=chunk_ids
-        )
+            "region": report.get("region") or "unknown",
+            "severity": report.get("severity") or "unknown",
+            "audit_type": report.get("audit_type") or "unknown",
+            "year": report.get("year") or datetime.now().year
+        }
+        # Chunks from src.chunker know where they came from (offsets, pages)
+        # and which finding they belong to
+        chunk_meta = getattr(report["chunks"][chunk_index], "metadata", None)
+        if chunk_meta:
+            meta.update(chunk_meta())
+        return meta
+ 
+    async def add_report(self, title: str, chunks: list[str],
+                         region: str = None, severity: str = None,
+                         audit_type: str = None, year: int = None,
+                         on_stage: Callable[[str], None] = None,
+                         findings: list[dict] = None) -> str:
+        """
+        Ingest an audit report with metadata for filtering.
+        on_stage, if given, is called with "embed" and then "index" as the
+        report moves through the pipeline (used for job progress).
+        findings are the metadata extractor's finding records; without
+        them, findings are read back from the chunks' finding tags.
+        """
+        report = {"title": title, "chunks": chunks, "region": region,
+                  "severity": severity, "audit_type": audit_type, "year": year}
+        if findings is not None:
+            report["findings"] = findings
+        return (await self.add_reports([report], on_stage=on_stage))[0]
+ 
+    async def add_reports(self, reports: list[dict],
+                          on_stage: Callable[[str], None] = None) -> list[str]:
+        """
+        Ingest several reports at once (bulk ingestion).
+        Each report is a dict with the add_report() arguments. All chunks are
+        embedded in ONE embed_batch call and written with as few Chroma
+        add() calls as its batch limit allows. Returns the new report ids.
+        """
+        uploaded_at = datetime.utcnow().isoformat()
+        all_chunks, chunk_ids, metadatas, report_ids = [], [], [], []
+ 
+        fingerprints = []
+        for report in reports:
+            report_id = str(uuid.uuid4())[:8]
+            report_ids.append(report_id)
+            chunks = report["chunks"]
+            hashes = [text_hash(c) for c in chunks]
+            fingerprints.append(report_fingerprint(hashes))
+            all_chunks.extend(chunks)
+            taken = set()
+            chunk_ids.extend(_chunk_id(report_id, h, taken) for h in hashes)
+            metadatas.extend(
+                self._chunk_metadata(report_id, report, i, h, uploaded_at)
+                for i, h in enumerate(hashes)
+            )
  
-        self._report_registry[report_id] = {
-            "title": title, "chunks": len(chunks),
-            "uploaded_at": uploaded_at, "region": region,
-            "severity": severity, "audit_type": audit_type
+        if on_stage: on_stage("embed")
+        logger.info(f"Embedding {len(all_chunks)} chunks for {len(reports)} report(s)")
+        with stage("ingest", "embed"):
+            embeddings = await embedding_service.embed_batch(all_chunks)
+ 
+        if on_stage: on_stage("index")
+        with stage("ingest", "index"):
+            batch_size = self.collection.max_batch_size()
+            for i in range(0, len(all_chunks), batch_size):
+                await run_io(
+                    self.collection.add,
+                    embeddings=embeddings[i:i + batch_size],
+                    documents=all_chunks[i:i + batch_size],
+                    metadatas=metadatas[i:i + batch_size],
+                    ids=chunk_ids[i:i + batch_size]
+                )
+            await run_io(self._update_lexical_index, add=(chunk_ids, all_chunks, metadatas),
+                         embeddings=embeddings)
+ 
+        await run_io(self.registry.upsert_many, [{
+            "report_id": report_id,
+            "title": report["title"], "chunks": len(report["chunks"]),
+            "uploaded_at": uploaded_at, "region": report.get("region"),
+            "severity": report.get("severity"), "audit_type": report.get("audit_type"),
+            "year": report.get("year"),
+            "version": 1, "updated_at": uploaded_at, "fingerprint": fingerprint
+        } for report_id, report, fingerprint in zip(report_ids, reports, fingerprints)])
+        start = 0
+        for report_id, report in zip(report_ids, reports):
+            end = start + len(report["chunks"])
+            await run_io(self.findings.replace_report, report_id, report,
+                         _report_findings(report, metadatas[start:end]))
+            start = end
+        self.generation += 1
+        return report_ids
+ 
+    # ── INCREMENTAL RE-INGESTION ─────────────────────────────
+    async def find_report(self, fingerprint: str) -> Optional[str]:
+        """
+        Id of the indexed report with exactly this content (fingerprint), if
+        any. There is deliberately no lookup by title: a title is a file
+        name, and two unrelated reports can share one.
+        """
+        found = await run_io(self.registry.find_by_fingerprint, fingerprint)
+        return found["report_id"] if found else None
+ 
+    async def upsert_report(self, title: str, chunks: list[str],
+                            region: str = None, severity: str = None,
+                            audit_type: str = None, year: int = None,
+                            on_stage: Callable[[str], None] = None,
+                            findings: list[dict] = None,
+                            report_id: str = None) -> tuple[str, Optional[dict]]:
+        """
+        Add a new report, or incrementally update an earlier version of it:
+        the report_id given (a revision), or the report with exactly this
+        content. A title alone never replaces anything: two regions'
+        "report.pdf" are two reports. Upserts of the same title or target
+        run one at a time, so concurrent uploads can't both miss each other.
+        Returns (report_id, chunk_diff); chunk_diff is None for a new report.
+        """
+        async with AsyncExitStack() as held:
+            # Always the title first, then the id: no lock-order cycles
+            for key in [("title", title)] + ([("report", report_id)] if report_id else []):
+                await held.enter_async_context(self._upsert_locks.setdefault(key, asyncio.Lock()))
+            if report_id is None:
+                fingerprint = report_fingerprint([text_hash(c) for c in chunks])
+                report_id = await self.find_report(fingerprint)
+            elif not await self.get_report(report_id):
+                raise ValueError(f"Report {report_id} not found")
+            if report_id is None:
+                return await self.add_report(title, chunks, region, severity, audit_type,
+                                             year, on_stage=on_stage, findings=findings), None
+            report = {"title": title, "chunks": chunks, "region": region,
+                      "severity": severity, "audit_type": audit_type, "year": year}
+            if findings is not None:
+                report["findings"] = findings
+            return report_id, await self.update_report(report_id, report, on_stage=on_stage)
+ 
+    async def upsert_reports(self, reports: list[dict],
+                             on_stage: Callable[[str], None] = None) -> list:
+        """
+        upsert_report() for many reports at once (bulk ingestion). Each report
+        is a dict with the add_report() arguments; one whose content is
+        already indexed (or repeats an earlier report of the batch) updates
+        that report, the others are added with a single add_reports(). All
+        their titles stay locked throughout, as in upsert_report(). Returns,
+        per report, (report_id, chunk_diff) or the exception that failed it.
+        """
+        results: list = [None] * len(reports)
+        async with AsyncExitStack() as held:
+            for title in sorted({report["title"] for report in reports}):
+                await held.enter_async_context(
+                    self._upsert_locks.setdefault(("title", title), asyncio.Lock()))
+            fresh, existing, repeats, first_with = [], [], [], {}
+            for i, report in enumerate(reports):
+                fingerprint = report_fingerprint([text_hash(c) for c in report["chunks"]])
+                report_id = await self.find_report(fingerprint)
+                if report_id:
+                    existing.append((i, report_id))
+                elif fingerprint in first_with:
+                    repeats.append((i, first_with[fingerprint]))
+                else:
+                    first_with[fingerprint] = i
+                    fresh.append(i)
+            if fresh:
+                try:
+                    report_ids = await self.add_reports([reports[i] for i in fresh], on_stage)
+                    for i, report_id in zip(fresh, report_ids):
+                        results[i] = (report_id, None)
+                except Exception as e:
+                    for i in fresh:
+                        results[i] = e
+            for i, first in repeats:
+                if isinstance(results[first], Exception):
+                    results[i] = results[first]
+                else:
+                    existing.append((i, results[first][0]))
+            for i, report_id in existing:
+                try:
+                    results[i] = (report_id, await self.update_report(report_id, reports[i]))
+                except Exception as e:
+                    results[i] = e
+        return results
+ 
+    async def update_report(self, report_id: str, report: dict,
+                            on_stage: Callable[[str], None] = None) -> dict:
+        """
+        Bring an indexed report in line with a revised version, chunk by chunk:
+        - unchanged chunks keep their id and embedding (metadata fixed in place)
+        - new or edited chunks are embedded and upserted
+        - chunks that vanished from the revision are deleted
+        Cost is proportional to the diff, not to the document.
+        """
+        existing = await run_io(self.collection.get, where={"report_id": report_id},
+                                include=["documents", "metadatas"])
+        by_hash: dict[str, list] = {}
+        for chunk_id, doc, meta in zip(existing["ids"], existing["documents"],
+                                       existing["metadatas"]):
+            by_hash.setdefault(meta.get("chunk_hash") or text_hash(doc), []).append((chunk_id, meta))
+ 
+        now = datetime.utcnow().isoformat()
+        chunks = report["chunks"]
+        hashes = [text_hash(c) for c in chunks]
+        kept_ids, update_ids, update_metas, new_idx = set(), [], [], []
+        for i, h in enumerate(hashes):
+            if by_hash.get(h):
+                chunk_id, old_meta = by_hash[h].pop(0)
+                kept_ids.add(chunk_id)
+                meta = self._chunk_metadata(report_id, report, i, h,
+                                            old_meta.get("uploaded_at", now))
+                if meta != old_meta:
+                    update_ids.append(chunk_id)
+                    update_metas.append(meta)
+            else:
+                new_idx.append(i)
+        removed_ids = [chunk_id for entries in by_hash.values() for chunk_id, _ in entries]
+ 
+        if on_stage: on_stage("embed")
+        new_chunks = [chunks[i] for i in new_idx]
+        with stage("ingest", "embed"):
+            embeddings = await embedding_service.embed_batch(new_chunks)
+ 
+        if on_stage: on_stage("index")
+        added = None
+        with stage("ingest", "index"):
+            if new_idx:
+                taken = set(kept_ids)
+                added = ([_chunk_id(report_id, hashes[i], taken) for i in new_idx], new_chunks,
+                         [self._chunk_metadata(report_id, report, i, hashes[i], now)
+                          for i in new_idx])
+                await run_io(
+                    self.collection.upsert,
+                    ids=added[0],
+                    embeddings=embeddings,
+                    documents=new_chunks,
+                    metadatas=added[2]
+                )
+            if update_ids:
+                await run_io(self.collection.update, ids=update_ids, metadatas=update_metas)
+            if removed_ids:
+                await run_io(self.collection.delete, ids=removed_ids)
+            if new_idx or update_ids or removed_ids:
+                await run_io(self._update_lexical_index, add=added,
+                             update=(update_ids, update_metas), delete=removed_ids,
+                             embeddings=embeddings)
+ 
+        diff = {"added": len(new_idx), "removed": len(removed_ids),
+                "unchanged": len(kept_ids), "metadata_updated": len(update_ids)}
+        changed = bool(new_idx or removed_ids or update_ids)
+        entry = await run_io(self.registry.get, report_id) or {"version": 0}
+        fields = {
+            "title": report["title"], "chunks": len(chunks),
+            "region": report.get("region"), "severity": report.get("severity"),
+            "audit_type": report.get("audit_type"), "year": report.get("year"),
+            "fingerprint": report_fingerprint(hashes),
+            "uploaded_at": entry.get("uploaded_at") or now
         }
-        return report_id
+        version = entry["version"]
+        if changed or not version:
+            version += 1
+            fields.update(version=version, updated_at=now)
+        await run_io(self.registry.upsert, report_id, **fields)
+        await run_io(self.findings.replace_report, report_id, report, _report_findings(
+            report, [self._chunk_metadata(report_id, report, i, h, now)
+                     for i, h in enumerate(hashes)]))
+        if changed:
+            self.generation += 1
+        logger.info(f"Updated report {report_id} to v{version}: {diff}")
+        return {**diff, "version": version}
  
-    def search(self, query: str, n_results: int = 5,
-               filter_region: str = None,
-               filter_severity: str = None,
-               filter_year: int = None) -> list[dict]:
+    async def search(self, query: str, n_results: int = 5,
+                     filter_region=None,
+                     filter_severity=None,
+                     filter_year=None,
+                     query_embedding: list[float] = None,
+                     mode: str = None,
+                     filter_audit_type=None,
+                     filter_year_min: int = None,
+                     filter_year_max: int = None,
+                     filter_finding_severity=None,
+                     mmr_lambda: float = None,
+                     max_per_report: int = None) -> list[dict]:
         """
-        Semantic search with optional metadata filters.
+        Search with optional metadata filters.
+        Pass query_embedding if the caller already embedded the query.
+        mode: "dense", "lexical" or "hybrid" (default: settings.search_mode).
+        Region, severity, audit type and year filters take one value or a
+        list (any of them matches); year_min / year_max bound the year.
+        finding_severity filters chunks by the severity of the finding they
+        belong to, rather than by the severity of the whole report.
+        mmr_lambda / max_per_report override settings.mmr_lambda and
+        settings.mmr_max_per_report (1.0 / 0 = plain relevance order).
         
         Examples:
             search("access control findings")  # All reports
             search("access control", filter_region="APAC")  # APAC only
-            search("critical issues", filter_severity="critical")  # Critical only
-        """
-        query_embedding = embedding_service.embed_text(query)
- 
-        # Build ChromaDB WHERE clause from filters
-        where = None
-        filters = {}
-        if filter_region:
-            filters["region"] = filter_region
-        if filter_severity:
-            filters["severity"] = filter_severity
-        if filter_year:
-            filters["year"] = filter_year
-        if len(filters) == 1:
-            where = filters  # Single filter
-        elif len(filters) > 1:
-            where = {"$and": [{k: v} for k, v in filters.items()]}  # Multiple filters
- 
-        count = self.collection.count()
+            search("critical issues", filter_severity=["critical", "high"])
+            search("reconciliation", filter_year_min=2024)  # 2024 onwards
+            search("access reviews", filter_finding_severity="critical")  # Critical findings only
+            search("F-2024-017", mode="lexical")  # Exact identifier lookup
+        """
+        results = await self.search_many(
+            [query], n_results,
+            filter_region=filter_region, filter_severity=filter_severity,
+            filter_year=filter_year,
+            query_embeddings=None if query_embedding is None else [query_embedding],
+            mode=mode, filter_audit_type=filter_audit_type,
+            filter_year_min=filter_year_min, filter_year_max=filter_year_max,
+            filter_finding_severity=filter_finding_severity,
+            mmr_lambda=mmr_lambda, max_per_report=max_per_report
+        )
+        return results[0]
+ 
+    async def search_many(self, queries: list[str], n_results: int = 5,
+                          filter_region=None,
+                          filter_severity=None,
+                          filter_year=None,
+                          query_embeddings: list[list[float]] = None,
+                          mode: str = None,
+                          filter_audit_type=None,
+                          filter_year_min: int = None,
+                          filter_year_max: int = None,
+                          filter_finding_severity=None,
+                          mmr_lambda: float = None,
+                          max_per_report: int = None) -> list[list[dict]]:
+        """
+        search() for many queries sharing the same filters, one result list
+        per query. Cached queries are answered from the retrieval cache; the
+        rest cost one multi-query vector search, and every chunk fetched to
+        complete a hybrid ranking is fetched once even if several queries
+        retrieved it.
+        """
+        mode = mode or settings.search_mode
+        if mode not in ("dense", "lexical", "hybrid"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        if query_embeddings is None:
+            query_embeddings = await embedding_service.embed_batch(queries)
+ 
+        filters = normalize_filters(region=filter_region, severity=filter_severity,
+                                    audit_type=filter_audit_type, year=filter_year,
+                                    year_min=filter_year_min, year_max=filter_year_max,
+                                    finding_severity=filter_finding_severity)
+ 
+        lambda_ = settings.mmr_lambda if mmr_lambda is None else mmr_lambda
+        per_report = settings.mmr_max_per_report if max_per_report is None else max_per_report
+        diversify = lambda_ < 1 or per_report > 0
+        fetch = n_results * max(1, settings.mmr_fetch_multiplier) if diversify else n_results
+        rerank = (lambda_, per_report, fetch) if diversify else None
+
+        # Same query vector + filters against the same index → same chunks
+        # (lexical modes also depend on the exact query words)
+        generation = self.generation
+        cache_keys = [make_key(emb, filters, n_results, mode, None if mode == "dense" else query,
+                               rerank)
+                      for query, emb in zip(queries, query_embeddings)]
+        results: list = [None] * len(queries)
+        if self.retrieval_cache:
+            for i, key in enumerate(cache_keys):
+                results[i] = self.retrieval_cache.get(key, generation)
+        misses = [i for i, r in enumerate(results) if r is None]
+        if not misses:
+            return results
+ 
+        miss_queries = [queries[i] for i in misses]
+        miss_embeddings = [query_embeddings[i] for i in misses]
+        fused = None
+        if mode == "dense":
+            found = await self._dense_search(miss_embeddings, fetch, filters, diversify)
+        else:
+            depth = max(n_results * settings.hybrid_candidates, fetch)
+            dense = (await self._dense_search(miss_embeddings, depth, filters, diversify)
+                     if mode == "hybrid" else [[] for _ in misses])
+            lexical = await run_io(lambda: [self.lexical_index.search(q, depth, filters)
+                                            for q in miss_queries])
+            found, fused = await self._fuse(dense, lexical, miss_embeddings, fetch, diversify)
+        if diversify:
+            found = await self._diversify(found, n_results, lambda_, per_report, fused)
+ 
+        for i, chunks in zip(misses, found):
+            results[i] = chunks
+            if self.retrieval_cache:
+                self.retrieval_cache.set(cache_keys[i], chunks, generation)
+        return results
+ 
+    async def _dense_search(self, query_embeddings: list[list[float]], n_results: int,
+                            filters: dict, with_embeddings: bool = False) -> list[list[dict]]:
+        """
+        Vector search, with the execution strategy chosen by filter selectivity
+        (the exact number of matching chunks, from the bitmap index):
+        - no filter: plain ANN query
+        - at most filter_exact_max_chunks matches: exact scoring of exactly
+          that subset — fast, and never misses a match
+        - more matches: ANN with a where clause; if it comes back short
+          (HNSW filtering can miss), redo it exactly
+        The threshold is an absolute count because exact scoring has to
+        fetch every matching embedding (~1k is the break-even with Chroma,
+        see benchmarks/bench_filters.py). All query vectors go through the
+        same strategy in one backend call. with_embeddings keeps each chunk's
+        vector (under "embedding") for diversity reranking.
+        """
+        empty = [[] for _ in query_embeddings]
+        count = await run_io(self.collection.count)
         if count == 0:
-            return []
+            return empty
+        if not filters:
+            return await self._ann_search(query_embeddings, min(n_results, count), None,
+                                          with_embeddings)
+ 
+        matching = await run_io(self.metadata_index.count, filters)
+        if matching == 0:
+            return empty
+        wanted = min(n_results, matching)
+        if matching <= settings.filter_exact_max_chunks:
+            self.filter_strategies["exact"] += len(query_embeddings)
+            return await self._exact_search(query_embeddings, wanted, filters, with_embeddings)
+ 
+        results = await self._ann_search(query_embeddings, wanted, to_where(filters),
+                                         with_embeddings)
+        short = [i for i, chunks in enumerate(results) if len(chunks) < wanted]
+        self.filter_strategies["ann"] += len(results) - len(short)
+        if short:
+            logger.info(f"Filtered ANN came back short for {len(short)} queries; rescoring exactly")
+            self.filter_strategies["ann_fallback"] += len(short)
+            rescored = await self._exact_search([query_embeddings[i] for i in short],
+                                                wanted, filters, with_embeddings)
+            for i, chunks in zip(short, rescored):
+                results[i] = chunks
+        return results
  
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=min(n_results, count),
+    async def _ann_search(self, query_embeddings: list[list[float]], n_results: int,
+                          where: Optional[dict], with_embeddings: bool = False) -> list[list[dict]]:
+        results = await run_io(
+            self.collection.query,
+            query_embeddings=query_embeddings,
+            n_results=n_results,
             where=where,
-            include=["documents", "metadatas", "distances"]
+            include=["documents", "metadatas", "distances"] + (["embeddings"] if with_embeddings else [])
         )
+        return _result_chunks(results)
  
-        return [
-            {
-                "text": doc,
-                "report_title": meta.get("report_title", "Unknown"),
-                "report_id": meta.get("report_id", ""),
-                "region": meta.get("region"),
-                "severity": meta.get("severity"),
-                "relevance_score": round(1 - dist, 4)
-            }
-            for doc, meta, dist in zip(
-                results["documents"][0],
-                results["metadatas"][0],
-                results["distances"][0]
-            )
-        ]
+    async def _exact_search(self, query_embeddings: list[list[float]], n_results: int,
+                            filters: dict, with_embeddings: bool = False) -> list[list[dict]]:
+        ids = await run_io(self.metadata_index.chunk_ids, filters)
+        results = await run_io(self.collection.query_ids, query_embeddings, ids, n_results,
+                               with_embeddings)
+        return _result_chunks(results)
+ 
+    async def _fuse(self, dense: list[list[dict]], lexical: list[list[tuple[str, float]]],
+                    query_embeddings: list[list[float]], n_results: int,
+                    with_embeddings: bool = False) -> tuple[list[list[dict]], list[dict]]:
+        """
+        Reciprocal rank fusion: score = Σ 1 / (k + rank) over both rankings.
+        Ranks, not raw scores, are combined, so cosine similarities and BM25
+        scores never need to be put on the same scale. relevance_score stays
+        the cosine similarity, also for chunks only BM25 found.
+        One list of rankings per query; chunks only BM25 found are fetched
+        in a single call for all queries. Also returns each query's fused
+        scores ({chunk_id: score}).
+        """
+        k = settings.hybrid_rrf_k
+        tops, scores = [], []
+        for dense_ranking, lexical_ranking in zip(dense, lexical):
+            fused: dict[str, float] = {}
+            for rank, chunk in enumerate(dense_ranking, 1):
+                fused[chunk["chunk_id"]] = fused.get(chunk["chunk_id"], 0.0) + 1 / (k + rank)
+            for rank, (chunk_id, _) in enumerate(lexical_ranking, 1):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1 / (k + rank)
+            tops.append(sorted(fused, key=fused.get, reverse=True)[:n_results])
+            scores.append(fused)
  
-    def list_reports(self) -> list[dict]:
-        return [{"report_id": rid, **meta} for rid, meta in self._report_registry.items()]
+        by_query = [{c["chunk_id"]: c for c in ranking} for ranking in dense]
+        missing = {chunk_id for top, by_id in zip(tops, by_query)
+                   for chunk_id in top if chunk_id not in by_id}
+        if missing:
+            found = await run_io(self.collection.get, ids=sorted(missing),
+                                 include=["documents", "metadatas", "embeddings"])
+            embeddings = np.asarray(found["embeddings"], dtype=np.float32)
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+            norms = np.outer(np.linalg.norm(queries, axis=1), np.linalg.norm(embeddings, axis=1))
+            sims = queries @ embeddings.T / np.where(norms == 0, 1.0, norms)
+            for q, (top, by_id) in enumerate(zip(tops, by_query)):
+                for j, (chunk_id, doc, meta) in enumerate(zip(found["ids"], found["documents"],
+                                                              found["metadatas"])):
+                    if chunk_id in top and chunk_id not in by_id:
+                        by_id[chunk_id] = _result_chunk(chunk_id, doc, meta, float(sims[q, j]))
+                        if with_embeddings:
+                            by_id[chunk_id]["embedding"] = embeddings[j]
+        return [[by_id[chunk_id] for chunk_id in top if chunk_id in by_id]
+                for top, by_id in zip(tops, by_query)], scores
+
+    async def _diversify(self, rankings: list[list[dict]], n_results: int, lambda_: float,
+                         max_per_report: int, fused: list[dict] = None) -> list[list[dict]]:
+        """
+        Re-pick n_results of each over-fetched ranking with MMR. Relevance
+        is the cosine similarity, or for fused rankings the RRF score
+        scaled to [0, 1] (so a BM25-only hit on a finding ID keeps its
+        rank). Candidate vectors come back with the search itself; the
+        "embedding" keys are dropped from every chunk before returning.
+        """
+        picked = []
+        for q, ranking in enumerate(rankings):
+            vectors = np.asarray([chunk.pop("embedding") for chunk in ranking], dtype=np.float32)
+            if fused is not None:
+                relevance = np.array([fused[q][c["chunk_id"]] for c in ranking], dtype=np.float32)
+                relevance /= relevance.max() if len(relevance) else 1.0
+            else:
+                relevance = np.array([c["relevance_score"] for c in ranking], dtype=np.float32)
+            order = mmr(relevance, vectors, n_results, lambda_,
+                        [c["report_id"] for c in ranking], max_per_report)
+            picked.append([ranking[i] for i in order])
+        return picked
  
-    def get_regions(self) -> list[str]:
+    async def list_reports(self, limit: int = None, offset: int = 0,
+                           **filters) -> tuple[list[dict], int]:
+        """Page of reports + total matches; filters: region, severity, audit_type, year."""
+        return await run_io(self.registry.list_page, limit, offset, **filters)
+ 
+    async def get_report(self, report_id: str) -> Optional[dict]:
+        return await run_io(self.registry.get, report_id)
+ 
+    async def get_regions(self) -> list[str]:
         """Return list of unique regions in the index."""
-        return list({
-            meta.get("region", "unknown")
-            for meta in self._report_registry.values()
-            if meta.get("region")
-        })
- 
-    def delete_report(self, report_id: str) -> bool:
-        if report_id not in self._report_registry:
+        return await run_io(self.registry.regions)
+ 
+    async def count_reports(self) -> int:
+        return await run_io(self.registry.count)
+ 
+    async def delete_report(self, report_id: str) -> bool:
+        if not await run_io(self.registry.get, report_id):
             return False
-        ids = self.collection.get(where={"report_id": report_id}, include=[])["ids"]
-        if ids:
-            self.collection.delete(ids=ids)
-        del self._report_registry[report_id]
+        found = await run_io(self.collection.get, where={"report_id": report_id}, include=[])
+        if found["ids"]:
+            await run_io(self.collection.delete, ids=found["ids"])
+            await run_io(self._update_lexical_index, delete=found["ids"])
+        await run_io(self.registry.delete, report_id)
+        await run_io(self.findings.delete_report, report_id)
+        self.generation += 1
         return True
  
-    @property
-    def total_chunks(self) -> int:
-        return self.collection.count()
+    async def count_chunks(self) -> int:
+        return await run_io(self.collection.count)
+ 
+    async def query_findings(self, **filters) -> tuple[list[dict], int]:
+        """Findings matching structured filters + total matches (see FindingsStore.query)."""
+        return await run_io(self.findings.query, **filters)
+ 
+    async def themes(self, min_reports: int = 1, limit: int = None) -> list[dict]:
+        """
+        Cross-report themes from the theme index (most reports first), each
+        with the text of its most central chunk, fetched in one call.
+        """
+        themes = [t for t in await run_io(self.theme_index.summary)
+                  if t["report_count"] >= min_reports][:limit]
+        ids = [t["representative_chunk_id"] for t in themes]
+        found = await run_io(self.collection.get, ids=ids, include=["documents"]) if ids else None
+        texts = dict(zip(found["ids"], found["documents"])) if found else {}
+        return [{**t, "representative_text": texts.get(t["representative_chunk_id"])}
+                for t in themes]
+ 
+ 
+def _report_findings(report: dict, metadatas: list[dict]) -> list[dict]:
+    """The extractor's finding records if the caller passed them, else the chunk tags'."""
+    if report.get("findings") is not None:
+        return report["findings"]
+    return findings_from_chunks(metadatas)
+ 
+ 
+def _result_chunks(results: dict) -> list[list[dict]]:
+    """query()-shaped result → one list of chunk dicts per query."""
+    rankings = [
+        [_result_chunk(chunk_id, doc, meta, 1 - dist)
+         for chunk_id, doc, meta, dist in zip(ids, documents, metadatas, distances)]
+        for ids, documents, metadatas, distances in zip(
+            results["ids"],
+            results["documents"],
+            results["metadatas"],
+            results["distances"]
+        )
+    ]
+    # Only asked for by diversity reranking, which removes them again
+    for ranking, embeddings in zip(rankings, results.get("embeddings") or []):
+        if embeddings is not None:
+            for chunk, embedding in zip(ranking, embeddings):
+                chunk["embedding"] = embedding
+    return rankings
+ 
+ 
+def _result_chunk(chunk_id: str, doc: str, meta: dict, similarity: float) -> dict:
+    return {
+        "chunk_id": chunk_id,
+        "text": doc,
+        "report_title": meta.get("report_title", "Unknown"),
+        "report_id": meta.get("report_id", ""),
+        "chunk_index": meta.get("chunk_index"),
+        "page_start": meta.get("page_start"),
+        "page_end": meta.get("page_end"),
+        "char_start": meta.get("char_start"),
+        "char_end": meta.get("char_end"),
+        "finding_id": meta.get("finding_id"),
+        "finding_severity": meta.get("finding_severity"),
+        "region": meta.get("region"),
+        "severity": meta.get("severity"),
+        "relevance_score": round(similarity, 4)
+    }
+ 
  
 audit_vector_store = AuditVectorStore()
@@ -0,0 +1,67 @@
+"""Shared test setup: keep test runs away from the real data directory and API."""
+from types import SimpleNamespace
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import pytest
+
+# Settings are read at import time, so this must run before any src import.
+os.environ.setdefault("CHROMA_PATH", tempfile.mkdtemp(prefix="audit_rag_test_"))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+FAKE_ANSWER = {"answer": "Two critical findings in APAC.",
+               "key_findings": ["Reconciliation delay"], "confidence": "high"}
+
+
+class FakeOpenAI:
+    """
+    In-process stand-in for AsyncOpenAI: deterministic 8-d embeddings and a
+    canned JSON chat answer. Records what was sent upstream.
+    """
+
+    def __init__(self):
+        self.embedded_texts = []
+        self.chat_calls = 0
+        self.latency = 0.0  # Seconds each call takes, for tests that need calls to overlap
+        self.embeddings = SimpleNamespace(create=self._embed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+
+    async def _embed(self, input, model, **kwargs):
+        batch = [input] if isinstance(input, str) else list(input)
+        self.embedded_texts.extend(batch)
+        await asyncio.sleep(self.latency)
+        tokens = sum(len(t) // 4 + 1 for t in batch)
+        return SimpleNamespace(data=[SimpleNamespace(
+            embedding=[b / 255 + 0.01 for b in hashlib.sha256(t.encode()).digest()[:8]]
+        ) for t in batch], usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
+
+    async def _chat(self, model, messages, stream=False, **kwargs):
+        self.chat_calls += 1
+        await asyncio.sleep(self.latency)
+        content = json.dumps(FAKE_ANSWER)
+        usage = SimpleNamespace(prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+                                completion_tokens=len(content) // 4)
+        if stream:
+            return self._stream(content, usage)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                               usage=usage)
+
+    @staticmethod
+    async def _stream(content: str, usage, step: int = 5):
+        for i in range(0, len(content), step):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i:i + step]))])
+        yield SimpleNamespace(choices=[], usage=usage)  # As with stream_options include_usage
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Point the embedding and LLM services at a FakeOpenAI (no embedding cache)."""
+    from src.embedding_service import embedding_service
+    from src.llm_service import llm_service
+    fake = FakeOpenAI()
+    monkeypatch.setattr(embedding_service, "client", fake)
+    monkeypatch.setattr(embedding_service, "cache", None)
+    monkeypatch.setattr(llm_service, "client", fake)
+    return fake
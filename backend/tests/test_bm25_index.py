@@ -0,0 +1,92 @@
+"""Tests for the array-backed BM25 inverted index."""
+import os
+from src.bm25_index import BM25Index, tokenize
+from src.index_files import IndexSaver
+
+
+def meta(region="APAC", severity="high", year=2024):
+    return {"region": region, "severity": severity, "year": year}
+
+
+def build(path=None):
+    index = BM25Index(path)
+    index.add(
+        ["a", "b", "c"],
+        ["Finding F-2024-017: reconciliation delay in Hong Kong.",
+         "Control CTRL-4821 failed the privileged access review.",
+         "Reconciliation backlog reviewed; see F-2023-002."],
+        [meta(), meta(region="EMEA"), meta(severity="critical", year=2023)]
+    )
+    return index
+
+
+def test_identifiers_are_indexed_whole_and_by_parts():
+    assert {"f-2024-017", "2024", "017"} <= set(tokenize("see F-2024-017"))
+
+
+def test_exact_identifier_ranks_first_and_filters_apply():
+    index = build()
+    assert index.search("F-2024-017")[0][0] == "a"
+    assert {c for c, _ in index.search("reconciliation")} == {"a", "c"}
+    assert [c for c, _ in index.search("reconciliation", filters={"severity": ["critical"]})] == ["c"]
+    assert index.search("reconciliation", filters={"region": ["LATAM"]}) == []
+    assert [c for c, _ in index.search("reconciliation", filters={"year": [2024]})] == ["a"]
+    assert [c for c, _ in index.search("reconciliation", filters={"year_max": 2023})] == ["c"]
+
+
+def test_delete_and_compaction_keep_results_consistent():
+    index = build()
+    index.delete(["a"])
+    assert index.search("F-2024-017") == []
+    index.add(["d"], ["Another F-2024-017 mention."], [meta()])
+    assert [c for c, _ in index.search("F-2024-017")] == ["d"]
+    assert len(index) == 3
+
+
+def test_tombstoned_chunks_do_not_skew_scores():
+    index = build()
+    index.add(["a"], ["Revised: the delay in Hong Kong was resolved."], [meta()])
+    fresh = BM25Index()
+    fresh.add(["b", "c", "a"],
+              ["Control CTRL-4821 failed the privileged access review.",
+               "Reconciliation backlog reviewed; see F-2023-002.",
+               "Revised: the delay in Hong Kong was resolved."],
+              [meta(region="EMEA"), meta(severity="critical", year=2023), meta()])
+    assert index.stats()["deleted_pending_compaction"] == 1
+    for query in ("reconciliation", "delay hong kong", "reviewed"):
+        assert index.search(query) == fresh.search(query)
+
+
+def test_save_and_reload_round_trip(tmp_path):
+    path = str(tmp_path / "bm25.npz")
+    index = build(path)
+    index.delete(["b"])
+    index.save()
+    reloaded = BM25Index(path)
+    assert len(reloaded) == 2
+    assert reloaded.search("CTRL-4821") == []
+    assert reloaded.search("F-2023-002") == index.search("F-2023-002")
+
+
+def test_one_long_token_does_not_inflate_the_file(tmp_path):
+    path = str(tmp_path / "bm25.npz")
+    index = build(path)
+    blob = "x" * 50_000  # A base64 image or URL pasted into a PDF
+    index.add(["blob"], [f"Attachment {blob} follows."], [meta()])
+    index.save()
+    assert os.path.getsize(path) < 100_000  # Fixed-width strings: 4 bytes x 50k x every term
+    assert BM25Index(path).search(blob)[0][0] == "blob"
+
+
+def test_saver_defers_writes_and_flags_an_interrupted_run(tmp_path):
+    path, marker = str(tmp_path / "bm25.npz"), str(tmp_path / "indexes.unsaved")
+    index = BM25Index(path)
+    saver = IndexSaver([index], marker, interval=60)
+    with saver.changing():
+        index.add(["a"], ["Finding F-2024-017."], [meta()])
+    assert not os.path.exists(path) and os.path.exists(marker)
+    assert IndexSaver([], marker).interrupted  # Died here: the next start rebuilds
+
+    saver.flush()
+    assert len(BM25Index(path)) == 1 and not os.path.exists(marker)
+    assert not IndexSaver([], marker).interrupted
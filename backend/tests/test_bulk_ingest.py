@@ -0,0 +1,89 @@
+"""Tests for bulk ingestion (process pool and vector store replaced)."""
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import io
+import zipfile
+from src import bulk_ingest as bi
+
+REPORT = b"Region: EMEA\nDate: June 1, 2025\n\n" + b"Control testing narrative. " * 30
+
+
+def make_zip(files: dict) -> io.BytesIO:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buf.seek(0)
+    return buf
+
+
+def test_iter_zip_reports_skips_unsupported_and_hidden_files():
+    archive = make_zip({"a/r1.txt": REPORT, "notes.docx": b"x",
+                        "__MACOSX/a/._r1.txt": b"x", "r2.pdf": b"%PDF"})
+    assert [name for name, _ in bi.iter_zip_reports(archive)] == ["a/r1.txt", "r2.pdf"]
+
+
+def test_same_named_files_in_different_folders_stay_apart(tmp_path, monkeypatch):
+    for folder in ("emea", "apac"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "q3.txt").write_bytes(REPORT + folder.encode())
+    assert [name for name, _ in bi.iter_directory_reports(str(tmp_path))] == \
+        ["apac/q3.txt", "emea/q3.txt"]
+
+    titles = []
+
+    async def fake_upsert_reports(reports, on_stage=None):
+        titles.extend(r["title"] for r in reports)
+        return [(f"id{i}", None) for i in range(len(reports))]
+
+    monkeypatch.setattr(bi, "get_cpu_pool", lambda: ThreadPoolExecutor(2))
+    monkeypatch.setattr(bi.audit_vector_store, "upsert_reports", fake_upsert_reports)
+    files = list(bi.iter_directory_reports(str(tmp_path))) + [("apac/q3.txt", REPORT)]
+
+    result = asyncio.run(bi.bulk_ingest(files))
+
+    assert sorted(titles) == ["apac/q3.txt", "emea/q3.txt"]
+    assert result.files_indexed == 2
+    assert [f.error for f in result.files if f.status == "failed"] == ["Duplicate path in the archive"]
+
+
+def test_bulk_ingest_coalesces_reports_into_batches(monkeypatch):
+    calls = []
+
+    async def fake_upsert_reports(reports, on_stage=None):
+        calls.append([r["title"] for r in reports])
+        return [(f"id{i}", None) for i in range(len(reports))]
+
+    monkeypatch.setattr(bi, "get_cpu_pool", lambda: ThreadPoolExecutor(2))
+    monkeypatch.setattr(bi.audit_vector_store, "upsert_reports", fake_upsert_reports)
+    files = [(f"r{i}.txt", REPORT) for i in range(5)] + [("empty.txt", b" ")]
+
+    result = asyncio.run(bi.bulk_ingest(files, batch_chunks=10_000))
+
+    assert len(calls) == 1 and sorted(calls[0]) == [f"r{i}.txt" for i in range(5)]
+    assert result.files_indexed == 5
+    assert result.files_failed == 1
+    failed = [f for f in result.files if f.status == "failed"]
+    assert failed[0].filename == "empty.txt" and "No text extracted" in failed[0].error
+    assert result.total_chunks == sum(f.chunks for f in result.files)
+
+
+def test_bulk_import_leaves_an_uploaded_report_of_the_same_name_alone(fake_openai, monkeypatch):
+    store = bi.audit_vector_store
+    monkeypatch.setattr(bi, "get_cpu_pool", lambda: ThreadPoolExecutor(2))
+    uploaded = b"Region: LATAM\nDate: May 2, 2025\n\n" + b"Uploaded branch narrative. " * 30
+    imported = b"Region: NORDICS\nDate: May 2, 2025\n\n" + b"Imported archive narrative. " * 30
+
+    async def scenario():
+        chunks, _ = bi.process_audit_report("bulk-collision.txt", uploaded)
+        upload_id, _ = await store.upsert_report("bulk-collision.txt", chunks, region="LATAM")
+        first = await bi.bulk_ingest([("bulk-collision.txt", imported), ("copy.txt", uploaded)])
+        again = await bi.bulk_ingest([("bulk-collision.txt", imported)])
+        return upload_id, first, again
+
+    upload_id, first, again = asyncio.run(scenario())
+    assert store.registry.get(upload_id)["region"] == "LATAM"
+    by_name = {f.filename: f.report_id for f in first.files}
+    assert by_name["bulk-collision.txt"] != upload_id
+    assert by_name["copy.txt"] == upload_id  # Same content as the upload: that report
+    assert again.files[0].report_id == by_name["bulk-collision.txt"]
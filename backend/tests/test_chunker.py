@@ -0,0 +1,53 @@
+"""Tests for the streaming chunker (offsets, pages, overlap)."""
+import asyncio
+from src.chunker import iter_chunks
+from src.document_processor import chunk_text
+from src.vector_store import audit_vector_store as store
+
+PAGES = [
+    "[Page 1]\nInternal Audit Report. Region: EMEA.\n\nShort note.",
+    "[Page 2]\n" + "Reconciliation breaks were not escalated. " * 40,
+    "[Page 3]\nManagement agrees and will remediate by Q3 2025.",
+]
+
+
+def test_streamed_blocks_match_whole_text_with_offsets():
+    text = "\n\n".join(PAGES)
+    chunks = list(iter_chunks(PAGES, min_size=100, max_size=500))
+    assert chunks == chunk_text(text, min_size=100, max_size=500)
+    for chunk in chunks:
+        assert text[chunk.start] == chunk[0] and text[chunk.end - 1] == chunk[-1]
+        assert chunk.start < chunk.end <= len(text)
+
+
+def test_chunks_know_their_pages():
+    chunks = list(iter_chunks(PAGES, min_size=100, max_size=500))
+    assert [(c.page_start, c.page_end) for c in chunks] == [(1, 1)] + [(2, 2)] * 4 + [(3, 3)]
+    short = list(iter_chunks(["[Page 1]\nCover.", "[Page 2]\nContents."], min_size=100))
+    assert len(short) == 1 and (short[0].page_start, short[0].page_end) == (1, 2)
+    assert chunk_text("No pages here, just text.")[0].location() == {"char_start": 0,
+                                                                      "char_end": 25}
+
+
+def test_overlap_repeats_the_tail_of_the_previous_chunk():
+    text = "\n\n".join(f"Paragraph {i} describes control gap number {i} in detail." for i in range(6))
+    plain = chunk_text(text, min_size=10, max_size=200)
+    overlapped = chunk_text(text, min_size=10, max_size=200, overlap=20)
+    assert overlapped[0] == plain[0]
+    for previous, chunk, base in zip(overlapped, overlapped[1:], plain[1:]):
+        assert chunk.endswith(base) and len(chunk) > len(base)
+        assert previous.endswith(chunk[:len(chunk) - len(base) - 1])
+        assert text[chunk.start:chunk.end].endswith(base)
+
+
+def test_locations_reach_chunk_metadata_and_search_results(fake_openai):
+    chunks = list(iter_chunks(PAGES, min_size=100, max_size=500))
+    report_id = asyncio.run(store.add_report("Paged.pdf", chunks, region="Chunker-Land"))
+    stored = store.collection.get(where={"report_id": report_id}, include=["metadatas"])
+    first = min(stored["metadatas"], key=lambda m: m["chunk_index"])
+    assert (first["page_start"], first["page_end"]) == (1, 1)
+    assert first["char_start"] == 0 and first["char_end"] == chunks[0].end
+
+    results = asyncio.run(store.search("reconciliation breaks escalated", n_results=3,
+                                       filter_region="Chunker-Land"))
+    assert all(r["page_start"] is not None for r in results)
@@ -0,0 +1,50 @@
+"""Tests for prompt context assembly: dedup, budget packing and merging."""
+from src.context_builder import ContextBuilder
+from src.tokenizer import count_tokens
+
+
+def chunk(title, index, text, report_id=None):
+    return {"report_title": title, "report_id": report_id or title, "chunk_index": index,
+            "text": text, "region": "APAC", "severity": "high", "relevance_score": 0.9}
+
+
+BOILERPLATE = ("Management has agreed to remediate all findings within ninety days of this report. "
+               "Progress will be tracked by Internal Audit and reported to the Audit Committee "
+               "each quarter until every action has been validated and closed, including the "
+               "evidence of operating effectiveness requested by the external auditor.")
+
+
+def test_near_duplicates_are_dropped_and_attributed():
+    builder = ContextBuilder(max_tokens=1000)
+    context = builder.build([chunk("A.txt", 0, BOILERPLATE),
+                             chunk("B.txt", 4, BOILERPLATE.replace("ninety", "90")),
+                             chunk("C.txt", 2, "Privileged access was not reviewed.")])
+    assert context.text.count("Management has agreed") == 1
+    assert "Also in: B.txt" in context.text
+    assert builder.stats()["duplicates_dropped"] == 1
+    assert context.tokens < context.naive_tokens
+
+
+def test_adjacent_chunks_of_a_report_are_merged_under_one_header():
+    builder = ContextBuilder(max_tokens=1000)
+    context = builder.build([chunk("A.txt", 3, "Finding F-1 continues here."),
+                             chunk("B.txt", 0, "Unrelated vendor finding."),
+                             chunk("A.txt", 2, "Finding F-1 starts here.")])
+    first, second = context.text.split("\n\n")
+    assert first.startswith("[Excerpt 1 — Report: A.txt")
+    assert first.endswith("Finding F-1 starts here.\nFinding F-1 continues here.")
+    assert second.startswith("[Excerpt 2 — Report: B.txt")
+    assert builder.stats()["chunks_merged"] == 1
+
+
+def test_budget_keeps_top_evidence_and_skips_what_does_not_fit():
+    long_text = "Reconciliation breaks were not investigated. " * 80
+    builder = ContextBuilder(max_tokens=60)
+    context = builder.build([chunk("Top.txt", 0, "Top finding: cash reconciliation delay."),
+                             chunk("Long.txt", 0, long_text),
+                             chunk("Small.txt", 0, "Small supporting note.")])
+    assert [c["report_title"] for c in context.chunks] == ["Top.txt", "Small.txt"]
+    assert count_tokens(context.text) <= 60
+
+    truncated = ContextBuilder(max_tokens=60).build([chunk("Long.txt", 0, long_text)])
+    assert truncated.chunks and count_tokens(truncated.text) <= 62
@@ -0,0 +1,45 @@
+"""Tests for the persistent embedding cache."""
+from src.embedding_cache import EmbeddingCache
+
+
+def test_cache_roundtrip(tmp_path):
+    """Stored vectors come back for the same model and text."""
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many("m", ["alpha", "beta"], [[1.0, 2.0], [3.0, 4.0]])
+    assert cache.get_many("m", ["beta", "gamma", "alpha"]) == [[3.0, 4.0], None, [1.0, 2.0]]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_key_includes_model_and_normalises_whitespace(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many("m1", ["Finding  1:\n critical"], [[0.5]])
+    assert cache.get_many("m1", ["Finding 1: critical"]) == [[0.5]]
+    assert cache.get_many("m2", ["Finding 1: critical"]) == [None]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put_many("m", ["a"], [[1.0]])
+    cache.put_many("m", ["b"], [[2.0]])
+    cache.get_many("m", ["a"])  # touch "a" so "b" is the LRU entry
+    cache.put_many("m", ["c"], [[3.0]])
+    assert cache.get_many("m", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    EmbeddingCache(path).put_many("m", ["text"], [[0.25]])
+    assert EmbeddingCache(path).get_many("m", ["text"]) == [[0.25]]
+
+
+def test_cache_counts_only_new_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path, max_entries=3)
+    cache.put_many("m", ["a", "b", "a"], [[1.0], [2.0], [1.0]])
+    cache.put_many("m", ["a"], [[1.0]])  # Already cached: touched, not added
+    assert cache.stats()["entries"] == 2
+    cache.put_many("m", ["c", "d"], [[3.0], [4.0]])
+    assert cache.stats()["entries"] == 3
+    assert cache.get_many("m", ["a", "b"]) == [[1.0], None]  # "b" was the LRU entry
+    assert EmbeddingCache(path).stats()["entries"] == 3
@@ -0,0 +1,97 @@
+"""Tests for embedding batching and rate-limit handling (no network)."""
+from types import SimpleNamespace
+import asyncio
+import httpx
+import pytest
+from pydantic import ValidationError
+from openai import RateLimitError
+from src import embedding_service as es
+from src.config import Settings
+from src.embedding_cache import EmbeddingCache
+
+
+class FakeEmbeddings:
+    """Deterministic stand-in for client.embeddings: vector = [len(text)]."""
+
+    def __init__(self, fail_first: int = 0):
+        self.calls = []
+        self.fail_first = fail_first
+
+    async def create(self, input, model, **options):
+        batch = [input] if isinstance(input, str) else list(input)
+        self.calls.append(batch)
+        self.options = options
+        if self.fail_first:
+            self.fail_first -= 1
+            request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+            response = httpx.Response(429, request=request, headers={"retry-after": "0"})
+            raise RateLimitError("rate limited", response=response, body=None)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(t))]) for t in batch])
+
+
+def make_service(monkeypatch, fake):
+    service = es.EmbeddingService()
+    service.cache = None
+    service.client = SimpleNamespace(embeddings=fake)
+    async def no_sleep(seconds):
+        pass
+    monkeypatch.setattr(es.asyncio, "sleep", no_sleep)
+    return service
+
+
+def test_pack_batches_respects_token_budget_and_order():
+    texts = ["x" * 400] * 5  # ~100 tokens each
+    batches = es.pack_batches(texts, max_tokens=250, max_items=100)
+    assert [i for b in batches for i in b] == list(range(5))
+    assert all(len(b) <= 2 for b in batches)
+
+
+def test_pack_batches_oversized_text_gets_own_batch():
+    batches = es.pack_batches(["a" * 4000, "b"], max_tokens=10, max_items=100)
+    assert batches == [[0], [1]]
+
+
+def test_embed_batch_preserves_order_across_concurrent_batches(monkeypatch):
+    fake = FakeEmbeddings()
+    service = make_service(monkeypatch, fake)
+    monkeypatch.setattr(es.settings, "embedding_batch_max_items", 3)
+    texts = ["a" * n for n in range(1, 11)]
+    assert asyncio.run(service.embed_batch(texts)) == [[float(n)] for n in range(1, 11)]
+    assert len(fake.calls) == 4
+
+
+def test_embed_batch_retries_after_rate_limit(monkeypatch):
+    fake = FakeEmbeddings(fail_first=1)
+    service = make_service(monkeypatch, fake)
+    service.limiter = es.AdaptiveConcurrency(4)
+    assert asyncio.run(service.embed_batch(["abc"])) == [[3.0]]
+    assert len(fake.calls) == 2
+    assert service.limiter.limit == 2  # Halved after the 429
+
+
+def test_repeated_texts_are_embedded_once(monkeypatch, tmp_path):
+    fake = FakeEmbeddings()
+    service = make_service(monkeypatch, fake)
+    texts = ["boilerplate", "a", "boilerplate", "bb", "a"]
+    assert asyncio.run(service.embed_batch(texts)) == [[11.0], [1.0], [11.0], [2.0], [1.0]]
+    assert fake.calls == [["boilerplate", "a", "bb"]]
+
+    service.cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    asyncio.run(service.embed_batch(texts))
+    fake.calls.clear()
+    assert asyncio.run(service.embed_batch(texts + ["ccc", "ccc"]))[-2:] == [[3.0], [3.0]]
+    assert fake.calls == [["ccc"]]  # Only the new text, once
+
+
+def test_at_least_one_attempt_is_configured():
+    with pytest.raises(ValidationError):
+        Settings(embedding_max_retries=0)
+
+
+def test_shortened_embeddings_are_requested_and_cached_apart(monkeypatch):
+    monkeypatch.setattr(es.settings, "embedding_dimensions", 512)
+    fake = FakeEmbeddings()
+    service = make_service(monkeypatch, fake)
+    asyncio.run(service.embed_text("abc"))
+    assert fake.options == {"dimensions": 512}
+    assert service.cache_key == f"{service.model}@512"
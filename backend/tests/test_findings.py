@@ -0,0 +1,115 @@
+"""Tests for the findings table and the LLM-free path for structured finding questions."""
+import asyncio
+from datetime import date
+from src.document_processor import process_audit_text
+from src.findings_store import FindingsStore
+from src.rag_service import audit_rag_service
+from src.structured_query import parse_findings_question
+from src.vector_store import audit_vector_store as store
+
+REPORT = """INTERNAL AUDIT REPORT
+Report Reference: IA-2025-Q3-LEM-001
+Date: September 30, 2025
+Region: Lemuria
+Audit Type: Treasury Controls
+Severity Classification: High
+
+FINDING 1: CRITICAL — SWEEP APPROVALS
+Finding Title: Treasury Sweeps Executed Without Dual Approval
+Severity: Critical
+Responsible Party: Treasury Operations — Mara Quint
+Deadline: February 15, 2026
+Description: """ + "Cash sweeps above the limit were executed by one operator. " * 12 + """
+
+FINDING 2: CRITICAL — BANK MANDATES
+Finding Title: Bank Mandates Not Updated After Leavers
+Severity: Critical
+Responsible Party: Treasury Operations — Jon Vell
+Deadline: April 30, 2026
+Description: """ + "Signatory lists at two banks still included departed staff. " * 12 + """
+
+FINDING 3: LOW — FILING
+Finding Title: Confirmations Filed Late
+Severity: Low
+Responsible Party: Back Office — Mara Quint
+Deadline: January 10, 2026
+Description: """ + "Counterparty confirmations were filed after the cut-off. " * 12
+
+
+def finding(n: int, severity: str, owner: str, deadline: str, region: str = None) -> dict:
+    return {"finding_id": f"R-F{n}", "title": f"Finding {n}", "severity": severity,
+            "owner": owner, "deadline": deadline, "region": region}
+
+
+def test_store_filters_orders_and_persists(tmp_path):
+    path = str(tmp_path / "findings.sqlite3")
+    findings = FindingsStore(path)
+    report = {"title": "R.txt", "region": "EMEA", "severity": "high", "audit_type": "IT", "year": 2025}
+    findings.replace_report("r1", report, [
+        finding(1, "critical", "IT Security — Priya Sharma", "2026-03-31", "London"),
+        finding(2, "critical", "Finance — Leo Park", "2026-01-15"),
+        finding(3, "low", "IT Security — Sam Ito", "end of year"),
+    ])
+    rows, total = findings.query(severity=["critical"], deadline_to="2026-02-28")
+    assert total == 1 and rows[0]["finding_id"] == "R-F2"
+    rows, total = findings.query(owner="it security", region=["emea"])
+    assert total == 2 and [r["finding_id"] for r in rows] == ["R-F1", "R-F3"]  # Undated last
+    assert findings.query(region=["London"])[1] == 1  # The finding's own region
+    assert findings.query(owner="sharma", severity=["Critical"])[1] == 1  # Any word of a part
+    assert findings.query(owner="curity")[1] == findings.query(severity=["urgent"])[1] == 0
+    assert findings.regions() == ["EMEA", "London"]
+
+    findings.replace_report("r1", report, [finding(4, "medium", "Ops", "2026-05-01")])
+    findings.replace_report("r2", dict(report, region="APAC"), [])
+    reopened = FindingsStore(path)
+    assert reopened.stats() == {"findings": 1, "reports": 2}
+    assert reopened.regions() == ["EMEA"]
+    reopened.delete_report("r1")
+    assert reopened.stats() == {"findings": 0, "reports": 1}
+
+
+def test_parser_routes_only_questions_the_table_answers_exactly():
+    today = date(2026, 1, 20)
+    query = parse_findings_question("Which critical findings have deadlines before March 2026?",
+                                    ["APAC", "EMEA"], today)
+    assert (query.severity, query.deadline_from, query.deadline_to) == (["critical"], None, "2026-02-28")
+    query = parse_findings_question("How many high-risk findings in APAC are due in Q4 2025?",
+                                    ["APAC", "EMEA"], today)
+    assert query.count_only and query.region == ["APAC"]
+    assert (query.deadline_from, query.deadline_to) == ("2025-10-01", "2025-12-31")
+    query = parse_findings_question("List overdue findings owned by Priya Sharma", [], today)
+    assert query.owner == "Priya Sharma" and query.deadline_to == "2026-01-19"
+
+    for question in ["Why do critical findings keep recurring?",
+                     "What was the root cause of the critical findings in APAC?",
+                     "Critical findings in 2025?",  # Report year or deadline? Let RAG read
+                     "Summarise the findings"]:
+        assert parse_findings_question(question, ["APAC"], today) is None, question
+
+
+def test_structured_questions_skip_retrieval_and_generation(fake_openai):
+    chunks, metadata = process_audit_text(REPORT)
+    asyncio.run(store.add_report("Lemuria Treasury Review.txt", chunks,
+                                 region=metadata["region"], severity=metadata["severity"],
+                                 year=metadata["year"], audit_type=metadata["audit_type"],
+                                 findings=metadata["findings"]))
+    question = "Which critical findings in Lemuria have deadlines before March 2026?"
+    embedded = len(fake_openai.embedded_texts)
+    answer = asyncio.run(audit_rag_service.answer_question(question))
+    assert answer.answered_from == "findings" and fake_openai.chat_calls == 0
+    assert len(fake_openai.embedded_texts) == embedded  # The question was never embedded
+    assert [s.finding_id for s in answer.sources] == ["IA-2025-Q3-LEM-001-F1"]
+    assert "Mara Quint" in answer.key_findings[0] and "2026-02-15" in answer.key_findings[0]
+
+    # Request filters narrow the table too; ones it can't express go to RAG
+    count = asyncio.run(audit_rag_service.answer_question(
+        "How many findings owned by Mara Quint are in Lemuria?", filter_year=2025))
+    assert count.answered_from == "findings" and count.answer.startswith("There are 2")
+
+    async def batch():
+        return dict([item async for item in audit_rag_service.answer_batch(
+            ["Critical Lemuria findings due by April 2026?", "Why were sweeps not approved?"],
+            n_results=2)])
+    answers = asyncio.run(batch())
+    assert answers[0].answered_from == "findings" and len(answers[0].sources) == 2
+    assert answers[1].answered_from is None and fake_openai.chat_calls == 1
@@ -0,0 +1,108 @@
+"""Tests for background ingestion jobs (Chroma/OpenAI replaced by fakes)."""
+import asyncio
+from src import ingestion_jobs as ij
+from src.models import JobStatus
+
+REPORT = (b"Region: APAC\nSeverity Classification: High\nDate: March 3, 2025\n\n"
+          + b"Finding text about reconciliation controls. " * 20)
+
+
+async def run_inline(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+
+def patch_pipeline(monkeypatch, gate: asyncio.Event = None):
+    async def fake_upsert_report(title, chunks, on_stage=None, **meta):
+        for stage in ("embed", "index"):
+            on_stage(stage)
+            if gate:
+                await gate.wait()
+        return "rep12345", None
+    monkeypatch.setattr(ij, "run_cpu", run_inline)
+    monkeypatch.setattr(ij.audit_vector_store, "upsert_report", fake_upsert_report)
+
+
+async def wait_for(manager, job_id):
+    while manager.get(job_id).status in (JobStatus.QUEUED, JobStatus.RUNNING):
+        await asyncio.sleep(0.01)
+    return manager.get(job_id)
+
+
+def test_job_runs_all_stages(monkeypatch):
+    patch_pipeline(monkeypatch)
+
+    async def scenario():
+        manager = ij.IngestionJobManager(workers=2)
+        job, deduplicated = manager.submit("report.txt", REPORT)
+        done = await wait_for(manager, job.job_id)
+        await manager.stop()
+        return deduplicated, done
+
+    deduplicated, done = asyncio.run(scenario())
+    assert not deduplicated
+    assert done.status == JobStatus.COMPLETED
+    assert done.progress == 1.0
+    assert set(done.stage_seconds) == set(ij.STAGES)
+    assert done.result.report_id == "rep12345"
+    assert done.result.extracted_metadata["region"] == "APAC"
+
+
+def test_identical_concurrent_uploads_share_a_job(monkeypatch):
+    gate = asyncio.Event()
+    patch_pipeline(monkeypatch, gate)
+
+    async def scenario():
+        manager = ij.IngestionJobManager(workers=2)
+        first, _ = manager.submit("report.txt", REPORT)
+        second, deduplicated = manager.submit("report.txt", REPORT)
+        gate.set()
+        await wait_for(manager, first.job_id)
+        await manager.stop()
+        return first, second, deduplicated
+
+    first, second, deduplicated = asyncio.run(scenario())
+    assert deduplicated
+    assert first.job_id == second.job_id
+
+
+def test_failed_job_reports_error(monkeypatch):
+    patch_pipeline(monkeypatch)
+
+    async def scenario():
+        manager = ij.IngestionJobManager(workers=1)
+        job, _ = manager.submit("empty.txt", b"   ")
+        done = await wait_for(manager, job.job_id)
+        await manager.stop()
+        return done
+
+    done = asyncio.run(scenario())
+    assert done.status == JobStatus.FAILED
+    assert "No text extracted" in done.error
+
+
+def test_spilled_pdf_is_streamed_and_its_temp_file_removed(monkeypatch, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from benchmarks.common import synthetic_pdf
+    from src.document_processor import process_audit_report
+    patch_pipeline(monkeypatch)
+    pool = ThreadPoolExecutor(2)
+    monkeypatch.setattr(ij, "get_cpu_pool", lambda: pool)
+    monkeypatch.setattr(ij.settings, "pdf_pages_per_task", 2)
+    content = synthetic_pdf(pages=7)
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(content)
+
+    async def scenario():
+        manager = ij.IngestionJobManager(workers=1)
+        job, _ = manager.submit("big.pdf", path=str(path), content_sha256="abc")
+        done = await wait_for(manager, job.job_id)
+        await manager.stop()
+        return done
+
+    done = asyncio.run(scenario())
+    pool.shutdown()
+    chunks, metadata = process_audit_report("big.pdf", content)
+    assert done.status == JobStatus.COMPLETED
+    assert done.result.chunks_created == len(chunks)
+    assert done.result.extracted_metadata == metadata
+    assert not path.exists()
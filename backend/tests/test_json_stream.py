@@ -0,0 +1,39 @@
+"""Tests for the incremental parser behind the streaming answer endpoint."""
+import json
+import pytest
+from src.json_stream import IncrementalAnswerParser
+
+DOCUMENT = "```json\n" + json.dumps({
+    "answer": 'Two "critical" findings \\ in Zürich\nsee below',
+    "key_findings": ["Delay, [reconciliation]", "Access é"],
+    "confidence": "high",
+    "reasoning": "answer-like text that must not stream"
+}) + "\n```"
+
+
+@pytest.mark.parametrize("step", [1, 2, 3, 7, len(DOCUMENT)])
+def test_answer_and_findings_survive_any_split(step):
+    parser = IncrementalAnswerParser()
+    events = []
+    for i in range(0, len(DOCUMENT), step):
+        events += parser.feed(DOCUMENT[i:i + step])
+    answer = "".join(text for kind, text in events if kind == "answer_delta")
+    findings = [text for kind, text in events if kind == "finding"]
+    assert answer == 'Two "critical" findings \\ in Zürich\nsee below'
+    assert findings == ["Delay, [reconciliation]", "Access é"]
+
+
+def test_findings_are_emitted_before_the_document_ends():
+    parser = IncrementalAnswerParser()
+    events = parser.feed('{"answer": "ok", "key_findings": ["first", "sec')
+    assert ("finding", "first") in events
+    assert ("finding", "sec") not in events
+
+
+def test_escaped_surrogate_pairs_stream_whole():
+    answer = "Risk 😀 rated é " * 20
+    document = json.dumps({"answer": answer})  # ASCII only: the emoji becomes a \\ud83d\\ude00 pair
+    parser = IncrementalAnswerParser()
+    deltas = [text for char in document for kind, text in parser.feed(char)]
+    assert "".join(deltas) == answer
+    assert not any("\ud800" <= c <= "\udfff" for delta in deltas for c in delta)
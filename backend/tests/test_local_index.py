@@ -0,0 +1,90 @@
+"""Tests for the in-process NumPy/memmap vector backend."""
+import numpy as np
+from src.local_index import LocalVectorIndex
+
+
+def populate(index, n=40, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"c{i}" for i in range(n)]
+    metas = [{"report_id": f"r{i % 4}", "region": ["APAC", "EMEA"][i % 2],
+              "severity": ["critical", "high", "low"][i % 3], "year": 2022 + i % 4,
+              "chunk_index": i} for i in range(n)]
+    index.add(ids=ids, embeddings=vectors, documents=[f"doc {i}" for i in ids], metadatas=metas)
+    return vectors, metas
+
+
+def test_exact_search_matches_brute_force(tmp_path):
+    index = LocalVectorIndex(str(tmp_path))
+    vectors, _ = populate(index)
+    query = vectors[3] + 0.01
+    result = index.query(query_embeddings=[query], n_results=5)
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = [f"c{i}" for i in np.argsort(-(normed @ (query / np.linalg.norm(query))))[:5]]
+    assert result["ids"][0] == expected
+    assert result["ids"][0][0] == "c3" and result["distances"][0][0] < 1e-3
+
+
+def test_prefilter_returns_full_page_of_matching_rows(tmp_path):
+    index = LocalVectorIndex(str(tmp_path))
+    vectors, metas = populate(index)
+    where = {"$and": [{"region": "APAC"}, {"year": {"$gte": 2024}},
+                      {"severity": {"$in": ["critical", "high"]}}]}
+    result = index.query(query_embeddings=[vectors[0]], n_results=100, where=where)
+    expected = {f"c{i}" for i, m in enumerate(metas) if m["region"] == "APAC"
+                and m["year"] >= 2024 and m["severity"] in ("critical", "high")}
+    assert set(result["ids"][0]) == expected
+    assert all(m["year"] >= 2024 for m in result["metadatas"][0])
+
+
+def test_delete_update_and_reload(tmp_path):
+    index = LocalVectorIndex(str(tmp_path))
+    vectors, _ = populate(index)
+    index.delete(where={"report_id": "r1"})
+    index.update(ids=["c0"], metadatas=[{"region": "LATAM"}])
+    assert index.count() == 30
+
+    reopened = LocalVectorIndex(str(tmp_path))
+    assert reopened.count() == 30
+    assert reopened.get(where={"report_id": "r1"})["ids"] == []
+    latam = reopened.get(where={"region": "LATAM"})
+    assert latam["ids"] == ["c0"] and latam["metadatas"][0]["report_id"] == "r0"
+    # A deleted row is recycled by the next insert
+    reopened.add(ids=["new"], embeddings=[vectors[1]], documents=["d"], metadatas=[{}])
+    assert reopened.count() == 31 and reopened._next_row == 40
+
+
+def test_ivf_search_finds_near_duplicates(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), ivf_lists=4, ivf_probes=1, ivf_min_rows=40)
+    vectors, _ = populate(index, n=400, dim=16)
+    assert index._centroids is not None
+    hits = sum(index.query(query_embeddings=[vectors[i]], n_results=1)["ids"][0] == [f"c{i}"]
+               for i in range(0, 400, 20))
+    assert hits == 20
+    # A filter too selective for the probed list falls back to exact search
+    result = index.query(query_embeddings=[vectors[0]], n_results=3, where={"chunk_index": 7})
+    assert result["ids"][0] == ["c7"]
+
+
+def test_compact_storage_rescores_to_full_precision_results(tmp_path):
+    exact = LocalVectorIndex(str(tmp_path / "f32"))
+    vectors, _ = populate(exact, n=400, dim=32)
+    queries = vectors[:20] + np.random.default_rng(1).normal(scale=0.3, size=(20, 32))
+    expected = exact.query(query_embeddings=queries, n_results=5)
+    for storage in ("float16", "int8"):
+        index = LocalVectorIndex(str(tmp_path / storage), storage=storage, rescore=4)
+        populate(index, n=400, dim=32)
+        result = index.query(query_embeddings=queries, n_results=5)
+        assert result["ids"] == expected["ids"]
+        # Final scores come from the float32 vectors, not the compact copy
+        assert np.allclose(result["distances"], expected["distances"], atol=1e-6)
+        assert index.stats()["storage"] == storage and index._codes.dtype == np.dtype(storage)
+
+
+def test_switching_storage_rebuilds_the_compact_matrix(tmp_path):
+    vectors, _ = populate(LocalVectorIndex(str(tmp_path)), n=100, dim=16)
+    reopened = LocalVectorIndex(str(tmp_path), storage="int8")
+    assert (tmp_path / "vectors.i8").exists() and reopened.count() == 100
+    assert reopened.query(query_embeddings=[vectors[42]], n_results=1)["ids"][0] == ["c42"]
+    filtered = reopened.query(query_embeddings=[vectors[42]], n_results=2, where={"region": "APAC"})
+    assert filtered["ids"][0][0] == "c42"
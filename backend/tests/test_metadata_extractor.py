@@ -0,0 +1,72 @@
+"""Tests for rule-based metadata extraction and per-finding records."""
+import asyncio
+from src.document_processor import process_audit_text
+from src.metadata_extractor import FieldRule, MetadataExtractor, REPORT_RULES
+from src.vector_store import audit_vector_store as store
+
+REPORT = """INTERNAL AUDIT REPORT
+Report Reference: IA-2025-Q4-TEST-001
+Date: December 15, 2025
+Region: Extractor-Land
+Audit Type: Payments Controls
+Severity Classification: High
+
+FINDING 1: CRITICAL — PAYMENT RELEASE
+Finding Title: Payments Released Without Second Approval
+Severity: Critical
+Responsible Party: Payments Operations — Ana Costa
+Deadline: January 31, 2026
+Description: """ + "Wire payments above the threshold were released by a single operator. " * 12 + """
+
+FINDING 2: LOW — REPORT FORMATTING
+Finding Title: Daily Exception Report Lacks Timestamps
+Severity: Low
+Responsible Party: Finance — Omar Haddad
+Deadline: 30/06/2026
+Description: """ + "The daily exception report omits generation timestamps. " * 12
+
+
+def test_report_fields_and_findings_in_one_pass():
+    metadata = MetadataExtractor().extract(REPORT)
+    assert {k: metadata[k] for k in ("region", "severity", "audit_type", "year", "reference")} == {
+        "region": "Extractor-Land", "severity": "high", "audit_type": "Payments Controls",
+        "year": 2025, "reference": "IA-2025-Q4-TEST-001"}
+
+    first, second = metadata["findings"]
+    assert first["finding_id"] == "IA-2025-Q4-TEST-001-F1"
+    assert (first["severity"], first["owner"], first["deadline"]) == (
+        "critical", "Payments Operations — Ana Costa", "2026-01-31")
+    assert (second["severity"], second["deadline"]) == ("low", "2026-06-30")
+    assert REPORT[first["char_start"]:].startswith("FINDING 1")
+    assert first["char_end"] < second["char_start"] and second["char_end"] == len(REPORT.rstrip())
+
+
+def test_block_by_block_matches_whole_text():
+    for scan_chars in (0, 100, 4000):  # The header window ends before, inside, after block 2
+        extractor = MetadataExtractor(scan_chars=scan_chars)
+        extraction = extractor.stream()
+        for block in REPORT.split("\n\n"):
+            extraction.feed(block)
+        assert extraction.finish() == extractor.extract(REPORT)
+
+
+def test_header_scope_and_custom_rules():
+    late = "Audit Type: Payments\n" + "Filler line.\n" * 500 + "Region: Too-Late\nOwner Unit: Treasury"
+    rules = REPORT_RULES + (FieldRule("owner_unit", r"Owner Unit:\s*([^\n]+)"),)
+    assert MetadataExtractor(scan_chars=100).extract(late)["region"] is None
+    whole = MetadataExtractor(report_rules=rules, scan_chars=0).extract(late)
+    assert (whole["region"], whole["owner_unit"]) == ("Too-Late", "Treasury")
+
+
+def test_chunks_carry_their_finding_and_filter_by_it(fake_openai):
+    chunks, metadata = process_audit_text(REPORT)
+    tagged = [c.tags for c in chunks if c.tags]
+    assert {t["finding_id"] for t in tagged} == {"IA-2025-Q4-TEST-001-F1", "IA-2025-Q4-TEST-001-F2"}
+
+    asyncio.run(store.add_report("Findings.txt", chunks, region=metadata["region"],
+                                 severity=metadata["severity"], year=metadata["year"]))
+    results = asyncio.run(store.search("payments released", n_results=10,
+                                       filter_region="Extractor-Land",
+                                       filter_finding_severity="critical"))
+    assert results and all(r["finding_severity"] == "critical" for r in results)
+    assert {r["finding_id"] for r in results} == {"IA-2025-Q4-TEST-001-F1"}
@@ -0,0 +1,47 @@
+"""Tests for the metadata bitmap index and filter normalisation."""
+from src.metadata_index import MetadataIndex, normalize_filters, to_where
+
+ROWS = {
+    "a": {"region": "APAC", "severity": "high", "audit_type": "IT", "year": 2023},
+    "b": {"region": "EMEA", "severity": "critical", "audit_type": "IT", "year": 2024},
+    "c": {"region": "APAC", "severity": "low", "audit_type": "AML", "year": 2025},
+    "d": {"region": "APAC", "severity": "critical", "audit_type": "AML", "year": 2024},
+}
+
+
+def build(path=None):
+    index = MetadataIndex(path)
+    index.add(list(ROWS), list(ROWS.values()))
+    return index
+
+
+def test_normalize_filters_and_where_clause():
+    filters = normalize_filters(region="APAC", severity=["high", "critical", ""], year_min=2024)
+    assert filters == {"region": ["APAC"], "severity": ["critical", "high"], "year_min": 2024}
+    assert to_where(filters) == {"$and": [{"region": "APAC"},
+                                          {"severity": {"$in": ["critical", "high"]}},
+                                          {"year": {"$gte": 2024}}]}
+    assert normalize_filters(region="", year=None) == {} and to_where({}) is None
+
+
+def test_intersections_multi_value_and_ranges():
+    index = build()
+    assert index.chunk_ids(normalize_filters(region="APAC", severity=["critical", "high"])) == ["a", "d"]
+    assert index.chunk_ids(normalize_filters(year_min=2024, year_max=2024)) == ["b", "d"]
+    assert index.chunk_ids(normalize_filters(year=[2023, 2025], year_min=2024)) == ["c"]
+    assert index.count(normalize_filters(region="LATAM")) == 0
+    assert index.count({}) == 4
+
+
+def test_updates_deletes_and_reload(tmp_path):
+    path = str(tmp_path / "meta.npz")
+    index = build(path)
+    index.delete(["a"])
+    index.update(["c"], [{**ROWS["c"], "region": "EMEA"}])
+    index.add(["e"], [{"region": "LATAM", "year": 2024}])  # Reuses a's row
+    index.save()
+    for idx in (index, MetadataIndex(path)):
+        assert idx.chunk_ids(normalize_filters(region="APAC")) == ["d"]
+        assert idx.chunk_ids(normalize_filters(region="EMEA")) == ["b", "c"]
+        assert idx.chunk_ids(normalize_filters(region="LATAM")) == ["e"]
+        assert len(idx) == 4
@@ -0,0 +1,78 @@
+"""Tests for stage timings, OpenAI usage accounting and the /metrics output."""
+import asyncio
+from src import metrics
+from src.config import settings
+from src.document_processor import process_audit_text
+from src.rag_service import audit_rag_service
+from src.vector_store import audit_vector_store as store
+
+REPORT = """INTERNAL AUDIT REPORT
+Region: Metrics-Land
+Severity Classification: Medium
+Audit Type: Treasury
+
+Cash forecasts were not reviewed before month-end sweeps were executed.
+"""
+
+
+def test_render_prometheus_text_format():
+    latency = metrics.Histogram("test_latency_seconds", "Test latency", ("path",), buckets=(0.1, 1.0))
+    latency.observe(0.05, path='/a"b')
+    latency.observe(0.5, path='/a"b')
+    calls = metrics.Counter("test_calls_total", "Test calls")
+    calls.inc(3)
+
+    assert latency.render().splitlines() == [
+        "# HELP test_latency_seconds Test latency",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{path="/a\\"b",le="0.1"} 1',
+        'test_latency_seconds_bucket{path="/a\\"b",le="1.0"} 2',
+        'test_latency_seconds_bucket{path="/a\\"b",le="+Inf"} 2',
+        'test_latency_seconds_sum{path="/a\\"b"} 0.55',
+        'test_latency_seconds_count{path="/a\\"b"} 2',
+    ]
+    assert calls.render().splitlines()[-1] == "test_calls_total 3.0"
+
+
+def _index_report(title: str):
+    chunks, metadata = process_audit_text(REPORT)
+    asyncio.run(store.add_report(title, chunks, region="Metrics-Land",
+                                 severity=metadata["severity"], year=metadata["year"]))
+
+
+def test_answer_records_stage_timings_and_token_cost(fake_openai):
+    _index_report("Metrics.txt")
+    model = settings.openai_model
+    tokens_before = metrics.OPENAI_TOKENS.value(operation="chat", model=model, kind="prompt")
+    cost_before = metrics.OPENAI_COST.value(operation="chat", model=model)
+
+    async def ask():
+        with metrics.trace() as timings:
+            await audit_rag_service.answer_question("Were the metrics-land cash forecasts reviewed?",
+                                                    filter_region="Metrics-Land")
+        return timings
+
+    timings = asyncio.run(ask())
+    assert {"embed", "retrieve", "prompt", "generate", "parse"} <= set(timings)
+    assert all(ms >= 0 for ms in timings.values())
+    assert metrics.STAGE_SECONDS.count(pipeline="query", stage="generate") >= 1
+    assert metrics.STAGE_SECONDS.count(pipeline="ingest", stage="embed") >= 1
+    assert metrics.OPENAI_TOKENS.value(operation="chat", model=model, kind="prompt") > tokens_before
+    assert metrics.OPENAI_COST.value(operation="chat", model=model) > cost_before
+
+    assert 'audit_stage_seconds_count{pipeline="query",stage="retrieve"}' in metrics.render()
+
+
+def test_streamed_answer_counts_usage(fake_openai):
+    _index_report("Metrics-Stream.txt")
+    model = settings.openai_model
+    before = metrics.OPENAI_TOKENS.value(operation="chat_stream", model=model, kind="completion")
+
+    async def consume():
+        async for _ in audit_rag_service.answer_question_stream(
+                "Which metrics-land sweeps ran unreviewed?", filter_region="Metrics-Land"):
+            pass
+
+    asyncio.run(consume())
+    assert metrics.OPENAI_TOKENS.value(operation="chat_stream", model=model, kind="completion") > before
+    assert metrics.STAGE_SECONDS.count(pipeline="query", stage="first_token") >= 1
@@ -0,0 +1,39 @@
+"""Tests for MMR diversity reranking."""
+import asyncio
+import numpy as np
+from src.mmr import mmr
+from src.vector_store import audit_vector_store as store
+
+
+def test_near_duplicates_give_way_to_a_different_chunk():
+    vectors = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]])
+    relevance = np.array([0.95, 0.94, 0.6])
+    assert mmr(relevance, vectors, 2, lambda_=1.0) == [0, 1]
+    assert mmr(relevance, vectors, 2, lambda_=0.5) == [0, 2]
+    assert mmr(relevance, vectors, 5, lambda_=0.5) == [0, 2, 1]
+
+
+def test_report_cap_only_gives_way_when_no_other_report_is_left():
+    vectors = np.eye(4)
+    relevance = np.array([0.9, 0.8, 0.7, 0.1])
+    groups = ["a", "a", "a", "b"]
+    assert mmr(relevance, vectors, 2, 1.0, groups, max_per_group=1) == [0, 3]
+    assert mmr(relevance, vectors, 4, 1.0, groups, max_per_group=1) == [0, 3, 1, 2]
+
+
+def test_search_caps_results_per_report(fake_openai):
+    async def scenario():
+        await store.add_report("Mmr_A.txt", [f"Mmr vendor onboarding gap {i}." for i in range(4)],
+                               region="Mmrland")
+        await store.add_report("Mmr_B.txt", ["Mmr vendor onboarding gap elsewhere."],
+                               region="Mmrland")
+        plain = await store.search("Mmr vendor onboarding", n_results=4, mode="dense",
+                                   filter_region="Mmrland", mmr_lambda=1.0, max_per_report=0)
+        capped = await store.search("Mmr vendor onboarding", n_results=2, mode="dense",
+                                    filter_region="Mmrland", max_per_report=1)
+        return plain, capped
+
+    plain, capped = asyncio.run(scenario())
+    scores = [c["relevance_score"] for c in plain]
+    assert scores == sorted(scores, reverse=True)
+    assert {c["report_title"] for c in capped} == {"Mmr_A.txt", "Mmr_B.txt"}
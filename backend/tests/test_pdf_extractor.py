@@ -0,0 +1,46 @@
+"""Tests for streaming, page-parallel PDF extraction."""
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import synthetic_pdf
+from src.document_processor import extract_text_from_pdf, process_audit_pdf, process_audit_report
+from src.pdf_extractor import iter_pdf_pages, spill_upload
+
+
+def test_pages_come_back_in_order_and_match_in_memory_extraction(tmp_path):
+    content = synthetic_pdf(pages=11)
+    path = tmp_path / "report.pdf"
+    path.write_bytes(content)
+
+    with ThreadPoolExecutor(4) as pool:
+        pages = list(iter_pdf_pages(str(path), pool, pages_per_task=3, max_in_flight=2))
+        chunks, metadata = process_audit_pdf(str(path), pool, pages_per_task=3)
+        # Workers keep their parsed reader, not the file: it can be removed right away
+        assert str(path) not in open_files()
+
+    assert [n for n, _ in pages] == list(range(1, 12))
+    assert "\n\n".join(f"[Page {n}]\n{t}" for n, t in pages) == extract_text_from_pdf(content)
+    assert (chunks, metadata) == process_audit_report("report.pdf", content)
+    assert metadata["region"] == "APAC" and metadata["year"] == 2025
+
+
+def test_spill_upload_copies_and_hashes_the_stream(tmp_path):
+    content = synthetic_pdf(pages=2)
+    path, sha256 = spill_upload(io.BytesIO(content), str(tmp_path))
+    with open(path, "rb") as f:
+        assert f.read() == content
+    assert sha256 == hashlib.sha256(content).hexdigest()
+
+
+def open_files() -> set:
+    fd_dir = "/proc/self/fd"
+    if not os.path.isdir(fd_dir):
+        return set()
+    paths = set()
+    for fd in os.listdir(fd_dir):
+        try:
+            paths.add(os.readlink(os.path.join(fd_dir, fd)))
+        except OSError:
+            pass
+    return paths
@@ -0,0 +1,43 @@
+"""Tests for the TTL/LRU query cache and its generation-based invalidation."""
+from src import query_cache
+from src.query_cache import QueryCache, make_key
+
+
+def test_get_returns_copies_of_stored_values():
+    cache = QueryCache("t")
+    cache.set("k", [{"text": "a"}], generation=0)
+    value = cache.get("k", generation=0)
+    value[0]["text"] = "mutated"
+    assert cache.get("k", generation=0) == [{"text": "a"}]
+
+
+def test_new_generation_invalidates_everything():
+    cache = QueryCache("t")
+    cache.set("k", 1, generation=0)
+    assert cache.get("k", generation=1) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_value_computed_against_old_generation_is_discarded():
+    cache = QueryCache("t")
+    cache.get("k", generation=2)  # Cache has already seen generation 2
+    cache.set("k", "stale", generation=1)
+    assert cache.get("k", generation=2) is None
+
+
+def test_ttl_and_lru_bounds(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = QueryCache("t", max_entries=2, ttl_seconds=10)
+    cache.set("a", 1, 0)
+    cache.set("b", 2, 0)
+    cache.get("a", 0)
+    cache.set("c", 3, 0)  # Evicts "b", the least recently used
+    assert cache.get("b", 0) is None and cache.get("a", 0) == 1
+    now[0] += 11
+    assert cache.get("a", 0) is None
+
+
+def test_make_key_is_order_insensitive_for_dicts():
+    assert make_key([0.1, 0.2], {"region": "APAC", "year": 2025}, 5) == \
+        make_key([0.1, 0.2], {"year": 2025, "region": "APAC"}, 5)
@@ -0,0 +1,105 @@
+"""Tests for the RAG answer path with OpenAI replaced by in-process fakes."""
+import asyncio
+from src.rag_service import audit_rag_service
+from src.vector_store import audit_vector_store
+
+
+def test_repeated_question_is_served_from_answer_cache(fake_openai):
+    async def scenario():
+        await audit_vector_store.add_report(
+            "Cache_Test.txt", ["FINDING 1: Critical reconciliation delay in Hong Kong."] * 2,
+            region="APAC")
+        first = await audit_rag_service.answer_question("Critical APAC findings?")
+        second = await audit_rag_service.answer_question("Critical APAC findings?")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert fake_openai.chat_calls == 1
+    assert not first.cached and second.cached
+    assert second.answer == first.answer
+
+
+def test_index_change_invalidates_cached_answers(fake_openai):
+    async def scenario():
+        await audit_vector_store.add_report("Invalidate_A.txt", ["Access review gaps in Singapore."])
+        await audit_rag_service.answer_question("Access review gaps?")
+        await audit_vector_store.add_report("Invalidate_B.txt", ["Unrelated AML narrative."])
+        return await audit_rag_service.answer_question("Access review gaps?")
+
+    answer = asyncio.run(scenario())
+    assert not answer.cached
+    assert fake_openai.chat_calls == 2
+
+
+def test_rephrased_question_reuses_semantic_cache(fake_openai, monkeypatch):
+    monkeypatch.setattr(audit_rag_service.semantic_cache, "threshold", -1.0)
+
+    async def scenario():
+        await audit_vector_store.add_report("Semantic_Test.txt", ["Vendor onboarding gaps in EMEA."])
+        await audit_rag_service.answer_question("Vendor onboarding gaps?")
+        return await audit_rag_service.answer_question("Gaps in onboarding of vendors?")
+
+    answer = asyncio.run(scenario())
+    assert fake_openai.chat_calls == 1
+    assert answer.cached and answer.matched_question == "Vendor onboarding gaps?"
+    assert answer.question == "Gaps in onboarding of vendors?"
+
+
+def test_stream_sends_sources_first_and_matches_buffered_answer(fake_openai):
+    async def scenario():
+        await audit_vector_store.add_report("Stream_Test.txt", ["Privileged access not reviewed in LATAM."])
+        return [event async for event in audit_rag_service.answer_question_stream(
+            "Privileged access reviews?")]
+
+    events = asyncio.run(scenario())
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "sources" and kinds[-1] == "done"
+    streamed = "".join(data["text"] for kind, data in events if kind == "answer_delta")
+    assert streamed == events[-1][1]["answer"] == "Two critical findings in APAC."
+    assert [data["text"] for kind, data in events if kind == "finding"] == ["Reconciliation delay"]
+
+
+def test_batch_answers_every_question_with_one_call_per_distinct_prompt(fake_openai, monkeypatch):
+    monkeypatch.setattr(audit_rag_service, "semantic_cache", None)
+    questions = ["Batch payroll overrides?", "Batch vendor master changes?",
+                 "Batch payroll overrides?"]
+
+    async def scenario():
+        await audit_vector_store.add_report(
+            "Batch_Test.txt", ["Payroll overrides approved by the requester in Tokyo.",
+                               "Vendor master changes lack a second approver."])
+        return [item async for item in audit_rag_service.answer_batch(questions, n_results=2)]
+
+    results = dict(asyncio.run(scenario()))
+    assert sorted(results) == [0, 1, 2]
+    assert fake_openai.chat_calls == 2
+    assert results[0].answer == results[2].answer == "Two critical findings in APAC."
+    assert fake_openai.embedded_texts[-2:] == questions[:2]  # The repeat is embedded once
+
+
+def test_no_matching_reports_answers_without_calling_gpt(fake_openai):
+    answer = asyncio.run(audit_rag_service.answer_question(
+        "Any findings?", filter_region="Region-With-No-Reports"))
+    assert fake_openai.chat_calls == 0
+    assert answer.sources == [] and answer.reports_searched == 0
+
+
+def test_unparseable_reply_falls_back_to_raw_text(fake_openai, monkeypatch):
+    from src.llm_service import llm_service
+
+    async def prose(**kwargs):
+        return "Treasury sweeps ran without review."
+    monkeypatch.setattr(llm_service, "generate", prose)
+
+    async def scenario():
+        await audit_vector_store.add_report("Raw_Reply.txt", ["Treasury sweeps were not reviewed."],
+                                            region="Raw-Reply-Land", severity="high", year=2024)
+        return await audit_rag_service.answer_question("Treasury sweeps?",
+                                                       filter_region="Raw-Reply-Land")
+
+    answer = asyncio.run(scenario())
+    assert answer.answer == "Treasury sweeps ran without review."
+    assert answer.confidence == "medium" and answer.key_findings == []
+    source, = answer.sources
+    assert (source.report_title, source.region, source.severity) == ("Raw_Reply.txt",
+                                                                     "Raw-Reply-Land", "high")
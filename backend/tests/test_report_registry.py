@@ -0,0 +1,36 @@
+"""Tests for the durable SQLite report registry."""
+from src.report_registry import ReportRegistry
+
+
+def make_registry(tmp_path):
+    registry = ReportRegistry(str(tmp_path / "registry.sqlite3"))
+    registry.upsert("r1", title="APAC Trade.txt", chunks=10, uploaded_at="2025-01-01",
+                    region="APAC", severity="critical", year=2025)
+    registry.upsert("r2", title="AML Review.txt", chunks=5, uploaded_at="2025-02-01",
+                    region="EMEA", severity="high", year=2025)
+    registry.upsert("r3", title="Ops Risk.txt", chunks=7, uploaded_at="2024-06-01",
+                    region="APAC", severity="medium", year=2024)
+    return registry
+
+
+def test_list_is_paginated_and_filtered(tmp_path):
+    registry = make_registry(tmp_path)
+    page, total = registry.list_page(limit=2, offset=0)
+    assert total == 3
+    assert [r["report_id"] for r in page] == ["r2", "r1"]  # Newest first
+    apac, total = registry.list_page(region="APAC", year=2025)
+    assert total == 1 and apac[0]["report_id"] == "r1"
+
+
+def test_regions_and_totals(tmp_path):
+    registry = make_registry(tmp_path)
+    assert registry.regions() == ["APAC", "EMEA"]
+    assert registry.total_chunks() == 22
+    assert registry.count() == 3
+
+
+def test_registry_survives_reopen(tmp_path):
+    make_registry(tmp_path)
+    reopened = ReportRegistry(str(tmp_path / "registry.sqlite3"))
+    assert reopened.get("r2")["title"] == "AML Review.txt"
+    assert reopened.delete("r2") and reopened.get("r2") is None
@@ -0,0 +1,38 @@
+"""Tests for the near-duplicate question cache."""
+from src.semantic_cache import SemanticAnswerCache
+
+
+def test_similar_question_with_same_filters_hits():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.lookup("q", [1.0, 0.0], "f", generation=0)
+    cache.add([1.0, 0.0], "f", "Critical APAC findings?", {"answer": "x"}, generation=0)
+    hit = cache.lookup("APAC critical issues?", [0.99, 0.05], "f", generation=0)
+    assert hit == ({"answer": "x"}, "Critical APAC findings?")
+    assert cache.stats()["recent_hits"][0]["question"] == "APAC critical issues?"
+
+
+def test_below_threshold_or_other_filters_misses():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.lookup("q", [1.0, 0.0], "f", generation=0)
+    cache.add([1.0, 0.0], "f", "q", "a", generation=0)
+    assert cache.lookup("other", [0.6, 0.8], "f", generation=0) is None
+    assert cache.lookup("q", [1.0, 0.0], "other-filters", generation=0) is None
+
+
+def test_generation_change_empties_cache_and_drops_stale_adds():
+    cache = SemanticAnswerCache()
+    cache.lookup("q", [1.0, 0.0], "f", generation=0)
+    cache.add([1.0, 0.0], "f", "q", "a", generation=0)
+    assert cache.lookup("q", [1.0, 0.0], "f", generation=1) is None
+    cache.add([1.0, 0.0], "f", "q", "stale", generation=0)
+    assert cache.stats()["entries"] == 0
+
+
+def test_ring_overwrites_oldest_entry():
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.lookup("q", [1.0, 0.0, 0.0], "f", generation=0)
+    for i, vector in enumerate(([1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])):
+        cache.add(vector, "f", f"q{i}", f"a{i}", generation=0)
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("q", [1.0, 0.0, 0.0], "f", generation=0) is None
+    assert cache.lookup("q", [0.0, 0.0, 1.0], "f", generation=0)[0] == "a2"
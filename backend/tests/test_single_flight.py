@@ -0,0 +1,91 @@
+"""Tests for coalescing concurrent identical upstream calls."""
+import asyncio
+from src.embedding_service import embedding_service
+from src.rag_service import audit_rag_service
+from src.single_flight import SingleFlight
+from src.vector_store import audit_vector_store
+
+
+def test_concurrent_callers_share_one_call_and_nothing_is_kept():
+    flight, started = SingleFlight("test"), []
+
+    async def call():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def scenario():
+        first = await asyncio.gather(*(flight.do("same", call) for _ in range(5)))
+        second = await flight.do("same", call)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert len(started) == 2  # One for the burst, one afterwards
+    assert all(r is first[0] for r in first) and second == ["result"]
+    assert flight.stats() == {"enabled": True, "calls": 2, "coalesced": 4, "in_flight": 0,
+                              "coalesced_rate": 0.6667}
+
+
+def test_errors_are_shared_and_cancellation_only_stops_an_abandoned_call():
+    flight = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        errors = await asyncio.gather(*(flight.do("f", failing) for _ in range(3)),
+                                      return_exceptions=True)
+        impatient = asyncio.ensure_future(flight.do("s", slow))
+        patient = asyncio.ensure_future(flight.do("s", slow))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        result = await patient
+        lonely = asyncio.ensure_future(flight.do("l", slow))
+        await asyncio.sleep(0)
+        task = flight._flights["l"][0]
+        lonely.cancel()
+        await asyncio.sleep(0)
+        return errors, result, task
+
+    errors, result, task = asyncio.run(scenario())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert result == "done"
+    assert task.cancelled()
+
+
+def test_burst_of_identical_questions_reaches_openai_once(fake_openai):
+    fake_openai.latency = 0.05
+    before = embedding_service.in_flight.coalesced
+    question = "Which single-flight treasury controls failed?"
+
+    async def scenario():
+        await audit_vector_store.add_report("Single_Flight.txt",
+                                            ["Treasury controls failed in the single-flight unit."],
+                                            region="Single-Flight-Land")
+        return await asyncio.gather(*(audit_rag_service.answer_question(
+            question, filter_region="Single-Flight-Land") for _ in range(5)))
+
+    answers = asyncio.run(scenario())
+    assert fake_openai.chat_calls == 1
+    assert fake_openai.embedded_texts.count(question) == 1
+    assert embedding_service.in_flight.coalesced - before == 4
+    assert len({a.answer for a in answers}) == 1
+
+
+def test_disabled_passes_every_call_through():
+    flight, started = SingleFlight("test", enabled=False), []
+
+    async def call():
+        started.append(1)
+        await asyncio.sleep(0)
+
+    async def scenario():
+        await asyncio.gather(*(flight.do("same", call) for _ in range(3)))
+
+    asyncio.run(scenario())
+    assert len(started) == 3 and flight.stats()["coalesced"] == 0
@@ -0,0 +1,64 @@
+"""Tests for ingest-time theme clustering."""
+import asyncio
+import numpy as np
+from src.theme_index import ThemeIndex
+from src.vector_store import audit_vector_store as store
+
+
+def clustered(n_per_theme: int, dim: int = 16, themes: int = 3, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = np.eye(dim)[:themes]
+    labels = np.repeat(np.arange(themes), n_per_theme)
+    return centers[labels] + 0.05 * rng.normal(size=(len(labels), dim)), labels
+
+
+def meta(report: int, region: str, severity: str = "high") -> dict:
+    return {"report_id": f"r{report}", "report_title": f"Report {report}.txt",
+            "region": region, "severity": "low", "finding_severity": severity}
+
+
+def test_batches_cluster_incrementally_and_survive_a_restart(tmp_path):
+    path = str(tmp_path / "themes.npz")
+    index = ThemeIndex(path, n_themes=3)
+    vectors, labels = clustered(20)
+    order = np.random.default_rng(1).permutation(len(labels))
+    ids = [f"c{i}" for i in range(len(labels))]
+    for batch in np.array_split(order, 6):  # Six ingest batches, themes mixed
+        # One report per true cluster: a pure theme holds exactly one report
+        index.add([ids[i] for i in batch], vectors[batch],
+                  [meta(int(labels[i]), ["APAC", "EMEA"][i % 2]) for i in batch])
+    index.save()
+
+    summary = ThemeIndex(path, n_themes=3).summary()
+    assert [t["chunks"] for t in summary] == [20, 20, 20]
+    assert sorted(t["reports"][0]["title"] for t in summary) == [
+        "Report 0.txt", "Report 1.txt", "Report 2.txt"]
+    assert all(t["report_count"] == 1 and t["regions"] == {"APAC": 10, "EMEA": 10}
+               and t["severities"] == {"high": 20} for t in summary)
+
+
+def test_updates_and_deletes_show_up_in_the_summary():
+    index = ThemeIndex(n_themes=2)
+    vectors, _ = clustered(3, themes=2)
+    ids = [f"c{i}" for i in range(6)]
+    index.add(ids, vectors, [meta(i, "APAC") for i in range(6)])
+    index.update(ids[:3], [meta(i, "LATAM") for i in range(3)])
+    index.delete(ids[3:5])
+    summary = index.summary()
+    assert len(index) == 4 and sum(t["chunks"] for t in summary) == 4
+    assert sum(t["regions"].get("LATAM", 0) for t in summary) == 3
+
+
+def test_store_assigns_themes_at_ingest_and_forgets_deleted_reports(fake_openai):
+    async def scenario():
+        report_id = await store.add_report("Theme_A.txt", ["Theme vendor risk.", "Theme access."],
+                                           region="Themeland")
+        added = await store.themes()
+        await store.delete_report(report_id)
+        return added, await store.themes()
+
+    added, after = asyncio.run(scenario())
+    titles = lambda themes: {r["title"] for t in themes for r in t["reports"]}
+    assert "Theme_A.txt" in titles(added) and "Theme_A.txt" not in titles(after)
+    assert all(t["representative_text"] for t in added)
+    assert len(store.theme_index) == asyncio.run(store.count_chunks())
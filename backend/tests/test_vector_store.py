@@ -0,0 +1,123 @@
+"""Tests for AuditVectorStore against a throwaway Chroma directory (fake embeddings)."""
+import asyncio
+from src.vector_store import audit_vector_store as store
+
+
+def chunks(*labels):
+    return [f"Finding {label}: control narrative for {label}. " * 3 for label in labels]
+
+
+def test_revised_report_only_reembeds_changed_chunks(fake_openai):
+    async def scenario():
+        report_id, diff = await store.upsert_report("Revised.txt", chunks("A", "B", "C"),
+                                                    region="APAC")
+        assert diff is None
+        fake_openai.embedded_texts.clear()
+
+        same_id, diff = await store.upsert_report("Revised.txt", chunks("A", "C", "D"),
+                                                  region="APAC", report_id=report_id)
+        return report_id, same_id, diff
+
+    report_id, same_id, diff = asyncio.run(scenario())
+    assert same_id == report_id
+    assert diff["added"] == 1 and diff["removed"] == 1 and diff["unchanged"] == 2
+    assert diff["version"] == 2
+    assert fake_openai.embedded_texts == chunks("D")
+    stored = store.collection.get(where={"report_id": report_id}, include=["metadatas"])
+    assert sorted(m["chunk_index"] for m in stored["metadatas"]) == [0, 1, 2]
+
+
+def test_identical_reupload_is_a_no_op(fake_openai):
+    async def scenario():
+        await store.upsert_report("Same.txt", chunks("X", "Y"))
+        fake_openai.embedded_texts.clear()
+        return await store.upsert_report("Same.txt", chunks("X", "Y"))
+
+    _, diff = asyncio.run(scenario())
+    assert diff["added"] == diff["removed"] == diff["metadata_updated"] == 0
+    assert diff["version"] == 1
+    assert fake_openai.embedded_texts == []
+
+
+def test_same_title_is_not_a_revision_and_concurrent_copies_are_one_report(fake_openai):
+    async def scenario():
+        apac, _ = await store.upsert_report("report.txt", chunks("P1", "P2"), region="APAC")
+        emea, diff = await store.upsert_report("report.txt", chunks("E1"), region="EMEA")
+        assert diff is None and emea != apac
+        copies = await asyncio.gather(*(store.upsert_report("Copy.txt", chunks("C1", "C2"))
+                                        for _ in range(3)))
+        return apac, copies
+
+    apac, copies = asyncio.run(scenario())
+    assert len({report_id for report_id, _ in copies}) == 1
+    assert [diff is None for _, diff in copies] == [True, False, False]
+    assert store.registry.get(apac)["region"] == "APAC"
+
+
+def test_registry_is_rebuilt_from_chroma_when_out_of_sync(fake_openai):
+    report_id = asyncio.run(store.add_report("Rebuilt.txt", chunks("R1", "R2"),
+                                             region="LATAM", year=2024))
+    fingerprint = store.registry.get(report_id)["fingerprint"]
+    store.registry.clear()  # Simulate a lost / stale registry file
+
+    store._validate_registry()
+
+    restored = store.registry.get(report_id)
+    assert restored["title"] == "Rebuilt.txt"
+    assert restored["chunks"] == 2 and restored["region"] == "LATAM"
+    assert restored["fingerprint"] == fingerprint
+
+
+def test_hybrid_search_finds_exact_identifier_and_respects_filters(fake_openai):
+    async def scenario():
+        await store.add_report("Hybrid_A.txt", chunks("X1", "X2") + ["Exception ZX-9931 logged."],
+                               region="APAC")
+        await store.add_report("Hybrid_B.txt", ["Exception ZX-9931 also noted here."],
+                               region="EMEA")
+        # With n_results=4, RRF must keep both lexical hits whatever the dense ranking is
+        hybrid = await store.search("ZX-9931", n_results=4, mode="hybrid")
+        lexical_apac = await store.search("ZX-9931", mode="lexical", filter_region="APAC")
+        return hybrid, lexical_apac
+
+    hybrid, lexical_apac = asyncio.run(scenario())
+    assert {"Hybrid_A.txt", "Hybrid_B.txt"} <= {c["report_title"] for c in hybrid}
+    assert [c["text"] for c in lexical_apac] == ["Exception ZX-9931 logged."]
+    assert all(-1.0 <= c["relevance_score"] <= 1.0 for c in hybrid)
+
+
+def test_selective_and_range_filters_return_complete_results(fake_openai):
+    async def scenario():
+        await store.add_report("Filter_2022.txt", chunks("P", "Q", "R"), region="Filterland",
+                               severity="critical", year=2022)
+        await store.add_report("Filter_2025.txt", chunks("S", "T"), region="Filterland",
+                               severity="low", year=2025)
+        before = dict(store.filter_strategies)
+        one_region = await store.search("control narrative", n_results=10, mode="dense",
+                                        filter_region="Filterland")
+        ranged = await store.search("control narrative", n_results=10, mode="hybrid",
+                                    filter_region="Filterland", filter_year_min=2023)
+        multi = await store.search("control narrative", n_results=10, mode="dense",
+                                   filter_severity=["critical", "low"], filter_region="Filterland")
+        return before, one_region, ranged, multi
+
+    before, one_region, ranged, multi = asyncio.run(scenario())
+    assert len(one_region) == 5 and len(multi) == 5
+    assert {c["report_title"] for c in ranged} == {"Filter_2025.txt"} and len(ranged) == 2
+    assert store.filter_strategies["exact"] >= before["exact"] + 2
+
+
+def test_search_many_matches_one_search_per_query(fake_openai):
+    queries = ["Batch control narrative M", "ZX-4417", "narrative N"]
+
+    async def scenario():
+        await store.add_report("Many_A.txt", chunks("M", "N") + ["Exception ZX-4417 logged."],
+                               region="Manyland")
+        store.retrieval_cache.clear()
+        batched = await store.search_many(queries, n_results=3, filter_region="Manyland")
+        store.retrieval_cache.clear()
+        single = [await store.search(q, n_results=3, filter_region="Manyland") for q in queries]
+        return batched, single
+
+    batched, single = asyncio.run(scenario())
+    assert batched == single
+    assert "Exception ZX-4417 logged." in [c["text"] for c in batched[1]]
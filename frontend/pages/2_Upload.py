@@ -1,9 +1,14 @@
 """Upload page — ingest audit reports."""
 import streamlit as st
 import requests
+import time
 import os
  
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+STAGE_LABELS = {
+    "extract": "Extracting text", "chunk": "Chunking",
+    "embed": "Embedding", "index": "Indexing"
+}
  
 st.title("📤 Upload Audit Reports")
 st.markdown("Upload audit reports (PDF or TXT). Metadata is extracted automatically.")
@@ -11,22 +16,37 @@ st.markdown("Upload audit reports (PDF or TXT). Metadata is extracted automatica
 uploaded = st.file_uploader("Choose audit report", type=["pdf", "txt"])
  
 if uploaded and st.button("📤 Ingest Report", type="primary"):
-    with st.spinner("Processing and embedding report..."):
-        resp = requests.post(
-            f"{API_URL}/reports/upload",
-            files={"file": (uploaded.name, uploaded.getvalue(), "application/octet-stream")},
-            timeout=120
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            st.success(f"✅ Ingested: {data['title']} | {data['chunks_created']} chunks")
-            meta = data.get("extracted_metadata", {})
-            if any(meta.values()):
-                st.info(
-                    f"Auto-detected: Region={meta.get('region','N/A')} | "
-                    f"Severity={meta.get('severity','N/A')} | "
-                    f"Type={meta.get('audit_type','N/A')}"
-                )
-        else:
-            st.error(f"Upload failed: {resp.json().get('detail', 'Error')}")
-
+    # The API queues the report and returns a job id straight away
+    resp = requests.post(
+        f"{API_URL}/reports/upload",
+        files={"file": (uploaded.name, uploaded.getvalue(), "application/octet-stream")},
+        timeout=30
+    )
+    if resp.status_code != 202:
+        st.error(f"Upload failed: {resp.json().get('detail', 'Error')}")
+        st.stop()
+ 
+    job_id = resp.json()["job_id"]
+    progress = st.progress(0.0, text="Queued...")
+    while True:
+        job = requests.get(f"{API_URL}/jobs/{job_id}", timeout=5).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        label = STAGE_LABELS.get(job.get("stage"), "Queued")
+        progress.progress(job["progress"], text=f"{label}...")
+        time.sleep(1)
+ 
+    if job["status"] == "failed":
+        progress.empty()
+        st.error(f"Upload failed: {job.get('error', 'Error')}")
+    else:
+        progress.progress(1.0, text="Done")
+        data = job["result"]
+        st.success(f"✅ Ingested: {data['title']} | {data['chunks_created']} chunks")
+        meta = data.get("extracted_metadata", {})
+        if any(meta.values()):
+            st.info(
+                f"Auto-detected: Region={meta.get('region','N/A')} | "
+                f"Severity={meta.get('severity','N/A')} | "
+                f"Type={meta.get('audit_type','N/A')}"
+            )
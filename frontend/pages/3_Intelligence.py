@@ -1,6 +1,7 @@
 """Intelligence page — Q&A with filters and structured results."""
 import streamlit as st
 import requests
+import json
 import os
  
 API_URL = os.getenv("API_URL", "http://localhost:8000")
@@ -9,10 +10,13 @@ st.title("💬 Audit Intelligence")
  
 # ── FILTERS ──────────────────────────────────────────────
 with st.expander("🔧 Search Filters (optional)"):
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     region = col1.text_input("Filter by Region:", placeholder="e.g. APAC")
-    severity = col2.selectbox("Filter by Severity:", ["All", "critical", "high", "medium", "low"])
-    year = col3.number_input("Filter by Year:", min_value=2020, max_value=2030, value=0)
+    severity = col2.multiselect("Filter by Severity:", ["critical", "high", "medium", "low"])
+    year = col3.number_input("Filter by Year:", min_value=0, max_value=2030, value=0)
+    year_min = col4.number_input("From Year:", min_value=0, max_value=2030, value=0)
+    finding_severity = st.multiselect("Only excerpts from findings rated:",
+                                      ["critical", "high", "medium", "low"])
  
 # ── QUESTION INPUT ───────────────────────────────────────
 question = st.text_area("Your question:", height=80,
@@ -26,38 +30,77 @@ if col_btn.button("🔍 Search Reports", type="primary") and question:
         "question": question,
         "n_results": n_results,
         "filter_region": region or None,
-        "filter_severity": None if severity == "All" else severity,
-        "filter_year": int(year) if year > 0 else None
+        "filter_severity": severity or None,
+        "filter_year": int(year) if year > 0 else None,
+        "filter_year_min": int(year_min) if year_min > 0 else None,
+        "filter_finding_severity": finding_severity or None
     }
  
-    with st.spinner("Searching reports and generating answer..."):
-        resp = requests.post(f"{API_URL}/intelligence/ask",
-                             json=payload, timeout=30)
- 
-    if resp.status_code == 200:
-        data = resp.json()
- 
-        # Confidence badge
-        conf_icons = {"high": "🟢", "medium": "🟡", "low": "🔴"}
-        st.markdown(f"**Confidence:** {conf_icons.get(data['confidence'], '⚪')} {data['confidence'].capitalize()}")
-        st.caption(f"Searched {data['reports_searched']} reports, {data['total_chunks_searched']} total chunks indexed")
- 
-        # Main answer
-        st.markdown("### Answer")
-        st.markdown(data["answer"])
- 
-        # Key findings
-        if data.get("key_findings"):
-            st.markdown("### Key Findings")
-            for finding in data["key_findings"]:
-                st.markdown(f"• {finding}")
- 
-        # Sources
-        if data.get("sources"):
-            with st.expander(f"📄 View {len(data['sources'])} source excerpts"):
-                for i, src in enumerate(data["sources"], 1):
-                    st.markdown(f"**{i}. {src['report_title']}** (relevance: {src['relevance_score']:.0%})")
-                    if src.get("region"): st.caption(f"Region: {src['region']} | Severity: {src.get('severity', 'N/A')}")
-                    st.info(src["chunk_text"])
-    else:
-        st.error(f"Error: {resp.json().get('detail', 'Unknown error')}")
+    def sse_events(resp):
+        """Parse a server-sent event stream into (event, data) pairs."""
+        event, data = "message", []
+        for line in resp.iter_lines(decode_unicode=True):
+            if line is None:
+                continue
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].strip())
+            elif not line and data:
+                yield event, json.loads("\n".join(data))
+                event, data = "message", []
+
+    conf_icons = {"high": "🟢", "medium": "🟡", "low": "🔴"}
+    status = st.empty()
+    status.caption("Searching reports...")
+    meta_box = st.empty()
+    st.markdown("### Answer")
+    answer_box = st.empty()
+    findings_header = st.empty()
+    findings_box = st.empty()
+    sources_box = st.container()
+
+    answer_text, findings = "", []
+    try:
+        with requests.post(f"{API_URL}/intelligence/ask/stream", json=payload,
+                           stream=True, timeout=(5, 60)) as resp:
+            if resp.status_code != 200:
+                st.error(f"Error: {resp.json().get('detail', 'Unknown error')}")
+                st.stop()
+            for event, data in sse_events(resp):
+                if event == "sources":
+                    status.caption("Generating answer...")
+                    with sources_box.expander(f"📄 View {len(data['sources'])} source excerpts"):
+                        for i, src in enumerate(data["sources"], 1):
+                            pages = ""
+                            if src.get("page_start"):
+                                pages = f", p. {src['page_start']}"
+                                if src.get("page_end") and src["page_end"] != src["page_start"]:
+                                    pages += f"–{src['page_end']}"
+                            finding = f" · {src['finding_id']}" if src.get("finding_id") else ""
+                            st.markdown(f"**{i}. {src['report_title']}{pages}{finding}** (relevance: {src['relevance_score']:.0%})")
+                            if src.get("region"): st.caption(f"Region: {src['region']} | Severity: {src.get('severity', 'N/A')}")
+                            st.info(src["chunk_text"])
+                elif event == "answer_delta":
+                    answer_text += data["text"]
+                    answer_box.markdown(answer_text + "▌")
+                elif event == "finding":
+                    findings.append(data["text"])
+                    findings_header.markdown("### Key Findings")
+                    findings_box.markdown("\n".join(f"• {f}" for f in findings))
+                elif event == "done":
+                    status.empty()
+                    meta_box.markdown(
+                        f"**Confidence:** {conf_icons.get(data['confidence'], '⚪')} {data['confidence'].capitalize()}  \n"
+                        f"Searched {data['reports_searched']} reports, {data['total_chunks_searched']} total chunks indexed"
+                        + (" · ⚡ cached" if data.get("cached") else "")
+                    )
+                    answer_box.markdown(data["answer"])
+                    if data.get("key_findings"):
+                        findings_header.markdown("### Key Findings")
+                        findings_box.markdown("\n".join(f"• {f}" for f in data["key_findings"]))
+                elif event == "error":
+                    status.empty()
+                    st.error(f"Error: {data.get('detail', 'Unknown error')}")
+    except requests.RequestException as e:
+        st.error(f"Could not reach the API: {e}")